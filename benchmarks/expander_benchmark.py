@@ -0,0 +1,97 @@
+"""Measure the text expander cost per key press for different snippet counts.
+
+Run from the repository root:
+    python benchmarks/expander_benchmark.py [--counts 10 1000 100000] [--keys 200000]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from storage import Storage  # noqa: E402
+from text_expander import TextExpander  # noqa: E402
+
+DEFAULT_COUNTS = [10, 100, 1000, 10000, 100000]
+KEYS = string.ascii_lowercase + " "
+
+
+def create_snippets(count: int) -> dict[str, str]:
+    """Return count abbreviations of 3 to 8 characters starting with ";"."""
+    rng = random.Random(count)
+    snippets = dict()
+    while len(snippets) < count:
+        length = rng.randint(2, 7)
+        letters = (rng.choice(string.ascii_lowercase) for _ in range(length))
+        abbreviation = ";" + "".join(letters)
+        snippets[abbreviation] = f"snippet {len(snippets)}"
+    return snippets
+
+
+def create_keys(count: int, snippets: dict[str, str]) -> list[str]:
+    """Return typed characters with an abbreviation every few words."""
+    rng = random.Random(count)
+    abbreviations = list(snippets)
+    keys = []
+    while len(keys) < count:
+        if rng.random() < 0.05:
+            keys.extend(rng.choice(abbreviations))
+        else:
+            keys.extend(rng.choice(KEYS) for _ in range(rng.randint(2, 9)))
+        keys.append(" ")
+    return keys[:count]
+
+
+def measure(expander: TextExpander, count: int, key_count: int, repeat: int) -> dict:
+    """Feed key names to the expander the way the keyboard hook does."""
+    snippets = create_snippets(count)
+    start = time.perf_counter()
+    expander.set_snippets(snippets)
+    build_ms = (time.perf_counter() - start) * 1000
+    keys = ["space" if key == " " else key for key in create_keys(key_count, snippets)]
+    best_ns = None
+    for _ in range(repeat):
+        feed = expander.feed_key
+        matches = 0
+        start = time.perf_counter_ns()
+        for key in keys:
+            if feed(key) is not None:
+                matches += 1
+        elapsed_ns = (time.perf_counter_ns() - start) / len(keys)
+        best_ns = elapsed_ns if best_ns is None else min(best_ns, elapsed_ns)
+    return {
+        "snippets": count,
+        "states": expander.state_count,
+        "build_ms": build_ms,
+        "ns_per_key": best_ns,
+        "matches": matches,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", nargs="+", type=int, default=DEFAULT_COUNTS)
+    parser.add_argument("--keys", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(
+        f"{'snippets':>9} {'states':>9} {'build ms':>10} {'ns/key':>8} {'matches':>8}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        storage = Storage(os.path.join(directory, "storage.json"))
+        expander = TextExpander(storage)
+        for count in args.counts:
+            result = measure(expander, count, args.keys, args.repeat)
+            print(
+                f"{result['snippets']:>9} {result['states']:>9} "
+                f"{result['build_ms']:>10.1f} {result['ns_per_key']:>8.0f} "
+                f"{result['matches']:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Compare plain and compressed Storage values for different note sizes.
+
+Run from the repository root:
+    python benchmarks/storage_benchmark.py [--sizes 10K 1M 50M] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from storage import Storage  # noqa: E402
+
+DEFAULT_SIZES = ["10K", "100K", "1M", "10M", "50M"]
+MODES = [("plain", None), ("zlib", "zlib"), ("lzma", "lzma")]
+WORDS = (
+    "the quick brown fox jumps over lazy dog note meeting todo call remember "
+    "invoice 42 1337 monday friday email address password project deadline"
+).split()
+
+
+def parse_size(size: str) -> int:
+    units = {"K": 1024, "M": 1024 * 1024}
+    if size[-1].upper() in units:
+        return int(size[:-1]) * units[size[-1].upper()]
+    return int(size)
+
+
+def create_note(size: int) -> str:
+    """Return text that looks like a note with roughly size characters."""
+    rng = random.Random(size)
+    lines = []
+    length = 0
+    while length < size:
+        line = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12)))
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)[:size]
+
+
+def measure(filename: str, note: str, compression: str, repeat: int) -> tuple:
+    """Return the file size, save time and load time in seconds."""
+    kwargs = dict()
+    if compression is not None:
+        kwargs = dict(compress_threshold=0, compression=compression)
+    save_times = []
+    load_times = []
+    for _ in range(repeat):
+        if os.path.exists(filename):
+            os.remove(filename)
+        storage = Storage(filename, **kwargs)
+        start = time.perf_counter()
+        storage.save_object("notepad", {"default": note})
+        save_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        storage = Storage(filename, **kwargs)
+        storage.read_object("notepad")
+        load_times.append(time.perf_counter() - start)
+    return os.path.getsize(filename), min(save_times), min(load_times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'mode':>6} {'on disk':>12} {'save ms':>10} {'load ms':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "storage.json")
+        for size in args.sizes:
+            note = create_note(parse_size(size))
+            for mode, compression in MODES:
+                disk_size, save_time, load_time = measure(
+                    filename, note, compression, args.repeat
+                )
+                print(
+                    f"{size:>6} {mode:>6} {disk_size:>12,} "
+                    f"{save_time * 1000:>10.2f} {load_time * 1000:>10.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
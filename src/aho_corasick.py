@@ -0,0 +1,99 @@
+from collections import deque
+
+
+class Automaton:
+    """Aho-Corasick automaton compiled to a transition table.
+
+    Patterns map to values. Failure links are followed while compiling, so
+    feeding a character is at most two dict lookups however many patterns
+    there are. States only store the transitions that differ from the start
+    state, which keeps the table small for thousands of patterns.
+    """
+
+    def __init__(self, patterns: dict[str, any]) -> None:
+        # Transitions of the start state, every state falls back to these.
+        self._root = dict()
+        # Transitions of each state that differ from the start state.
+        self._transitions = [dict()]
+        # Pattern and value of the longest pattern ending in each state.
+        self._matches = [None]
+        self._build(patterns)
+
+    def __len__(self) -> int:
+        """Return the number of states."""
+        return len(self._transitions)
+
+    def _build(self, patterns: dict[str, any]) -> None:
+        children = [dict()]
+        for pattern, value in patterns.items():
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = children[state].get(char)
+                if next_state is None:
+                    next_state = len(children)
+                    children[state][char] = next_state
+                    children.append(dict())
+                    self._matches.append(None)
+                state = next_state
+            self._matches[state] = (pattern, value)
+        self._root = children[0]
+        self._transitions = [dict() for _ in children]
+        failures = [0] * len(children)
+        # States are compiled in breadth first order, so the failure state of
+        # a state is always compiled before it.
+        queue = deque(self._root.values())
+        while queue:
+            state = queue.popleft()
+            failure = failures[state]
+            if failure != 0:
+                self._transitions[state].update(self._transitions[failure])
+            self._transitions[state].update(children[state])
+            if self._matches[state] is None:
+                self._matches[state] = self._matches[failure]
+            for char, child in children[state].items():
+                failures[child] = self._next_state(failure, char)
+                queue.append(child)
+
+    def _next_state(self, state: int, char: str) -> int:
+        next_state = self._transitions[state].get(char)
+        if next_state is None:
+            return self._root.get(char, 0)
+        return next_state
+
+    def matcher(self) -> "Matcher":
+        return Matcher(self)
+
+    def find_all(self, text: str) -> list[tuple[int, str, any]]:
+        """Return (end index, pattern, value) of the longest match at each index."""
+        matches = []
+        matcher = self.matcher()
+        for index, char in enumerate(text):
+            match = matcher.feed(char)
+            if match is not None:
+                matches.append((index + 1, *match))
+        return matches
+
+
+class Matcher:
+    """Feed characters one at a time and get the pattern that ends there."""
+
+    __slots__ = ("_root", "_transitions", "_matches", "_state")
+
+    def __init__(self, automaton: Automaton) -> None:
+        self._root = automaton._root
+        self._transitions = automaton._transitions
+        self._matches = automaton._matches
+        self._state = 0
+
+    def feed(self, char: str) -> tuple[str, any]:
+        """Return (pattern, value) of the longest pattern ending with char or None."""
+        state = self._transitions[self._state].get(char)
+        if state is None:
+            state = self._root.get(char, 0)
+        self._state = state
+        return self._matches[state]
+
+    def reset(self) -> None:
+        self._state = 0
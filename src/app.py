@@ -1,33 +1,118 @@
+import logging
+import time
+import tkinter
+
 import customtkinter as ctk
-import keyboard
 
+from dispatcher import LatencyTracker
+from dispatcher import MainThreadDispatcher
+from hotkeys import HotkeyManager
 from settings_manager import SettingsManager
-from storage import Storage
+from settings_schema import SettingSpec
+from settings_schema import SettingsSchema
+from sqlite_storage import SQLiteStorage
+from startup_profiler import StartupProfiler
+from text_expander import TEXT_EXPANDER_SETTINGS
+from text_expander import TextExpander
+from widgets import CommandPalette
 from widgets import TabView
-from tabs import NoteTab
-from tabs import ConverterTab
-from tabs import TextManipulatorTab
-from tabs import SettingsTab
+import tabs
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SETTINGS = SettingsSchema(
+    [
+        SettingSpec("window_width", 400, min_value=300, max_value=700, hidden=True),
+        SettingSpec("window_height", 400, min_value=300, max_value=700, hidden=True),
+        SettingSpec(
+            "show_titlebar",
+            True,
+            description="Show or hide the window titlebar at the top of the window.",
+        ),
+        SettingSpec(
+            "always_on_top",
+            True,
+            description="Keep the window on top of other windows.",
+        ),
+        SettingSpec(
+            "transparency",
+            95,
+            min_value=50,
+            max_value=100,
+            description="Set the transparency of the window.",
+        ),
+        SettingSpec("window_theme", "system", options=["system", "light", "dark"]),
+    ]
+)
 
 
 class App(ctk.CTk):
     """Root application window."""
 
-    def __init__(self, title: str) -> None:
-        super().__init__()
+    def __init__(self, title: str, profiler: StartupProfiler = None) -> None:
+        self.profiler = profiler if profiler is not None else StartupProfiler()
+        with self.profiler.phase("create window"):
+            super().__init__()
         self._title = title
         self.restart = False
+        self.dispatcher = MainThreadDispatcher(self)
+        self.hotkey_latency = LatencyTracker()
+        # When the last hotkey was pressed, until the window is shown or hidden.
+        self._hotkey_pressed_at = None
+        # Created the first time it is opened.
+        self.command_palette = None
+        # Started by _setup_bindings, destroy() can run before that.
+        self.hotkeys = None
         self.title(title)
         self.iconbitmap("assets/icon.ico")
-        self.storage = Storage(self._title + "_storage.json")
-        self._create_settings()
-        self._setup_window()
-        self._setup_bindings()
-        self._create_tabs()
+        with self.profiler.phase("load storage"):
+            self._create_storage()
+        # Settings created during startup are saved once when the batch exits.
+        with self.settings.batch():
+            with self.profiler.phase("create settings"):
+                self._create_settings()
+            with self.profiler.phase("setup window"):
+                self._setup_window()
+            with self.profiler.phase("setup bindings"):
+                self._setup_bindings()
+            with self.profiler.phase("create tabs"):
+                self._create_tabs()
+
+    def _create_storage(self) -> None:
+        self.storage = SQLiteStorage(
+            self._title + "_storage.db", write_behind=True, compress_threshold=64 * 1024
+        )
+        self.storage.migrate_from_json(self._title + "_storage.json")
+        self.settings = SettingsManager(self.storage, scheduler=self)
+        self.text_expander = TextExpander(self.storage)
 
     def _setup_bindings(self) -> None:
         self.bind("<Alt-KeyPress-z>", lambda event: self.destroy())
-        keyboard.add_hotkey("alt+q", self.toggle_window)
+        self.bind("<Control-KeyPress-p>", lambda event: self.toggle_command_palette())
+        self.bind("<Map>", lambda e: self._on_map_changed(e, "show"), add="+")
+        self.bind("<Unmap>", lambda e: self._on_map_changed(e, "hide"), add="+")
+        self.hotkeys = HotkeyManager()
+        self.hotkeys.add("alt+q", self._on_toggle_hotkey)
+        failed = self.hotkeys.start()
+        if failed:
+            # The window can still be shown by launching the program again.
+            logger.warning("Could not register hotkeys: %s", ", ".join(failed))
+
+    def _on_toggle_hotkey(self) -> None:
+        """Called on the hotkey thread, Tk is only used on the main thread."""
+        self.dispatcher.post(self._toggle_from_hotkey, time.perf_counter())
+
+    def _toggle_from_hotkey(self, pressed_at: float) -> None:
+        self._hotkey_pressed_at = pressed_at
+        self.toggle_window()
+
+    def _on_map_changed(self, event, action: str) -> None:
+        """Record the hotkey latency once the window is shown or hidden."""
+        # Bindings on the root window also get the events of its children.
+        if event.widget is not self or self._hotkey_pressed_at is None:
+            return
+        self.hotkey_latency.record(action, self._hotkey_pressed_at)
+        self._hotkey_pressed_at = None
 
     def _setup_window(self) -> None:
         self.wm_attributes("-topmost", self._aot_setting.value)
@@ -37,57 +122,30 @@ class App(ctk.CTk):
         self.rescale_window()
 
     def _create_settings(self) -> None:
-        self.settings = SettingsManager(self.storage)
-        self._create_window_size_settings()
-        self._create_toolbar_setting()
-        self._create_always_on_top_setting()
-        self._create_window_transparency_setting()
-        self._create_window_theme_setting()
-
-    def _create_toolbar_setting(self) -> None:
-        DESC = "Show or hide the window titlebar at the top of the window."
-        self._show_titlebar_setting = self.settings.create(
-            "show_titlebar", default_value=True, parent="", desc=DESC
-        )
-
-    def _create_always_on_top_setting(self) -> None:
-        DESC = "Keep the window on top of other windows."
-        self._aot_setting = self.settings.create(
-            "always_on_top", default_value=True, desc=DESC
-        )
+        settings = self.settings.register(WINDOW_SETTINGS)
+        self._show_titlebar_setting = settings["show_titlebar"]
+        self._aot_setting = settings["always_on_top"]
         self._aot_setting.on_change = self._set_always_on_top
-
-    def _create_window_transparency_setting(self) -> None:
-        DESC = "Set the transparency of the window."
-        self.transparency_setting = self.settings.create_range(
-            "transparency", default_value=95, min_value=50, max_value=100, desc=DESC
-        )
+        self.transparency_setting = settings["transparency"]
         self.transparency_setting.on_change = self._set_transparency
-
-    def _create_window_theme_setting(self) -> None:
-        theme_options = ["system", "light", "dark"]
-        self._window_theme_setting = self.settings.create_option(
-            "window_theme", "system", options=theme_options
-        )
+        self._window_theme_setting = settings["window_theme"]
         self._window_theme_setting.on_change = self._set_window_theme
-
-    def _create_window_size_settings(self) -> None:
-        window_width_setting = self.settings.create_range(
-            "window_width", default_value=400, min_value=300, max_value=700, hidden=True
-        )
-        window_height_setting = self.settings.create_range(
-            "window_height",
-            default_value=400,
-            min_value=300,
-            max_value=700,
-            hidden=True,
-        )
-        window_width_setting.on_change = self.rescale_window
-        window_height_setting.on_change = self.rescale_window
+        settings["window_width"].on_change = self.rescale_window
+        settings["window_height"].on_change = self.rescale_window
+        settings = self.settings.register(TEXT_EXPANDER_SETTINGS)
+        self._text_expander_setting = settings["text_expander"]
+        self._text_expander_setting.on_change = self._set_text_expander
+        self._set_text_expander()
 
     def _set_always_on_top(self) -> None:
         self.wm_attributes("-topmost", self._aot_setting.value)
 
+    def _set_text_expander(self) -> None:
+        if self._text_expander_setting.value:
+            self.text_expander.start()
+        else:
+            self.text_expander.stop()
+
     def _set_transparency(self) -> None:
         self.attributes("-alpha", self.transparency_setting.value / 100)
 
@@ -120,11 +178,64 @@ class App(ctk.CTk):
     def _create_tabs(self) -> None:
         self.tabview = TabView(self)
         self.tabview.pack(fill="both", expand=True)
-        NoteTab(self, self.tabview, "Notepad")
-        ConverterTab(self, self.tabview, "Converter")
-        TextManipulatorTab(self, self.tabview, "Text")
-        SettingsTab(self, self.tabview, "Settings")
-        self.tabview.bind_keys()
+        # Tab modules are imported when the tab class is first used.
+        tab_classes = [
+            ("NoteTab", "Notepad"),
+            ("ConverterTab", "Converter"),
+            ("TextManipulatorTab", "Text"),
+            ("SettingsTab", "Settings"),
+        ]
+        self.tabs = dict()
+        for class_name, title in tab_classes:
+            with self.profiler.phase(f"tab {title}"):
+                self.tabs[title] = getattr(tabs, class_name)(self, self.tabview, title)
+        with self.profiler.phase("bind keys"):
+            self.tabview.bind_keys()
+        with self.profiler.phase("build first tab"):
+            self.tabview.build_current_tab()
+        if self.command_palette is not None:
+            self.command_palette.invalidate()
+
+    def toggle_command_palette(self) -> None:
+        if self.command_palette is None:
+            self.command_palette = CommandPalette(self, get_commands=self.get_commands)
+        self.command_palette.toggle()
+
+    def get_commands(self) -> list[tuple[str, callable]]:
+        """Return (name, callback) pairs for the command palette."""
+        commands = []
+        for title, tab in self.tabs.items():
+            if tab.tab is None:
+                continue
+            commands.append(
+                (f"Tab: {title}", lambda title=title: self.tabview.show_tab(title))
+            )
+            commands.extend(tab.get_commands())
+        commands.append(("Window: Hide", self.withdraw))
+        commands.append(("Restart", self.restart_app))
+        commands.append(("Exit", self.destroy))
+        return commands
+
+    def handle_command(self, command: str, *args: str) -> None:
+        """Run a command from another launch of the program, thread safe."""
+        self.dispatcher.post(self._run_command, command, *args)
+
+    def _run_command(self, command: str, *args: str) -> None:
+        if command == "toggle":
+            self.toggle_window()
+            return
+        self.show_window()
+        if command == "tab" and args:
+            self.tabview.show_tab(args[0])
+        elif command == "paste" and args:
+            text_tab = self.tabs.get("Text")
+            if text_tab is not None and self.tabview.show_tab(text_tab.title):
+                text_tab.set_input(args[0])
+
+    def show_window(self) -> None:
+        self._on_window_open()
+        self.lift()
+        self.focus_force()
 
     def _on_window_open(self) -> None:
         if self.state() == "withdrawn" or self.state() == "iconic":
@@ -134,6 +245,41 @@ class App(ctk.CTk):
         if self.state() == "normal":
             self.withdraw()
 
+    def destroy(self) -> None:
+        if self.hotkeys is not None:
+            self.hotkeys.stop()
+        self.text_expander.stop()
+        self.settings.close()
+        super().destroy()
+        # Tabs save on destroy, so write the pending changes afterwards.
+        self.storage.close()
+
     def restart_app(self) -> None:
-        self.restart = True
-        self.destroy()
+        """Rebuild the tabs and window, restart the process only if that fails."""
+        # The restart button is destroyed with the tabs, let its click finish.
+        self.after_idle(self._restart, time.perf_counter())
+
+    def _restart(self, started_at: float) -> None:
+        try:
+            self._soft_restart()
+        except tkinter.TclError:
+            self.restart = True
+            self.destroy()
+            return
+        # Runs once the rebuilt window is drawn, shown by --hotkey-stats.
+        self.after_idle(self.hotkey_latency.record, "restart", started_at)
+
+    def _soft_restart(self) -> None:
+        """Apply settings that need a restart without leaving the process."""
+        self.settings.save()
+        # Tabs that are hidden after the restart must not get setting changes.
+        for tab in self.tabs.values():
+            tab.destroy()
+        # Destroying the tabs saves their content, like on exit.
+        self.tabview.destroy()
+        with self.settings.batch():
+            # The titlebar only changes while the window is not shown.
+            self.withdraw()
+            self._setup_window()
+            self._create_tabs()
+            self.deiconify()
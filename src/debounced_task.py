@@ -0,0 +1,135 @@
+import queue
+import threading
+
+from dispatcher import MainThreadDispatcher
+
+
+class TaskCancelled(Exception):
+    """Raised by a job that stops because a newer run started."""
+
+
+class CancelToken:
+    """Identifies one run of a task and tells its job when to stop."""
+
+    __slots__ = ("_event",)
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise TaskCancelled()
+
+
+class DebouncedTask:
+    """Run a job once changes stop, off the main thread when the input is large.
+
+    prepare() runs on the main thread and returns (size, job). The job is
+    called with a CancelToken, on the main thread when size is below
+    thread_threshold and on a worker thread otherwise. Starting a run cancels
+    the previous one and results of cancelled runs are never passed to
+    on_result, which is always called on the main thread.
+    """
+
+    def __init__(
+        self,
+        root,
+        dispatcher: MainThreadDispatcher,
+        prepare: callable,
+        on_result: callable,
+        delay_ms: int = 150,
+        thread_threshold: int = 200_000,
+    ) -> None:
+        self._root = root
+        self._dispatcher = dispatcher
+        self._prepare = prepare
+        self._on_result = on_result
+        self._delay_ms = delay_ms
+        self._thread_threshold = thread_threshold
+        self._after_id = None
+        self._token = None
+        self._jobs = None
+
+    def schedule(self) -> None:
+        """Run after delay_ms, a later call in that time restarts the delay."""
+        if self._after_id is not None:
+            self._root.after_cancel(self._after_id)
+        self._after_id = self._root.after(self._delay_ms, self.run_now)
+
+    def run_now(self) -> None:
+        if self._after_id is not None:
+            self._root.after_cancel(self._after_id)
+            self._after_id = None
+        if self._token is not None:
+            self._token.cancel()
+        token = self._token = CancelToken()
+        size, job = self._prepare()
+        if size < self._thread_threshold:
+            try:
+                result = job(token)
+            except TaskCancelled:
+                return
+            self._on_result(result)
+            return
+        self._start_worker()
+        self._jobs.put((token, job))
+
+    def deliver(self, token: CancelToken, result: any) -> None:
+        """Pass a partial result of the run with token to on_result, thread safe."""
+        self._dispatcher.post(self._deliver, token, result)
+
+    def cancel(self) -> None:
+        """Cancel the scheduled run and the running job."""
+        if self._after_id is not None:
+            self._root.after_cancel(self._after_id)
+            self._after_id = None
+        if self._token is not None:
+            self._token.cancel()
+            self._token = None
+
+    def close(self) -> None:
+        self.cancel()
+        if self._jobs is not None:
+            self._jobs.put(None)
+            self._jobs = None
+
+    def _start_worker(self) -> None:
+        if self._jobs is not None:
+            return
+        self._jobs = queue.SimpleQueue()
+        threading.Thread(
+            target=self._work, args=(self._jobs,), name="DebouncedTask", daemon=True
+        ).start()
+
+    def _work(self, jobs: queue.SimpleQueue) -> None:
+        while True:
+            item = jobs.get()
+            if item is None:
+                return
+            token, job = item
+            if token.cancelled:
+                continue
+            try:
+                result = job(token)
+            except TaskCancelled:
+                continue
+            except Exception as error:
+                # Raise on the main thread, the dispatcher logs it.
+                self._dispatcher.post(self._raise, token, error)
+                continue
+            self.deliver(token, result)
+
+    def _deliver(self, token: CancelToken, result: any) -> None:
+        if token is self._token and not token.cancelled:
+            self._on_result(result)
+
+    def _raise(self, token: CancelToken, error: Exception) -> None:
+        if token is self._token:
+            raise error
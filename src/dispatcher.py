@@ -0,0 +1,92 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class MainThreadDispatcher:
+    """Run callbacks posted from other threads on the Tk main loop.
+
+    Posting queues the callback and wakes the main loop with a virtual event,
+    the queue is only checked when there is something in it.
+    """
+
+    WAKEUP_EVENT = "<<DispatcherWakeup>>"
+
+    def __init__(self, root) -> None:
+        self._root = root
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._wakeup_pending = False
+        root.bind(self.WAKEUP_EVENT, lambda _: self._run_queued(), add="+")
+        # Callbacks posted before the main loop started are run once it runs.
+        root.after_idle(self._run_queued)
+
+    def post(self, callback: callable, *args) -> None:
+        """Run callback with args on the main thread, can be called from any thread."""
+        self._queue.put((callback, args))
+        with self._lock:
+            if self._wakeup_pending:
+                return
+            self._wakeup_pending = True
+        try:
+            self._root.event_generate(self.WAKEUP_EVENT, when="tail")
+        except (RuntimeError, ValueError):
+            # The main loop is not running yet or anymore, the idle callback
+            # from __init__ runs the queue when it starts.
+            with self._lock:
+                self._wakeup_pending = False
+
+    def _run_queued(self) -> None:
+        with self._lock:
+            self._wakeup_pending = False
+        while True:
+            try:
+                callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                callback(*args)
+            except Exception:
+                # Keep running the queue, the callbacks after it may be waited for.
+                logger.exception("Dispatched callback %r failed", callback)
+
+
+class LatencyTracker:
+    """Keep the latest latencies of named actions and report percentiles."""
+
+    def __init__(self, max_samples: int = 1000) -> None:
+        self._max_samples = max_samples
+        self._samples = dict()
+
+    def record(self, name: str, started_at: float) -> float:
+        """Record the time since started_at, a time.perf_counter() value."""
+        latency_ms = (time.perf_counter() - started_at) * 1000
+        samples = self._samples.setdefault(name, deque(maxlen=self._max_samples))
+        samples.append(latency_ms)
+        return latency_ms
+
+    def percentiles(self, name: str, points=(50, 90, 99)) -> dict:
+        """Return the latency in ms at each percentile and the sample count."""
+        samples = sorted(self._samples.get(name, ()))
+        result = {"count": len(samples)}
+        for point in points:
+            if not samples:
+                result[f"p{point}"] = None
+                continue
+            index = min(round(point / 100 * (len(samples) - 1)), len(samples) - 1)
+            result[f"p{point}"] = samples[index]
+        return result
+
+    def summary(self) -> str:
+        lines = []
+        for name in self._samples:
+            stats = self.percentiles(name)
+            lines.append(
+                f"{name}: n={stats['count']} p50={stats['p50']:.1f} ms "
+                f"p90={stats['p90']:.1f} ms p99={stats['p99']:.1f} ms"
+            )
+        return "\n".join(lines)
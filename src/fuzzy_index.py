@@ -0,0 +1,124 @@
+import heapq
+
+# Length of the substrings entries are indexed by.
+GRAM_SIZE = 3
+
+
+class FuzzyIndex:
+    """Find entries that contain the characters of a query in order.
+
+    Entries are indexed by trigram. A query of three or more characters first
+    takes the entries that contain it as a whole, found by intersecting the
+    entries of its trigrams, and those rank first. Only when they are fewer
+    than the limit are the other entries scanned for the query characters in
+    order, shorter queries always scan. A scan keeps its matches and the next
+    scan narrows them when its query extends the last one, as while typing.
+    """
+
+    def __init__(self, entries: list[tuple[str, any]] = ()) -> None:
+        self._texts = []
+        # Texts without whitespace, queries are compared without it too.
+        self._compact_texts = []
+        self._values = []
+        # Entry ids by trigram.
+        self._postings = dict()
+        self._scan_query = ""
+        self._scan_matches = None
+        for text, value in entries:
+            self.add(text, value)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, text: str, value: any) -> None:
+        entry_id = len(self._texts)
+        text = text.lower()
+        compact_text = "".join(text.split())
+        self._texts.append(text)
+        self._compact_texts.append(compact_text)
+        self._values.append(value)
+        for start in range(len(compact_text) - GRAM_SIZE + 1):
+            gram = compact_text[start : start + GRAM_SIZE]
+            self._postings.setdefault(gram, set()).add(entry_id)
+        self._scan_query = ""
+        self._scan_matches = None
+
+    def search(self, query: str, limit: int = 10) -> list[any]:
+        """Return the values of the best matching entries, best first."""
+        query = "".join(query.lower().split())
+        if not query:
+            return self._values[:limit]
+        # Entries that contain the query rank before the other matches.
+        ranks = dict()
+        scores = dict()
+        if len(query) >= GRAM_SIZE:
+            for entry_id in self._find_substring(query):
+                ranks[entry_id] = 0
+                scores[entry_id] = self._score(query, self._texts[entry_id])
+        if len(scores) < limit:
+            for entry_id, score in self._scan(query).items():
+                if entry_id not in scores:
+                    ranks[entry_id] = 1
+                    scores[entry_id] = score
+        best = heapq.nsmallest(
+            limit,
+            scores,
+            key=lambda entry_id: (ranks[entry_id], -scores[entry_id], entry_id),
+        )
+        return [self._values[entry_id] for entry_id in best]
+
+    def _find_substring(self, query: str) -> list[int]:
+        """Return the ids of the entries that contain query."""
+        grams = {
+            query[start : start + GRAM_SIZE]
+            for start in range(len(query) - GRAM_SIZE + 1)
+        }
+        candidates = None
+        for gram in sorted(grams, key=lambda gram: len(self._postings.get(gram, ()))):
+            posting = self._postings.get(gram, set())
+            candidates = posting if candidates is None else candidates & posting
+            if not candidates:
+                return []
+        # Having every trigram does not mean they are next to each other.
+        return [
+            entry_id
+            for entry_id in candidates
+            if query in self._compact_texts[entry_id]
+        ]
+
+    def _scan(self, query: str) -> dict[int, int]:
+        """Return the scores of the entries with the query characters in order."""
+        if self._scan_matches is not None and query.startswith(self._scan_query):
+            candidates = self._scan_matches
+        else:
+            candidates = range(len(self._texts))
+        scores = dict()
+        for entry_id in candidates:
+            score = self._score(query, self._texts[entry_id])
+            if score is not None:
+                scores[entry_id] = score
+        self._scan_query, self._scan_matches = query, set(scores)
+        return scores
+
+    @staticmethod
+    def _score(query: str, text: str) -> int:
+        """Score query as a subsequence of text, None if it is not one.
+
+        Matches at the start of words and right after the previous match score
+        higher, shorter texts win ties.
+        """
+        score = 0
+        position = 0
+        previous = -2
+        for char in query:
+            position = text.find(char, position)
+            if position < 0:
+                return None
+            if position == previous + 1:
+                score += 4
+            if position == 0 or not text[position - 1].isalnum():
+                score += 3
+            score += 1
+            previous = position
+            position += 1
+        return score * 100 - len(text)
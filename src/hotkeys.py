@@ -0,0 +1,236 @@
+import sys
+import threading
+import time
+
+MODIFIERS = ("ctrl", "alt", "shift", "win")
+MODIFIER_ALIASES = {"control": "ctrl", "option": "alt", "super": "win", "cmd": "win"}
+
+
+class Chord:
+    """A key with modifiers parsed from text like "alt+q"."""
+
+    __slots__ = ("modifiers", "key")
+
+    def __init__(self, text: str) -> None:
+        parts = [part.strip().lower() for part in text.split("+") if part.strip()]
+        if not parts:
+            raise ValueError(f"Invalid hotkey '{text}'")
+        parts = [MODIFIER_ALIASES.get(part, part) for part in parts]
+        self.key = parts[-1]
+        self.modifiers = frozenset(parts[:-1])
+        unknown = self.modifiers.difference(MODIFIERS)
+        if unknown:
+            raise ValueError(f"Unknown modifiers {sorted(unknown)} in hotkey '{text}'")
+
+    def __repr__(self) -> str:
+        return "+".join(sorted(self.modifiers) + [self.key])
+
+
+class HotkeyCounters:
+    """Counts the hotkey events that reach Python and the time spent on them."""
+
+    def __init__(self) -> None:
+        self.events = 0
+        self.matched = 0
+        self.time_ns = 0
+
+    def to_dict(self) -> dict:
+        per_event = self.time_ns / self.events if self.events else 0
+        return {
+            "events": self.events,
+            "matched": self.matched,
+            "total_ms": self.time_ns / 1e6,
+            "ns_per_event": per_event,
+        }
+
+
+class _Win32Backend:
+    """Registers chords with RegisterHotKey, Windows only wakes us on a match."""
+
+    WM_HOTKEY = 0x0312
+    WM_QUIT = 0x0012
+    MOD_FLAGS = {"alt": 0x1, "ctrl": 0x2, "shift": 0x4, "win": 0x8}
+    MOD_NOREPEAT = 0x4000
+    VIRTUAL_KEYS = {
+        "space": 0x20,
+        "enter": 0x0D,
+        "tab": 0x09,
+        "esc": 0x1B,
+        "escape": 0x1B,
+        "backspace": 0x08,
+        "delete": 0x2E,
+        "insert": 0x2D,
+        "home": 0x24,
+        "end": 0x23,
+        "page up": 0x21,
+        "page down": 0x22,
+    }
+
+    def __init__(self, counters: HotkeyCounters) -> None:
+        import ctypes
+        from ctypes import wintypes
+
+        self._ctypes = ctypes
+        self._wintypes = wintypes
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+        self._counters = counters
+        self._thread = None
+        self._thread_id = None
+        # Set once the thread id is known and the chords are registered.
+        self._ready = threading.Event()
+        self._failed = []
+
+    def _get_virtual_key(self, key: str) -> int:
+        if len(key) == 1 and key.isalnum():
+            return ord(key.upper())
+        if key.startswith("f") and key[1:].isdigit() and 1 <= int(key[1:]) <= 24:
+            return 0x6F + int(key[1:])
+        try:
+            return self.VIRTUAL_KEYS[key]
+        except KeyError:
+            raise ValueError(f"Unsupported hotkey key '{key}'")
+
+    def start(self, chords: list) -> list[Chord]:
+        """Register the chords, return the chords that could not be registered."""
+        failed = []
+        registrations = []
+        for chord, callback in chords:
+            try:
+                virtual_key = self._get_virtual_key(chord.key)
+            except ValueError:
+                failed.append(chord)
+                continue
+            modifiers = self.MOD_NOREPEAT
+            for modifier in chord.modifiers:
+                modifiers |= self.MOD_FLAGS[modifier]
+            registrations.append((chord, modifiers, virtual_key, callback))
+        self._thread = threading.Thread(
+            target=self._run, args=(registrations,), name="Hotkeys", daemon=True
+        )
+        self._thread.start()
+        self._ready.wait()
+        return failed + self._failed
+
+    def _run(self, registrations: list) -> None:
+        # Hotkeys are posted to the thread that registers them.
+        self._thread_id = self._kernel32.GetCurrentThreadId()
+        callbacks = dict()
+        try:
+            for hotkey_id, registration in enumerate(registrations):
+                chord, modifiers, virtual_key, callback = registration
+                if self._user32.RegisterHotKey(
+                    None, hotkey_id, modifiers, virtual_key
+                ):
+                    callbacks[hotkey_id] = callback
+                else:
+                    # Usually another program registered the same chord.
+                    self._failed.append(chord)
+        finally:
+            self._ready.set()
+        message = self._wintypes.MSG()
+        while self._user32.GetMessageW(self._ctypes.byref(message), None, 0, 0) > 0:
+            if message.message != self.WM_HOTKEY:
+                continue
+            start = time.perf_counter_ns()
+            self._counters.events += 1
+            callback = callbacks.get(message.wParam)
+            if callback is not None:
+                self._counters.matched += 1
+                callback()
+            self._counters.time_ns += time.perf_counter_ns() - start
+        for hotkey_id in callbacks:
+            self._user32.UnregisterHotKey(None, hotkey_id)
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        # The thread id is only known once the thread has started.
+        self._ready.wait()
+        self._user32.PostThreadMessageW(self._thread_id, self.WM_QUIT, 0, 0)
+        self._thread.join()
+        self._thread = None
+
+
+class _KeyboardBackend:
+    """Uses keyboard.add_hotkey where there is no system hotkey API.
+
+    The keyboard library matches the chords by scan code in its own listener,
+    so only chord presses call into our code, with or without shift held. The
+    counters only see those presses, the time the library spends on other
+    keys is not measured.
+    """
+
+    # Names the keyboard library uses for modifiers.
+    KEY_NAMES = {"win": "windows"}
+
+    def __init__(self, counters: HotkeyCounters) -> None:
+        import keyboard
+
+        self._keyboard = keyboard
+        self._counters = counters
+        self._handles = []
+
+    def start(self, chords: list) -> list[Chord]:
+        """Add the chords, return the chords the keyboard library rejected."""
+        failed = []
+        for chord, callback in chords:
+            try:
+                handle = self._keyboard.add_hotkey(
+                    self._get_hotkey(chord), self._on_hotkey, args=(callback,)
+                )
+            except ValueError:
+                failed.append(chord)
+                continue
+            self._handles.append(handle)
+        return failed
+
+    def _get_hotkey(self, chord: Chord) -> str:
+        keys = sorted(chord.modifiers) + [chord.key]
+        return "+".join(self.KEY_NAMES.get(key, key) for key in keys)
+
+    def _on_hotkey(self, callback: callable) -> None:
+        start = time.perf_counter_ns()
+        self._counters.events += 1
+        self._counters.matched += 1
+        callback()
+        self._counters.time_ns += time.perf_counter_ns() - start
+
+    def stop(self) -> None:
+        for handle in self._handles:
+            self._keyboard.remove_hotkey(handle)
+        self._handles = []
+
+
+class HotkeyManager:
+    """Global hotkeys that only do work for the registered chords.
+
+    On Windows the chords are registered with the system, elsewhere with
+    keyboard.add_hotkey. Callbacks run on a background thread.
+    """
+
+    def __init__(self) -> None:
+        self.counters = HotkeyCounters()
+        self._chords = []
+        self._backend = None
+
+    def add(self, hotkey: str, callback: callable) -> None:
+        """Add a hotkey like "alt+q", must be called before start()."""
+        self._chords.append((Chord(hotkey), callback))
+
+    def start(self) -> list[str]:
+        """Start listening, return the hotkeys that could not be registered."""
+        if sys.platform == "win32":
+            self._backend = _Win32Backend(self.counters)
+        else:
+            self._backend = _KeyboardBackend(self.counters)
+        failed = self._backend.start(self._chords)
+        return [repr(chord) for chord in failed]
+
+    def stop(self) -> None:
+        if self._backend is not None:
+            self._backend.stop()
+            self._backend = None
+
+    def stats(self) -> dict:
+        return self.counters.to_dict()
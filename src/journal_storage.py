@@ -0,0 +1,131 @@
+import json
+import logging
+import os
+
+from storage import Storage
+
+logger = logging.getLogger(__name__)
+
+
+class JournalStorage(Storage):
+    """Storage that appends each saved object to a journal file.
+
+    The snapshot file has the same format as Storage, so existing storage files
+    are loaded as is. The journal is replayed on top of the snapshot and folded
+    back into it once the journal grows past compact_threshold bytes.
+    """
+
+    def __init__(
+        self, filename, compact_threshold: int = 4 * 1024 * 1024, **kwargs
+    ) -> None:
+        self._journal_filename = filename + ".journal"
+        self._compact_threshold = compact_threshold
+        self._journal_size = 0
+        # Set when an append failed, part of its records may be in the journal.
+        self._journal_torn = False
+        super().__init__(filename, **kwargs)
+
+    @property
+    def filenames(self) -> list[str]:
+        """Return the snapshot and journal files of the storage."""
+        return [self._filename, self._journal_filename]
+
+    def _load(self) -> dict:
+        """Load the snapshot and replay the journal on top of it"""
+        data = super()._load()
+        self._journal_size = self._replay_journal(data)
+        return data
+
+    def _replay_journal(self, data: dict) -> int:
+        """Apply journal records to data and return the size of the journal.
+
+        A bad last record is left by an interrupted write and is cut off. Bad
+        records before it are skipped, the records after them are still valid.
+        """
+        try:
+            with open(self._journal_filename, "rb") as file:
+                lines = file.readlines()
+        except FileNotFoundError:
+            return 0
+        size = 0
+        for index, line in enumerate(lines):
+            record = self._decode_record(line)
+            if record is not None:
+                data[record["key"]] = record["data"]
+            elif index == len(lines) - 1:
+                # Drop the torn record so the next record starts on a new line.
+                with open(self._journal_filename, "r+b") as file:
+                    file.truncate(size)
+                return size
+            else:
+                logger.warning(
+                    "Skipped corrupt record at byte %d of %s",
+                    size,
+                    self._journal_filename,
+                )
+            size += len(line)
+        return size
+
+    @staticmethod
+    def _decode_record(line: bytes) -> dict | None:
+        """Return the record in line or None if it is incomplete or corrupt."""
+        if not line.endswith(b"\n"):
+            return None
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(record, dict) or "key" not in record:
+            return None
+        return record
+
+    def _write(self, data: dict, dirty_keys: set) -> None:
+        """Append dirty keys to the journal, compact when it is too large"""
+        if self._journal_size >= self._compact_threshold:
+            self._compact(data, dirty_keys)
+            return
+        encoded = self._encode(data, dirty_keys)
+        lines = []
+        for key in dirty_keys:
+            record = {"key": key, "data": encoded[key]}
+            lines.append(json.dumps(record, separators=(",", ":")) + "\n")
+        content = "".join(lines).encode("utf-8")
+        if self._journal_torn:
+            # A retry appended to a torn line would be skipped as corrupt.
+            self._truncate_journal()
+        try:
+            with open(self._journal_filename, "ab") as file:
+                file.write(content)
+                file.flush()
+                os.fsync(file.fileno())
+        except OSError:
+            self._journal_torn = True
+            raise
+        self._journal_size += len(content)
+
+    def _truncate_journal(self) -> None:
+        """Cut the journal back to the records that were written completely."""
+        try:
+            with open(self._journal_filename, "r+b") as file:
+                file.truncate(self._journal_size)
+        except FileNotFoundError:
+            pass
+        self._journal_torn = False
+
+    def _compact(self, data: dict, dirty_keys: set) -> None:
+        """Write all data to the snapshot and empty the journal"""
+        super()._write(data, dirty_keys)
+        # The snapshot already contains every record, so a crash before the
+        # truncate only replays records that are already applied.
+        with open(self._journal_filename, "wb"):
+            pass
+        self._journal_size = 0
+        self._journal_torn = False
+
+    def compact(self) -> None:
+        """Write pending changes and fold the journal into the snapshot."""
+        self.flush()
+        with self._flush_lock:
+            with self._lock:
+                data = dict(self._read())
+            self._compact(data, set())
@@ -0,0 +1,22 @@
+import importlib.util
+import sys
+
+
+def lazy_module(name: str):
+    """Return a module that is only imported when an attribute is first used."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def is_module_available(name: str) -> bool:
+    """Return True if a module can be imported, without importing it."""
+    return name in sys.modules or importlib.util.find_spec(name) is not None
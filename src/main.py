@@ -1,16 +1,116 @@
-from app import App
+import argparse
 import os
 import sys
 
+from single_instance import InstanceServer
+from single_instance import send_command
+from startup_profiler import StartupProfiler
+
+TITLE = "UtilityGear"
+# Seconds a launch that lost the race to start waits for the winner to listen.
+START_TIMEOUT = 5.0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="UtilityGear")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Profile startup, write a JSON report and exit once the window is idle.",
+    )
+    parser.add_argument(
+        "--profile-output",
+        default="UtilityGear_startup_profile.json",
+        help="File to write the startup profile to.",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Also trace allocations with --profile-startup, wall times are higher.",
+    )
+    parser.add_argument(
+        "--hotkey-stats",
+        action="store_true",
+        help="Print hotkey and restart latency percentiles and hook overhead on exit.",
+    )
+    commands = parser.add_mutually_exclusive_group()
+    commands.add_argument(
+        "--show", action="store_true", help="Show the window (default)."
+    )
+    commands.add_argument(
+        "--toggle", action="store_true", help="Show or hide the window."
+    )
+    commands.add_argument("--tab", metavar="NAME", help="Show the window at a tab.")
+    commands.add_argument(
+        "--paste",
+        metavar="TEXT",
+        help="Paste text into the Text tab, use - to read the text from stdin.",
+    )
+    return parser.parse_args()
+
+
+def get_command(args: argparse.Namespace) -> tuple:
+    """Return the command for the running instance as (command, *args)."""
+    if args.toggle:
+        return ("toggle",)
+    if args.tab is not None:
+        return ("tab", args.tab)
+    if args.paste is not None:
+        text = sys.stdin.read() if args.paste == "-" else args.paste
+        return ("paste", text)
+    return ("show",)
+
 
 def main():
-    title = "UtilityGear"
-    app = App(title)
+    args = parse_args()
+    command = get_command(args)
+    server = None
+    if not args.profile_startup:
+        # Hand the command to a running instance before importing the app.
+        if send_command(TITLE, *command):
+            return
+        server = InstanceServer(TITLE)
+        if not server.start():
+            # Another launch took the lock first and listens before it builds
+            # its app, give it the command instead.
+            send_command(TITLE, *command, retry_for=START_TIMEOUT)
+            return
+    profiler = StartupProfiler(
+        enabled=args.profile_startup, trace_memory=args.profile_memory
+    )
+    profiler.start()
+    with profiler.phase("import app"):
+        from app import App
+
+    app = App(TITLE, profiler=profiler)
+    if args.profile_startup:
+        app.after_idle(lambda: finish_profile(app, profiler, args.profile_output))
+    else:
+        server.set_handler(app.handle_command)
+        if command[0] != "show":
+            app.handle_command(*command)
     app.mainloop()
+    if server is not None:
+        server.close()
+    if args.hotkey_stats:
+        print(app.hotkey_latency.summary())
+        stats = app.hotkeys.stats()
+        print(
+            f"hook: {stats['events']} events, {stats['matched']} matched, "
+            f"{stats['ns_per_event']:.0f} ns per event"
+        )
     if app.restart:
         python_path = sys.executable
         os.execl(python_path, python_path, *sys.argv)
 
 
+def finish_profile(app, profiler: StartupProfiler, filename: str) -> None:
+    """Write the profile once the first frame is drawn and exit."""
+    with profiler.phase("first frame"):
+        app.update_idletasks()
+    print(profiler.finish(filename))
+    app.destroy()
+
+
 if __name__ == "__main__":
     main()
@@ -1,6 +1,40 @@
+def to_bool(value: any) -> bool:
+    """Convert a value to bool, strings like "False" and "0" are False."""
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+def keep_value(value: any) -> any:
+    return value
+
+
+# Coercers for value types that need more than calling the type.
+COERCERS = {bool: to_bool, type(None): keep_value}
+
+
+def get_coercer(value_type: type) -> callable:
+    """Return a function that converts a value to value_type."""
+    return COERCERS.get(value_type, value_type)
+
+
 class Setting:
     """A setting that can have any value."""
 
+    __slots__ = (
+        "name",
+        "_value",
+        "default_value",
+        "hidden",
+        "parent",
+        "description",
+        "value_type",
+        "_coerce",
+        "_subscribers",
+        "_on_change",
+        "dispatcher",
+    )
+
     def __init__(
         self,
         name: str,
@@ -13,16 +47,18 @@ class Setting:
         on_change: callable = None,
     ) -> None:
         self.name = name
-        self._value = value
         self.default_value = default_value
         self.hidden = hidden
         self.parent = parent
         self.description = description
+        self.value_type = type(value) if value_type is None else value_type
+        self._coerce = get_coercer(self.value_type)
+        self._value = self.validate(value)
+        self._subscribers = []
+        self._on_change = None
         self.on_change = on_change
-        if value_type is None:
-            self.value_type = type(value)
-        elif isinstance(value_type, str):
-            self.value_type = Setting.determine_value_type(value_type)
+        # Called with the setting instead of notifying subscribers right away.
+        self.dispatcher = None
 
     @property
     def value(self) -> any:
@@ -31,27 +67,46 @@ class Setting:
     @value.setter
     def value(self, value: any) -> None:
         self._set_value(value)
-        if self.on_change is not None:
-            self.on_change()
-
-    def _set_value(self, value: any) -> None:
-        if self.value_type:
-            self._value = self.value_type(value)
+        if self.dispatcher is not None:
+            self.dispatcher(self)
             return
-        self._value = value
+        self.notify()
 
-    @staticmethod
-    def determine_value_type(value_type: str) -> type:
-        if "int" in value_type:
-            return int
-        elif "float" in value_type:
-            return float
-        elif "bool" in value_type:
-            return bool
-        return str
+    @property
+    def on_change(self) -> callable:
+        return self._on_change
+
+    @on_change.setter
+    def on_change(self, callback: callable) -> None:
+        """Replace the main change callback, other subscribers are kept."""
+        if self._on_change is not None:
+            self.unsubscribe(self._on_change)
+        self._on_change = callback
+        if callback is not None:
+            self.subscribe(callback)
+
+    def subscribe(self, callback: callable) -> None:
+        """Call callback without arguments when the value changes."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: callable) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def notify(self) -> None:
+        """Call every subscriber."""
+        for callback in list(self._subscribers):
+            callback()
+
+    def validate(self, value: any) -> any:
+        """Return value converted to the setting type, raise ValueError if invalid."""
+        return self._coerce(value)
+
+    def _set_value(self, value: any) -> None:
+        self._value = self.validate(value)
 
     def reset_default_value(self) -> None:
-        self.set_value(self.default_value)
+        self.value = self.default_value
 
     def to_dict(self) -> dict:
         return {
@@ -60,13 +115,15 @@ class Setting:
             "default_value": self.default_value,
             "hidden": self.hidden,
             "parent": self.parent,
-            "value_type": str(self.value_type),
+            "value_type": self.value_type.__name__,
         }
 
 
 class OptionSetting(Setting):
     """A setting that can have a value from a list of options."""
 
+    __slots__ = ("_options", "_option_set")
+
     def __init__(
         self,
         name: str,
@@ -91,10 +148,9 @@ class OptionSetting(Setting):
             on_change=on_change,
         )
 
-    def _set_value(self, value: any) -> None:
-        if str(value) in self.options:
-            self._value = value
-            return
+    def validate(self, value: any) -> any:
+        if str(value) in self._option_set:
+            return self._coerce(value)
         raise ValueError(
             f"Value '{value}' is not in the list of options: {self.options}"
         )
@@ -107,6 +163,7 @@ class OptionSetting(Setting):
     def options(self, options: list) -> None:
         # Ensure every value in the list is a string.
         self._options = OptionSetting.to_str_list(options)
+        self._option_set = frozenset(self._options)
 
     @staticmethod
     def to_str_list(input: list) -> list:
@@ -114,7 +171,7 @@ class OptionSetting(Setting):
         return [str(item) for item in input]
 
     def set_value(self, value: any) -> None:
-        if str(value) in self.options:
+        if str(value) in self._option_set:
             self.value = value
 
     def to_dict(self) -> dict:
@@ -126,6 +183,8 @@ class OptionSetting(Setting):
 class RangeSetting(Setting):
     """A setting that can have a value between min and max."""
 
+    __slots__ = ("min_value", "max_value")
+
     def __init__(
         self,
         name: str,
@@ -159,10 +218,8 @@ class RangeSetting(Setting):
             return self.max_value
         return value
 
-    def _set_value(self, value: any) -> None:
-        if self.value_type:
-            value = self.value_type(value)
-        self._value = self._clamp(value)
+    def validate(self, value: any) -> any:
+        return self._clamp(self._coerce(value))
 
     def to_dict(self) -> dict:
         setting_dict = super().to_dict()
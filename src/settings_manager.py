@@ -1,58 +1,215 @@
+from contextlib import contextmanager
+
 from storage import Storage
 from setting import Setting
 from setting import OptionSetting
 from setting import RangeSetting
+from settings_schema import SettingSpec
+from settings_schema import SettingsSchema
 
 
 class SettingsManager:
-    def __init__(self, storage: Storage) -> None:
+    # Delay before saving after a value change, restarted by each change.
+    SAVE_DELAY_MS = 500
+
+    def __init__(self, storage: Storage, scheduler=None) -> None:
+        """Scheduler is a Tk widget used to coalesce change callbacks and saves.
+
+        Without a scheduler callbacks run and settings save immediately.
+        """
         self._storage = storage
+        self._scheduler = scheduler
         self.settings = dict()
+        self._clear_indexes()
+        # Settings changed since the last idle callback, by name.
+        self._pending_changes = dict()
+        self._notify_after_id = None
+        self._save_after_id = None
+        # Settings as they were last written to storage, including settings
+        # that are stored but not declared in this run.
+        self._saved_settings = dict()
+        # Names of settings that may differ from the saved settings.
+        self._dirty = set()
+        self._batch_depth = 0
         self._load_settings()
 
     def _load_settings(self) -> None:
-        """Load settings from storage."""
+        """Load settings from storage, they are validated when declared."""
         settings_dict = self._storage.read_object("settings")
         if settings_dict is not None:
-            for key, value in settings_dict.items():
-                self.settings[key] = self._load_setting_from_dict(value)
-
-    @staticmethod
-    def _load_setting_from_dict(setting_dict: dict) -> Setting:
-        """Load a setting from a dictionary."""
-        if setting_dict.get("options") is not None:
-            return OptionSetting(**setting_dict)
-        elif setting_dict.get("min_value") is not None:
-            return RangeSetting(**setting_dict)
-        return Setting(**setting_dict)
+            self._saved_settings = dict(settings_dict)
+
+    def register(self, schema: SettingsSchema) -> dict[str, Setting]:
+        """Declare the settings in schema and return them by name.
+
+        Stored values are validated against the whole schema in one pass.
+        Settings that already exist get the new metadata and keep their value
+        if it is still valid, otherwise it is validated like a stored value.
+        """
+        values = schema.validate(self._saved_settings)
+        registered = dict()
+        for name, spec in schema.specs.items():
+            setting = self.settings.get(name)
+            if type(setting) is not spec.setting_class:
+                setting = self._add(name, spec.compile(values[name]))
+            else:
+                self._unindex(setting)
+                spec.apply(setting)
+                self._index(setting)
+                value = spec.validate(setting.value)
+                if value != setting.value:
+                    setting.value = value
+            registered[name] = setting
+            self._mark_dirty(name)
+        self._save_settings()
+        return registered
+
+    def _declare(self, spec: SettingSpec) -> Setting:
+        return self.register(SettingsSchema([spec]))[spec.name]
+
+    def _add(self, name: str, setting: Setting) -> Setting:
+        """Add a setting and route its change notifications through the manager."""
+        if self._scheduler is not None:
+            setting.dispatcher = self._queue_change
+        if name in self.settings:
+            self._unindex(self.settings[name])
+        self.settings[name] = setting
+        self._index(setting)
+        return setting
+
+    def remove(self, name: str) -> None:
+        """Remove a setting, it is also removed from storage."""
+        setting = self.settings.pop(name, None)
+        if setting is None:
+            return
+        self._unindex(setting)
+        self._mark_dirty(name)
+        self._save_settings()
+
+    def _clear_indexes(self) -> None:
+        # Each index maps a key to the settings with that key by name.
+        self._by_parent = dict()
+        self._by_type = dict()
+        self._by_hidden = {False: dict(), True: dict()}
+
+    def _index(self, setting: Setting) -> None:
+        self._by_parent.setdefault(setting.parent, dict())[setting.name] = setting
+        self._by_type.setdefault(setting.value_type, dict())[setting.name] = setting
+        self._by_hidden[bool(setting.hidden)][setting.name] = setting
+
+    def _unindex(self, setting: Setting) -> None:
+        for index, key in (
+            (self._by_parent, setting.parent),
+            (self._by_type, setting.value_type),
+        ):
+            group = index.get(key)
+            if group is None:
+                continue
+            group.pop(setting.name, None)
+            if not group:
+                del index[key]
+        self._by_hidden[bool(setting.hidden)].pop(setting.name, None)
+
+    def parents(self) -> list[str]:
+        """Return the parent of every setting in the order they were created."""
+        return list(self._by_parent)
+
+    def by_parent(self, parent: str) -> list[Setting]:
+        return list(self._by_parent.get(parent, dict()).values())
+
+    def by_type(self, value_type: type) -> list[Setting]:
+        return list(self._by_type.get(value_type, dict()).values())
+
+    def visible(self) -> list[Setting]:
+        return list(self._by_hidden[False].values())
+
+    def hidden(self) -> list[Setting]:
+        return list(self._by_hidden[True].values())
+
+    def _queue_change(self, setting: Setting) -> None:
+        """Notify subscribers once per idle cycle, however often the value changes."""
+        self._pending_changes[setting.name] = setting
+        if self._notify_after_id is None:
+            self._notify_after_id = self._scheduler.after_idle(self._dispatch_changes)
+
+    def _dispatch_changes(self) -> None:
+        self._notify_after_id = None
+        pending = self._pending_changes
+        self._pending_changes = dict()
+        for setting in pending.values():
+            setting.notify()
+
+    def _schedule_save(self) -> None:
+        """Save after SAVE_DELAY_MS without changes."""
+        if self._scheduler is None:
+            self._save_settings()
+            return
+        if self._save_after_id is not None:
+            self._scheduler.after_cancel(self._save_after_id)
+        self._save_after_id = self._scheduler.after(
+            self.SAVE_DELAY_MS, self._save_settings
+        )
+
+    def save(self) -> None:
+        """Save changed settings now instead of waiting for the delayed save."""
+        if self._save_after_id is not None:
+            self._scheduler.after_cancel(self._save_after_id)
+        self._save_settings()
+
+    def close(self) -> None:
+        """Save pending changes and drop the scheduled callbacks."""
+        if self._notify_after_id is not None:
+            self._scheduler.after_cancel(self._notify_after_id)
+            self._notify_after_id = None
+        self.save()
+
+    def _mark_dirty(self, name: str) -> None:
+        self._dirty.add(name)
 
     def _save_settings(self) -> None:
-        """Save settings to storage."""
-        settings_dict = dict()
-        for key, value in self.settings.items():
-            settings_dict[key] = value.to_dict()
-        self._storage.save_object("settings", settings_dict)
+        """Save changed settings to storage, does nothing inside a batch."""
+        self._save_after_id = None
+        if self._batch_depth > 0 or not self._dirty:
+            return
+        changed = False
+        for name in self._dirty:
+            setting = self.settings.get(name)
+            if setting is None:
+                changed |= self._saved_settings.pop(name, None) is not None
+                continue
+            setting_dict = setting.to_dict()
+            if self._saved_settings.get(name) != setting_dict:
+                self._saved_settings[name] = setting_dict
+                changed = True
+        self._dirty.clear()
+        if changed:
+            self._storage.save_object("settings", dict(self._saved_settings))
+
+    @contextmanager
+    def batch(self):
+        """Delay saving until the outermost batch exits, then save once."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            self._save_settings()
 
     def clear_settings(self) -> None:
         """Remove all settings."""
+        self._dirty.update(self._saved_settings)
         self.settings = {}
+        self._clear_indexes()
         self._save_settings()
 
     def create(
         self, name: str, default_value, hidden=False, parent="", desc: str = ""
     ) -> Setting:
         """Create a setting with a default value."""
-        try:
-            self.settings[name].default_value = default_value
-            self.settings[name].hidden = hidden
-            self.settings[name].parent = parent
-            self.settings[name].description = desc
-        except KeyError:
-            self.settings[name] = Setting(
-                name, default_value, default_value, hidden, parent, desc
-            )
-            self._save_settings()
-        return self.settings[name]
+        spec = SettingSpec(
+            name, default_value, hidden=hidden, parent=parent, description=desc
+        )
+        return self._declare(spec)
 
     def create_range(
         self,
@@ -65,26 +222,16 @@ class SettingsManager:
         desc: str = "",
     ) -> RangeSetting:
         """Create a setting that can have a value between min_value and max_value."""
-        try:
-            self.settings[name].default_value = default_value
-            self.settings[name].min_value = min_value
-            self.settings[name].max_value = max_value
-            self.settings[name].hidden = hidden
-            self.settings[name].parent = parent
-            self.settings[name].description = desc
-        except KeyError:
-            self.settings[name] = RangeSetting(
-                name,
-                default_value,
-                default_value,
-                min_value,
-                max_value,
-                hidden=hidden,
-                parent=parent,
-                description=desc,
-            )
-            self._save_settings()
-        return self.settings[name]
+        spec = SettingSpec(
+            name,
+            default_value,
+            min_value=min_value,
+            max_value=max_value,
+            hidden=hidden,
+            parent=parent,
+            description=desc,
+        )
+        return self._declare(spec)
 
     def create_option(
         self,
@@ -96,33 +243,25 @@ class SettingsManager:
         desc: str = "",
     ) -> OptionSetting:
         """Create a setting that can have a value from a list of options."""
-        try:
-            self.settings[name].default_value = default_value
-            self.settings[name].options = options
-            self.settings[name].hidden = hidden
-            self.settings[name].parent = parent
-            self.settings[name].description = desc
-        except KeyError:
-            self.settings[name] = OptionSetting(
-                name,
-                default_value,
-                default_value,
-                options=options,
-                hidden=hidden,
-                parent=parent,
-                description=desc,
-            )
-        self._save_settings()
-        return self.settings[name]
+        spec = SettingSpec(
+            name,
+            default_value,
+            options=options,
+            hidden=hidden,
+            parent=parent,
+            description=desc,
+        )
+        return self._declare(spec)
 
     def get(self, name: str, default_value=None) -> Setting:
         """Get a setting by name, returns a new setting if not found."""
         try:
             return self.settings[name]
         except KeyError:
-            self.settings[name] = Setting(name, default_value, default_value)
+            setting = self._add(name, Setting(name, default_value, default_value))
+            self._mark_dirty(name)
             self._save_settings()
-            return name
+            return setting
 
     def get_float(self, name) -> float:
         """Returns the value of a setting as a float."""
@@ -133,10 +272,14 @@ class SettingsManager:
         return int(self.get(name).value)
 
     def set_value(self, name: str, value: any) -> None:
-        """Set the value of a setting by name, create a new setting if not found."""
+        """Set the value of a setting by name, create a new setting if not found.
+
+        The change is saved after a short delay, call save() to save it now.
+        """
         try:
             self.settings[name].value = value
         except KeyError:
-            self.settings[name] = Setting(name, value)
+            self._add(name, Setting(name, value))
         finally:
-            self._save_settings()
+            self._mark_dirty(name)
+            self._schedule_save()
@@ -0,0 +1,129 @@
+from setting import Setting
+from setting import OptionSetting
+from setting import RangeSetting
+from setting import get_coercer
+
+
+class SettingSpec:
+    """Declaration of a setting, compiled once into a Setting."""
+
+    __slots__ = (
+        "name",
+        "default_value",
+        "value_type",
+        "options",
+        "min_value",
+        "max_value",
+        "hidden",
+        "parent",
+        "description",
+        "_coerce",
+        "_option_set",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        default_value,
+        options: list = None,
+        min_value: int | float = None,
+        max_value: int | float = None,
+        hidden: bool = False,
+        parent: str = "",
+        description: str = "",
+        value_type: type = None,
+    ) -> None:
+        self.name = name
+        self.default_value = default_value
+        self.value_type = type(default_value) if value_type is None else value_type
+        self.options = None if options is None else OptionSetting.to_str_list(options)
+        self.min_value = min_value
+        self.max_value = max_value
+        self.hidden = hidden
+        self.parent = parent
+        self.description = description
+        self._coerce = get_coercer(self.value_type)
+        self._option_set = None if options is None else frozenset(self.options)
+
+    def validate(self, value):
+        """Return value converted to the setting type or the default if invalid."""
+        try:
+            value = self._coerce(value)
+        except (TypeError, ValueError):
+            return self.default_value
+        if self._option_set is not None and str(value) not in self._option_set:
+            return self.default_value
+        if self.min_value is not None and value < self.min_value:
+            return self.min_value
+        if self.max_value is not None and value > self.max_value:
+            return self.max_value
+        return value
+
+    @property
+    def setting_class(self) -> type:
+        if self.options is not None:
+            return OptionSetting
+        if self.min_value is not None:
+            return RangeSetting
+        return Setting
+
+    def compile(self, value) -> Setting:
+        """Return a new setting with a value that is already validated."""
+        kwargs = dict(
+            hidden=self.hidden,
+            parent=self.parent,
+            description=self.description,
+            value_type=self.value_type,
+        )
+        if self.setting_class is OptionSetting:
+            return OptionSetting(
+                self.name, value, self.default_value, self.options, **kwargs
+            )
+        if self.setting_class is RangeSetting:
+            return RangeSetting(
+                self.name,
+                value,
+                self.default_value,
+                self.min_value,
+                self.max_value,
+                **kwargs,
+            )
+        return Setting(self.name, value, self.default_value, **kwargs)
+
+    def apply(self, setting: Setting) -> None:
+        """Update an existing setting with the declared metadata."""
+        setting.default_value = self.default_value
+        setting.hidden = self.hidden
+        setting.parent = self.parent
+        setting.description = self.description
+        if self.options is not None:
+            setting.options = self.options
+        if self.min_value is not None:
+            setting.min_value = self.min_value
+            setting.max_value = self.max_value
+
+
+class SettingsSchema:
+    """Ordered collection of setting declarations."""
+
+    def __init__(self, specs: list[SettingSpec] = None) -> None:
+        self.specs = {spec.name: spec for spec in specs or []}
+
+    def add(self, spec: SettingSpec) -> SettingSpec:
+        self.specs[spec.name] = spec
+        return spec
+
+    def validate(self, settings_dict: dict) -> dict:
+        """Return the declared values in settings_dict in one pass.
+
+        Settings_dict maps names to stored setting dicts, declared settings
+        that are missing get their default value.
+        """
+        values = dict()
+        for name, spec in self.specs.items():
+            stored = settings_dict.get(name)
+            if stored is None or "value" not in stored:
+                values[name] = spec.default_value
+                continue
+            values[name] = spec.validate(stored["value"])
+        return values
@@ -0,0 +1,200 @@
+import getpass
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # Windows locks files with msvcrt instead.
+    fcntl = None
+    import msvcrt
+
+# How long a second launch waits for the running instance to answer.
+CONNECT_TIMEOUT = 0.5
+# How often a launch that lost the race retries while the winner starts listening.
+RETRY_INTERVAL = 0.1
+
+
+def _get_address_file(name: str) -> str:
+    """Return the socket path, or the file with the port where sockets are TCP."""
+    filename = f"{name}-{getpass.getuser()}"
+    suffix = ".sock" if hasattr(socket, "AF_UNIX") else ".port"
+    return os.path.join(tempfile.gettempdir(), filename + suffix)
+
+
+def _connect(name: str) -> socket.socket:
+    """Connect to the running instance, raise OSError if there is none."""
+    address_file = _get_address_file(name)
+    if hasattr(socket, "AF_UNIX"):
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        address = address_file
+    else:
+        with open(address_file) as file:
+            port = int(file.read())
+        client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        address = ("127.0.0.1", port)
+    client.settimeout(CONNECT_TIMEOUT)
+    try:
+        client.connect(address)
+    except OSError:
+        client.close()
+        raise
+    return client
+
+
+def _acquire_lock(filename: str):
+    """Return the open lock file, or None if another process holds the lock.
+
+    The lock is released when the file is closed or the process exits, so a
+    crashed instance never leaves a stale lock behind.
+    """
+    file = open(filename, "a")
+    try:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        file.close()
+        return None
+    return file
+
+
+def send_command(name: str, command: str, *args: str, retry_for: float = 0) -> bool:
+    """Send a command to the running instance, return False if none is running.
+
+    With retry_for, connecting is retried for that many seconds, for an
+    instance that holds the lock but is not listening yet.
+    """
+    deadline = time.monotonic() + retry_for
+    while not _send_command(name, command, *args):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(RETRY_INTERVAL)
+    return True
+
+
+def _send_command(name: str, command: str, *args: str) -> bool:
+    try:
+        client = _connect(name)
+    except (OSError, ValueError):
+        return False
+    with client:
+        message = json.dumps({"command": command, "args": list(args)}) + "\n"
+        try:
+            client.sendall(message.encode("utf-8"))
+            # Wait for the answer so the command is received before exiting.
+            client.recv(16)
+        except OSError:
+            return False
+    return True
+
+
+class InstanceServer:
+    """Receive commands from later launches of the program.
+
+    start() takes a lock file and listens before the app is built, so two
+    launches at the same time cannot both start an app. Commands received
+    before set_handler() are kept until then. The handler is called with the
+    command and its arguments on the server thread.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._address_file = _get_address_file(name)
+        self._handler = None
+        # Commands received before the handler was set.
+        self._pending = []
+        self._handler_lock = threading.Lock()
+        self._lock_file = None
+        self._server = None
+        self._thread = None
+
+    def start(self) -> bool:
+        """Start listening, return False if another instance holds the lock."""
+        lock_file = _acquire_lock(self._address_file + ".lock")
+        if lock_file is None:
+            return False
+        try:
+            self._server = self._create_server()
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        self._thread = threading.Thread(
+            target=self._serve, name="InstanceServer", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def set_handler(self, handler: callable) -> None:
+        """Pass commands to handler, starting with the ones received so far."""
+        with self._handler_lock:
+            self._handler = handler
+            for command in self._pending:
+                handler(*command)
+            self._pending = []
+
+    def _create_server(self) -> socket.socket:
+        if hasattr(socket, "AF_UNIX"):
+            # A socket file left by a crashed instance blocks bind, remove it.
+            # Only the lock holder gets here, so it never belongs to a live one.
+            if os.path.exists(self._address_file):
+                os.remove(self._address_file)
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            # Create the socket file only accessible by the user, a chmod after
+            # bind leaves a moment where other users could connect.
+            umask = os.umask(0o177)
+            try:
+                server.bind(self._address_file)
+            finally:
+                os.umask(umask)
+        else:
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server.bind(("127.0.0.1", 0))
+            with open(self._address_file, "w") as file:
+                file.write(str(server.getsockname()[1]))
+        server.listen()
+        return server
+
+    def _serve(self) -> None:
+        server = self._server
+        while True:
+            try:
+                connection, _ = server.accept()
+            except OSError:
+                # The server socket was closed.
+                return
+            with connection:
+                self._handle_connection(connection)
+
+    def _handle_connection(self, connection: socket.socket) -> None:
+        connection.settimeout(CONNECT_TIMEOUT)
+        try:
+            with connection.makefile("r", encoding="utf-8") as file:
+                message = json.loads(file.readline())
+            command = (message["command"], *message.get("args", []))
+            with self._handler_lock:
+                if self._handler is None:
+                    self._pending.append(command)
+                else:
+                    self._handler(*command)
+            connection.sendall(b"ok\n")
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+
+    def close(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        self._server = None
+        if os.path.exists(self._address_file):
+            os.remove(self._address_file)
+        # Released last, the next instance may remove the socket file once it
+        # holds the lock.
+        self._lock_file.close()
+        self._lock_file = None
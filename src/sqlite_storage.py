@@ -0,0 +1,128 @@
+import contextlib
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+
+from journal_storage import JournalStorage
+from storage import Storage
+
+
+class SQLiteStorage(Storage):
+    """Storage that keeps each top-level key in its own SQLite row.
+
+    Values are loaded lazily the first time a key is read, and a flush only
+    writes the rows of the keys that changed.
+    """
+
+    def __init__(self, filename, **kwargs) -> None:
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        # The connection is shared by the UI thread and the flusher.
+        self._db_lock = threading.Lock()
+        self._setup_database()
+        super().__init__(filename, **kwargs)
+
+    def _setup_database(self) -> None:
+        with self._db_lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS objects (key TEXT PRIMARY KEY, data TEXT)"
+            )
+            self._connection.commit()
+
+    def _read(self) -> dict:
+        """Return the cache of loaded keys"""
+        if self._data is None:
+            self._data = dict()
+        return self._data
+
+    def _load_key(self, key) -> dict:
+        """Load the row at key or None if the key is not found"""
+        with self._db_lock:
+            row = self._connection.execute(
+                "SELECT data FROM objects WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def read_object(self, key) -> dict:
+        """Return dict at key or None if key is not found"""
+        data = self._read()
+        with self._lock:
+            loaded = key in data
+            value = data.get(key)
+        if not loaded:
+            value = self._load_key(key)
+            with self._lock:
+                # Keep a value saved while the row was loading.
+                value = data.setdefault(key, value)
+        return self._decompress_key(key, value)
+
+    def keys(self) -> list:
+        """Return the keys of all saved objects, without loading their rows."""
+        with self._db_lock:
+            rows = self._connection.execute("SELECT key FROM objects").fetchall()
+        data = self._read()
+        with self._lock:
+            # Saved keys are only in the database after the next flush.
+            return list(dict.fromkeys([row[0] for row in rows] + list(data)))
+
+    def _write(self, data: dict, dirty_keys: set) -> None:
+        """Write the rows of the dirty keys"""
+        rows = []
+        for key in dirty_keys:
+            rows.append((key, json.dumps(self._encode_value(data[key]))))
+        with self._db_lock:
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO objects (key, data) VALUES (?, ?)", rows
+                )
+
+    def _is_empty(self) -> bool:
+        with self._db_lock:
+            row = self._connection.execute("SELECT 1 FROM objects LIMIT 1").fetchone()
+        return row is None
+
+    def migrate_from_json(self, json_filename) -> bool:
+        """Import a JSON storage file into an empty database.
+
+        The imported files are renamed with a .migrated suffix so the migration
+        only runs once. Returns True if anything was imported.
+        """
+        if not os.path.exists(json_filename) or not self._is_empty():
+            return False
+        old_storage = JournalStorage(json_filename)
+        for key in old_storage.keys():
+            self.save_object(key, old_storage.read_object(key))
+        self.flush()
+        for filename in old_storage.filenames:
+            if os.path.exists(filename):
+                os.replace(filename, filename + ".migrated")
+        return True
+
+    def close(self) -> None:
+        """Write unsaved changes and close the database."""
+        super().close()
+        with self._db_lock:
+            self._connection.close()
+
+
+def read_object_read_only(filename, key) -> dict:
+    """Return dict at key of a database without changing it, None if not found.
+
+    Raises sqlite3.DatabaseError if the file is not a storage database.
+    """
+    uri = pathlib.Path(filename).resolve().as_uri() + "?mode=ro"
+    with contextlib.closing(sqlite3.connect(uri, uri=True)) as connection:
+        row = connection.execute(
+            "SELECT data FROM objects WHERE key = ?", (key,)
+        ).fetchone()
+    if row is None:
+        return None
+    value = json.loads(row[0])
+    if Storage._is_compressed(value):
+        return Storage._decode_value(value)
+    return value
@@ -0,0 +1,86 @@
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Record wall time and the net change in memory blocks for each phase.
+
+    Allocations are only traced with trace_memory, tracing slows Python down
+    and would inflate the wall times. A disabled profiler records nothing, so
+    phases can always be wrapped.
+    """
+
+    def __init__(self, enabled: bool = False, trace_memory: bool = False) -> None:
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.phases = []
+        self._depth = 0
+        self._start_time = time.perf_counter()
+
+    def start(self) -> None:
+        """Start the clock and tracing, call before the first phase."""
+        if not self.enabled:
+            return
+        self._start_time = time.perf_counter()
+        if self.trace_memory:
+            tracemalloc.start()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Record the time and memory of the code inside the with block."""
+        if not self.enabled:
+            yield
+            return
+        phase = {"name": name, "depth": self._depth}
+        self.phases.append(phase)
+        self._depth += 1
+        start_blocks = sys.getallocatedblocks()
+        if self.trace_memory:
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            phase["wall_ms"] = (time.perf_counter() - start_time) * 1000
+            if self.trace_memory:
+                net_memory = tracemalloc.get_traced_memory()[0] - start_memory
+                phase["net_traced_kb"] = net_memory / 1024
+            else:
+                # Blocks allocated minus blocks freed, not the allocation count.
+                # Tracing changes the allocator, so it is only used without it.
+                phase["net_blocks"] = sys.getallocatedblocks() - start_blocks
+            self._depth -= 1
+
+    def report(self) -> dict:
+        total_ms = (time.perf_counter() - self._start_time) * 1000
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "total_ms": total_ms,
+            "traced_memory": self.trace_memory,
+            "phases": self.phases,
+        }
+        if self.trace_memory:
+            report["peak_traced_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+        return report
+
+    def summary(self, report: dict) -> str:
+        """Return a one-line summary of the top level phases."""
+        phases = ", ".join(
+            f"{phase['name']} {phase['wall_ms']:.1f} ms"
+            for phase in report["phases"]
+            if phase["depth"] == 0
+        )
+        return f"Startup {report['total_ms']:.1f} ms ({phases})"
+
+    def finish(self, filename: str) -> str:
+        """Write the report to filename and return the summary."""
+        report = self.report()
+        if self.trace_memory:
+            tracemalloc.stop()
+        with open(filename, "w") as file:
+            json.dump(report, file, indent=2)
+        return self.summary(report)
@@ -1,37 +1,191 @@
+import base64
 import json
+import os
+import threading
+import zlib
+
+from lazy_import import lazy_module
+
+# Marks a stored value as compressed, the value holds the compressed JSON.
+COMPRESSED_KEY = "__compressed__"
+# lzma is rarely used and slow to import, it is loaded when first needed.
+COMPRESSORS = {"zlib": zlib, "lzma": lazy_module("lzma")}
 
 
 class Storage:
     """Save and read dictionaries from a file"""
 
-    def __init__(self, filename) -> None:
+    def __init__(
+        self,
+        filename,
+        write_behind: bool = False,
+        flush_interval: float = 1.0,
+        compress_threshold: int = None,
+        compression: str = "zlib",
+    ) -> None:
         self._filename = filename
         self._data = None
+        if compression not in COMPRESSORS:
+            raise ValueError(f"Unknown compression '{compression}'")
+        # Values with more JSON characters than this are compressed, None disables.
+        self._compress_threshold = compress_threshold
+        self._compression = compression
+        # Stored form of keys whose in-memory value is decompressed or changed.
+        self._encoded = dict()
+        self._dirty_keys = set()
+        # Guards _data and _dirty_keys, only held for short in-memory updates.
+        self._lock = threading.Lock()
+        # Serializes writes so the flusher and flush() never write at once.
+        self._flush_lock = threading.Lock()
+        self._write_behind = write_behind
+        self._flush_interval = flush_interval
+        self._flush_requested = threading.Event()
+        self._closed = threading.Event()
+        self._flusher = None
+        if write_behind:
+            self._start_flusher()
+
+    def _start_flusher(self) -> None:
+        """Start the background thread that writes dirty data to disk."""
+        self._flusher = threading.Thread(
+            target=self._run_flusher, name="StorageFlusher", daemon=True
+        )
+        self._flusher.start()
+
+    def _run_flusher(self) -> None:
+        """Wait for saves and coalesce them into one write per interval."""
+        while not self._closed.is_set():
+            self._flush_requested.wait()
+            # Saves made while waiting are included in the same write.
+            self._closed.wait(self._flush_interval)
+            self._flush_requested.clear()
+            try:
+                self.flush()
+            except OSError:
+                # The keys stay dirty and are retried on the next save or flush.
+                pass
 
     def _read(self) -> dict:
         """Return data from file or empty dict if file is not found"""
         if self._data is None:
-            try:
-                with open(self._filename, "r") as file:
-                    file_content = file.read()
-                self._data = json.loads(file_content)
-            except FileNotFoundError:
-                self._data = dict()
+            self._data = self._load()
         return self._data
 
-    def _write(self) -> None:
-        """Write data to file, will overwrite existing file"""
-        json_data = json.dumps(self._data, indent=2)
-        with open(self._filename, "w") as file:
-            file.write(json_data)
+    def _load(self) -> dict:
+        """Load all data from file"""
+        try:
+            with open(self._filename, "r") as file:
+                file_content = file.read()
+            return json.loads(file_content)
+        except FileNotFoundError:
+            return dict()
+
+    def _write(self, data: dict, dirty_keys: set) -> None:
+        """Write data to file, will atomically replace the existing file"""
+        json_data = json.dumps(self._encode(data, dirty_keys), indent=2)
+        self._replace_file(self._filename, json_data)
+
+    @staticmethod
+    def _replace_file(filename: str, content: str) -> None:
+        """Write content to a temporary file and rename it over filename."""
+        temp_filename = filename + ".tmp"
+        with open(temp_filename, "w") as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_filename, filename)
+
+    def _encode(self, data: dict, dirty_keys: set) -> dict:
+        """Return data in stored form, only dirty keys are compressed again"""
+        # Compress without the lock, saves on the UI thread must not wait for it.
+        encoded = {key: self._encode_value(data[key]) for key in dirty_keys}
+        with self._lock:
+            self._encoded.update(encoded)
+            stored = dict(self._encoded)
+        return {key: stored.get(key, value) for key, value in data.items()}
+
+    def _encode_value(self, value):
+        """Return the value compressed if it is larger than the threshold"""
+        if self._compress_threshold is None:
+            return value
+        json_value = json.dumps(value)
+        if len(json_value) <= self._compress_threshold:
+            return value
+        compressor = COMPRESSORS[self._compression]
+        compressed = compressor.compress(json_value.encode("utf-8"))
+        return {
+            COMPRESSED_KEY: self._compression,
+            "data": base64.b64encode(compressed).decode("ascii"),
+        }
+
+    @staticmethod
+    def _is_compressed(value) -> bool:
+        return isinstance(value, dict) and COMPRESSED_KEY in value
+
+    @staticmethod
+    def _decode_value(value):
+        """Return the decompressed value"""
+        compressor = COMPRESSORS[value[COMPRESSED_KEY]]
+        json_value = compressor.decompress(base64.b64decode(value["data"]))
+        return json.loads(json_value)
+
+    def _decompress_key(self, key, value):
+        """Return value decompressed and keep the decompressed value in memory"""
+        if not self._is_compressed(value):
+            return value
+        decoded = self._decode_value(value)
+        with self._lock:
+            # Only replace the value if it was not saved while decompressing.
+            if self._data.get(key) is value:
+                self._data[key] = decoded
+                self._encoded[key] = value
+        return decoded
 
     def read_object(self, key) -> dict:
         """Return dict at key or None if key is not found"""
         data = self._read()
-        return data.get(key, None)
+        return self._decompress_key(key, data.get(key, None))
+
+    def keys(self) -> list:
+        """Return the keys of all saved objects."""
+        data = self._read()
+        with self._lock:
+            return list(data)
 
     def save_object(self, key, data: dict) -> None:
         """Save dict at the specified key"""
-        self._data = self._read()
-        self._data[key] = data
-        self._write()
+        self._read()
+        with self._lock:
+            self._data[key] = data
+            self._dirty_keys.add(key)
+        if self._write_behind:
+            self._flush_requested.set()
+            return
+        self.flush()
+
+    def flush(self) -> None:
+        """Write all unsaved changes to disk."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty_keys:
+                    return
+                dirty_keys = self._dirty_keys
+                self._dirty_keys = set()
+                # Shallow copy so saves on other threads can continue while writing.
+                data = dict(self._data)
+            try:
+                self._write(data, dirty_keys)
+            except OSError:
+                # Keep the keys dirty so the next flush retries them.
+                with self._lock:
+                    self._dirty_keys |= dirty_keys
+                raise
+
+    def close(self) -> None:
+        """Write unsaved changes and stop the background flusher."""
+        self._closed.set()
+        self._flush_requested.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
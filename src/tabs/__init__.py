@@ -1,4 +1,19 @@
-from .note_tab import NoteTab
-from .converter_tab import ConverterTab
-from .text_manipulator_tab import TextManipulatorTab
-from .settings_tab import SettingsTab
+import importlib
+
+# Modules are imported the first time one of their names is used.
+_MODULES = {
+    "NoteTab": ".note_tab",
+    "ConverterTab": ".converter_tab",
+    "TextManipulatorTab": ".text_manipulator_tab",
+    "SettingsTab": ".settings_tab",
+}
+
+
+def __getattr__(name: str):
+    try:
+        module_name = _MODULES[name]
+    except KeyError:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -4,11 +4,29 @@ from widgets import Entry
 
 
 class ConverterTab(Tab):
-    def create_content(self):
+    def setup(self) -> None:
         self._converter = Converter()
+
+    def create_content(self):
         self._create_widgets()
         self._input_box.bind("<KeyRelease>", lambda event: self._on_input_changed())
 
+    def get_commands(self) -> list[tuple[str, callable]]:
+        return [
+            (f"Convert: {unit}", lambda unit=unit: self.start_conversion(unit))
+            for unit in self._converter.units
+        ]
+
+    def start_conversion(self, unit: str) -> None:
+        """Show the tab with the unit entered and the value selected."""
+        self.app.tabview.show_tab(self.title)
+        self._input_box.delete(0, ctk.END)
+        self._input_box.insert(0, "1 " + unit)
+        self._input_box.select_range(0, 1)
+        self._input_box.icursor(1)
+        self._input_box.focus_set()
+        self._on_input_changed()
+
     def _create_widgets(self) -> None:
         self._input_box = ctk.CTkEntry(self.tab, placeholder_text="5 cm")
         self._input_box.pack(fill="x", pady=8)
@@ -66,6 +84,10 @@ class Converter:
             "inches": Conversions.convert_inches_to_cm,
         }
 
+    @property
+    def units(self) -> list[str]:
+        return list(self._converter_dict)
+
     def convert(
         self, value: float, unit: str, decimal_places: int = 2
     ) -> tuple[float, str]:
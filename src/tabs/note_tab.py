@@ -1,14 +1,37 @@
 import customtkinter as ctk
 from .tab import Tab
 from widgets import Textbox
+from settings_schema import SettingSpec
+from settings_schema import SettingsSchema
+
+NOTEPAD_SETTINGS = SettingsSchema(
+    [
+        SettingSpec(
+            "notepad_autosave",
+            True,
+            parent="Notepad",
+            description="Automatically save when typing. "
+            "The notepad will not save if option is disabled.",
+        ),
+        SettingSpec(
+            "notepad_font_size",
+            12,
+            options=[12, 14, 16, 18, 20],
+            parent="Notepad",
+            description="Set the font size of the notepad.",
+        ),
+    ]
+)
 
 
 class NoteTab(Tab):
+    def setup(self) -> None:
+        self._create_settings()
+
     def create_content(self) -> None:
         self._notes = dict()
         self._auto_save_after_id = None
         self._font = "TkDefaultFont"
-        self._create_settings()
         self._create_textbox()
         self._load_notes()
         self._set_saving_behaviour()
@@ -21,34 +44,21 @@ class NoteTab(Tab):
         self.text.pack(fill=ctk.BOTH, expand=True)
 
     def _create_settings(self) -> None:
-        self._create_auto_save_setting()
-        self._create_font_size_setting()
-
-    def _create_font_size_setting(self):
-        DESC = "Set the font size of the notepad."
-        size_options = [12, 14, 16, 18, 20]
-        self.font_size_setting = self.app.settings.create_option(
-            "notepad_font_size",
-            size_options[0],
-            options=size_options,
-            parent="Notepad",
-            desc=DESC,
-        )
-        self.font_size_setting.on_change = self._set_font_size
+        settings = self.app.settings.register(NOTEPAD_SETTINGS)
+        self.auto_save_setting = settings["notepad_autosave"]
+        self.subscribe(self.auto_save_setting, self._set_saving_behaviour)
+        self.font_size_setting = settings["notepad_font_size"]
+        self.subscribe(self.font_size_setting, self._set_font_size)
 
     def _set_font_size(self) -> None:
+        if not self.is_built:
+            return
         font_size = self.font_size_setting.value
         self.text.configure(font=(self._font, font_size))
 
-    def _create_auto_save_setting(self) -> None:
-        """Create a boolean setting to enable/disable auto save."""
-        DESC = "Automatically save when typing. The notepad will not save if option is disabled."
-        self.auto_save_setting = self.app.settings.create(
-            "notepad_autosave", True, parent="Notepad", desc=DESC
-        )
-        self.auto_save_setting.on_change = self._set_saving_behaviour
-
     def _set_saving_behaviour(self) -> None:
+        if not self.is_built:
+            return
         if self.auto_save_setting.value:
             # Save the note when the user stops typing
             self.text.on_key_released(lambda _: self._auto_save())
@@ -65,6 +75,7 @@ class NoteTab(Tab):
     def _save_on_destroy(self) -> None:
         """Save note when user exits the app."""
         if self.auto_save_setting.value and self._auto_save_after_id is not None:
+            self.app.after_cancel(self._auto_save_after_id)
             self._save_note()
 
     def _load_notes(self) -> None:
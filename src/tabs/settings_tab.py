@@ -1,30 +1,57 @@
+from abc import ABC
+from abc import abstractmethod
+
 import customtkinter as ctk
 
 from widgets import ToolTip
 from .tab import Tab
 from settings_manager import Setting
+from settings_manager import SettingsManager
 from widgets import TabView
 from widgets import Slider
-from setting import Setting
-from setting import RangeSetting
+from widgets import VirtualList
 
 
 class SettingsTab(Tab):
+    ROW_HEIGHT = 34
+
     def __init__(self, app, tabview: TabView, title: str) -> None:
         super().__init__(app, tabview, title, visibility_setting=False)
 
-    def create_content(self) -> None:
+    def setup(self) -> None:
         self.settings = self.app.settings
-        self._pady = 2
+
+    def create_content(self) -> None:
         self._create_settings_widgets()
 
+    def get_commands(self) -> list[tuple[str, callable]]:
+        commands = []
+        for kind, setting in self._get_rows():
+            if kind == "parent":
+                continue
+            name = f"Setting: {clean_name(setting.name)}"
+            commands.append((name, lambda name=setting.name: self.show_setting(name)))
+        return commands
+
+    def show_setting(self, name: str) -> None:
+        """Show the tab scrolled to the row of a setting."""
+        self.app.tabview.show_tab(self.title)
+        for index, (kind, item) in enumerate(self._rows):
+            if kind != "parent" and item.name == name:
+                self.settings_list.scroll_to(index)
+                return
+
     def _create_settings_widgets(self) -> None:
-        self.settings_frame = ctk.CTkScrollableFrame(self.tab)
-        self.settings_frame.pack(fill="both", expand=True)
-        self.settings_frame.grid_columnconfigure(0, weight=0)
-        self.settings_frame.grid_columnconfigure(1, weight=1)
+        self.settings_list = VirtualList(
+            self.tab,
+            create_row=self._create_row,
+            bind_row=lambda row, item: row.bind_item(item),
+            row_height=self.ROW_HEIGHT,
+        )
+        self.settings_list.pack(fill="both", expand=True)
         self._create_bottom_btn_frame()
-        self._draw_settings(self._get_parents())
+        self._rows = self._get_rows()
+        self.settings_list.set_items(self._rows)
 
     def _create_bottom_btn_frame(self):
         """Create the frame containing the exit and restart buttons."""
@@ -51,137 +78,164 @@ class SettingsTab(Tab):
             font=button_font,
         ).grid(row=0, column=1, sticky=ctk.EW, padx=5, pady=2)
 
-    def _draw_settings(self, parents: list) -> None:
-        current_row = 0
-        for parent in parents:
-            if len(parent) > 0:
-                self._create_parent_label(parent, current_row)
-                current_row += 1
-            current_row = self._draw_settings_for_parent(parent, current_row)
-
-    def _draw_settings_for_parent(self, parent_name: str, grid_row: int) -> int:
-        for setting in self.settings.settings.values():
-            if setting.parent == parent_name:
-                self._draw_setting(setting, grid_row)
-                grid_row += 1
-        return grid_row
-
-    def _create_parent_label(self, name: str, grid_row: int) -> None:
-        text = self._clean_name(name)
-        text = text.upper()
-        font = ("TkDefaultFont", 14, "bold")
-        parent_label = ctk.CTkLabel(self.settings_frame, text=text, font=font)
-        parent_label.grid(row=grid_row, column=0, sticky=ctk.W, pady=(10, 0))
+    def _get_rows(self) -> list[tuple[str, any]]:
+        """Return a (kind, item) pair for every group label and visible setting."""
+        rows = []
+        visible = dict()
+        for setting in self.settings.visible():
+            visible.setdefault(setting.parent, []).append(setting)
+        for parent in self._get_parents():
+            settings = visible.get(parent, [])
+            if len(parent) > 0 and settings:
+                rows.append(("parent", parent))
+            rows.extend((self._get_row_kind(setting), setting) for setting in settings)
+        return rows
 
     def _get_parents(self) -> list:
-        parents = []
-        for setting in self.settings.settings.values():
-            if setting.parent is not None and setting.parent not in parents:
-                parents.append(setting.parent)
-        return parents
-
-    def _draw_setting(self, setting: Setting, grid_row: int) -> None:
-        if setting.hidden:
-            return
-        clean_name = self._clean_name(setting.name)
-        label = self._create_label(
-            self.settings_frame, clean_name, 0, grid_row, self._pady
-        )
-        self.create_description_tooltip(label, setting.description)
+        return [parent for parent in self.settings.parents() if parent is not None]
+
+    @staticmethod
+    def _get_row_kind(setting: Setting) -> str:
         if hasattr(setting, "options"):
-            self._draw_option_setting(setting, grid_row)
-            return
+            return "segmented" if len(setting.options) <= 5 else "dropdown"
         elif setting.value_type is bool:
-            self._create_checkbox_widget(setting, grid_row)
-            return
+            return "checkbox"
         elif hasattr(setting, "min_value") and hasattr(setting, "max_value"):
-            self._create_slider_widget(setting, grid_row)
-            return
-        self._create_entry_widget(setting, grid_row)
-
-    def _create_label(
-        self, container, text: str, column: int, row: int, pady=0
-    ) -> ctk.CTkLabel:
-        label = ctk.CTkLabel(container, text=text)
-        label.grid(row=row, column=column, pady=pady, sticky=ctk.W)
-        return label
-
-    def _draw_option_setting(self, setting: Setting, grid_row: int) -> None:
-        if len(setting.options) <= 5:
-            self._create_segmented_widget(setting, grid_row)
-            return
-        self._create_dropdown_widget(setting, grid_row)
+            return "slider"
+        return "entry"
 
-    def _create_dropdown_widget(self, setting: Setting, grid_row: int) -> None:
-        on_dropdown_changed = lambda value, setting=setting: self.settings.set_value(
-            setting.name, setting.value_type(value)
-        )
-        dropdown = ctk.CTkOptionMenu(
-            self.settings_frame, values=setting.options, command=on_dropdown_changed
-        )
-        dropdown.grid(row=grid_row, column=1, padx=5, pady=self._pady, sticky=ctk.E)
-        dropdown.set(str(setting.value))
+    def _create_row(self, master, kind: str) -> ctk.CTkFrame:
+        row_classes = {
+            "parent": ParentRow,
+            "segmented": SegmentedRow,
+            "dropdown": DropdownRow,
+            "checkbox": CheckboxRow,
+            "slider": SliderRow,
+            "entry": EntryRow,
+        }
+        return row_classes[kind](master, self.settings, self.ROW_HEIGHT)
 
-    def _create_segmented_widget(self, setting: Setting, grid_row: int) -> None:
-        on_segmented_changed = lambda value, setting=setting: self.settings.set_value(
-            setting.name, setting.value_type(value)
-        )
-        segmented = ctk.CTkSegmentedButton(
-            self.settings_frame, values=setting.options, command=on_segmented_changed
-        )
-        segmented.grid(row=grid_row, column=1, padx=5, pady=self._pady, sticky=ctk.E)
-        segmented.set(str(setting.value))
 
-    def _create_slider_widget(self, setting: RangeSetting, grid_row: int) -> None:
-        on_slider_changed = lambda value, setting=setting: self.settings.set_value(
-            setting.name, value
-        )
-        slider = Slider(
-            self.settings_frame,
-            from_=setting.min_value,
-            to=setting.max_value,
-            command=on_slider_changed,
-        )
-        slider.grid(row=grid_row, column=1, pady=self._pady, sticky=ctk.E, padx=(50, 0))
-        slider.set(setting.value)
-
-    def _create_entry_widget(self, setting: Setting, grid_row: int) -> None:
-        entry_setting_value = ctk.CTkEntry(self.settings_frame)
-        entry_setting_value.grid(row=grid_row, column=1, padx=5, pady=self._pady)
-        if type(entry_setting_value) is ctk.CTkEntry:
-            entry_setting_value.insert(ctk.END, setting.value)
-            entry_setting_value.bind(
-                "<KeyRelease>",
-                lambda event, setting=setting: self._entry_changed(event, setting),
-            )
-
-    def _create_checkbox_widget(self, setting: Setting, grid_row: int) -> None:
-        on_checkbox_changed = lambda: self.settings.set_value(
-            setting.name, checkbox.get()
+def clean_name(name: str) -> str:
+    """Return string without underscores and with title case."""
+    return name.replace("_", " ").title()
+
+
+class ParentRow(ctk.CTkFrame):
+    """Row with the name of a group of settings."""
+
+    def __init__(self, master, settings: SettingsManager, height: int) -> None:
+        super().__init__(master, height=height, fg_color="transparent")
+        self.grid_propagate(False)
+        self.rowconfigure(0, weight=1)
+        font = ("TkDefaultFont", 14, "bold")
+        self._label = ctk.CTkLabel(self, text="", font=font)
+        self._label.grid(row=0, column=0, sticky=ctk.SW)
+
+    def bind_item(self, parent: str) -> None:
+        self._label.configure(text=clean_name(parent).upper())
+
+
+class SettingRow(ctk.CTkFrame, ABC):
+    """Row with a label and a widget to change a setting.
+
+    Rows are reused, bind_item shows another setting in the same widgets.
+    """
+
+    def __init__(self, master, settings: SettingsManager, height: int) -> None:
+        super().__init__(master, height=height, fg_color="transparent")
+        self.grid_propagate(False)
+        self.columnconfigure(0, weight=0)
+        self.columnconfigure(1, weight=1)
+        self.rowconfigure(0, weight=1)
+        self.settings = settings
+        self.setting = None
+        self._label = ctk.CTkLabel(self, text="")
+        self._label.grid(row=0, column=0, sticky=ctk.W)
+        self._tooltip = ToolTip(self._label, message="")
+        self._create_widget()
+
+    @abstractmethod
+    def _create_widget(self) -> None:
+        """Create the widget that shows and changes the setting."""
+
+    @abstractmethod
+    def _show_value(self) -> None:
+        """Show the value of the bound setting in the widget."""
+
+    def bind_item(self, setting: Setting) -> None:
+        self.setting = setting
+        self._label.configure(text=clean_name(setting.name))
+        self._tooltip.set_message(setting.description)
+        self._show_value()
+
+    def _set_value(self, value) -> None:
+        self.settings.set_value(self.setting.name, value)
+
+
+class SegmentedRow(SettingRow):
+    def _create_widget(self) -> None:
+        self._segmented = ctk.CTkSegmentedButton(self, command=self._set_value)
+        self._segmented.grid(row=0, column=1, padx=5, sticky=ctk.E)
+
+    def _show_value(self) -> None:
+        self._segmented.configure(values=self.setting.options)
+        self._segmented.set(str(self.setting.value))
+
+
+class DropdownRow(SettingRow):
+    def _create_widget(self) -> None:
+        self._dropdown = ctk.CTkOptionMenu(self, command=self._set_value)
+        self._dropdown.grid(row=0, column=1, padx=5, sticky=ctk.E)
+
+    def _show_value(self) -> None:
+        self._dropdown.configure(values=self.setting.options)
+        self._dropdown.set(str(self.setting.value))
+
+
+class CheckboxRow(SettingRow):
+    def _create_widget(self) -> None:
+        self._checkbox = ctk.CTkCheckBox(
+            self, text="", command=lambda: self._set_value(self._checkbox.get())
         )
-        checkbox = ctk.CTkCheckBox(self.settings_frame, text="")
-        checkbox.configure(command=on_checkbox_changed)
-        if setting.value:
-            checkbox.select()
-        checkbox.grid(row=grid_row, column=1, sticky=ctk.E)
-        self.create_description_tooltip(checkbox, setting.description)
+        self._checkbox.grid(row=0, column=1, sticky=ctk.E)
+        self._checkbox_tooltip = ToolTip(self._checkbox, message="")
 
-    @staticmethod
-    def create_description_tooltip(widget, description: str) -> None:
-        if description:
-            ToolTip(widget, description)
+    def _show_value(self) -> None:
+        self._checkbox_tooltip.set_message(self.setting.description)
+        if self.setting.value:
+            self._checkbox.select()
+        else:
+            self._checkbox.deselect()
+
+
+class SliderRow(SettingRow):
+    def _create_widget(self) -> None:
+        self._slider = Slider(self, from_=0, to=1, command=self._set_value)
+        self._slider.grid(row=0, column=1, sticky=ctk.E, padx=(50, 0))
+        # Dragging only applies the value, save once the slider is released.
+        self._slider.bind("<ButtonRelease-1>", lambda _: self.settings.save(), add="+")
+
+    def _show_value(self) -> None:
+        self._slider.configure(from_=self.setting.min_value, to=self.setting.max_value)
+        self._slider.set(self.setting.value)
+
+
+class EntryRow(SettingRow):
+    def _create_widget(self) -> None:
+        self._entry = ctk.CTkEntry(self)
+        self._entry.grid(row=0, column=1, padx=5)
+        self._entry.bind("<KeyRelease>", self._entry_changed)
 
-    def _clean_name(self, name: str) -> str:
-        """Return string without underscores and with title case."""
-        return name.replace("_", " ").title()
+    def _show_value(self) -> None:
+        self._entry.delete("0", ctk.END)
+        self._entry.insert(ctk.END, self.setting.value)
 
-    def _entry_changed(self, event, setting: Setting) -> None:
+    def _entry_changed(self, event) -> None:
         if event.keysym != "Return":
             return
-        entry = event.widget
-        value = entry.get()
+        value = self._entry.get()
         if len(value) == 0:
             return
-        self.settings.set_value(setting.name, value)
-        entry.delete("0", ctk.END)
-        entry.insert(ctk.END, self.settings.get(setting.name).value)
+        self._set_value(value)
+        self._show_value()
@@ -7,11 +7,44 @@ class Tab:
     def __init__(self, app, tabview: TabView, title: str, visibility_setting=True):
         self.title = title
         self.app = app
+        self.is_built = False
+        self.tab = None
+        # (setting, callback) pairs removed again when the tab is destroyed.
+        self._subscriptions = []
         if visibility_setting:
             tab_visible_setting = self._create_visibility_setting()
             if not tab_visible_setting.value:
                 return
-        self.tab = tabview.add(title)
+        self.setup()
+        # The content is created the first time the tab is shown.
+        self.tab = tabview.add(title, on_first_show=self._build)
+
+    def setup(self) -> None:
+        """Create what is needed before the content is built, like settings."""
+
+    def get_commands(self) -> list[tuple[str, callable]]:
+        """Return (name, callback) pairs for the command palette."""
+        return []
+
+    def create_content(self) -> None:
+        """Create the widgets of the tab."""
+
+    def subscribe(self, setting: Setting, callback: callable) -> None:
+        """Call callback when setting changes, until the tab is destroyed."""
+        setting.subscribe(callback)
+        self._subscriptions.append((setting, callback))
+
+    def destroy(self) -> None:
+        """Stop the setting callbacks, the widgets are destroyed with the tab view."""
+        for setting, callback in self._subscriptions:
+            setting.unsubscribe(callback)
+        self._subscriptions = []
+        self.is_built = False
+
+    def _build(self) -> None:
+        if self.is_built:
+            return
+        self.is_built = True
         self.create_content()
 
     def _create_visibility_setting(self) -> Setting:
@@ -1,57 +1,88 @@
+import math
+import time
+
 import customtkinter as ctk
 from .tab import Tab
+from widgets import RegexHighlighter
+from widgets import TextRenderer
 from widgets import Textbox
-import re
+from debounced_task import CancelToken
+from debounced_task import DebouncedTask
+from lazy_import import lazy_module
+from text_tools import PIPELINES_KEY
+from text_tools import Engine
+from text_tools import Pipeline
+from text_tools import PipelineEngine
+from text_tools import TextManipulator
+from text_tools import create_manipulators
+from text_tools import load_pipelines
+from text_tools import parse_steps
+
+regex_sandbox = lazy_module("text_tools.regex_sandbox")
 
 
 class TextManipulatorTab(Tab):
-    def create_content(self):
+    # Seconds between showing the regex matches found so far.
+    PARTIAL_OUTPUT_INTERVAL = 0.2
+
+    def setup(self) -> None:
         self.create_manipulators()
+
+    def create_content(self):
         self.current_manipulator = self.manipulators["Title"]
         self.create_widgets()
+        self._recompute = DebouncedTask(
+            self.tab, self.app.dispatcher, self._prepare_output, self._show_output
+        )
+        self.tab.bind("<Destroy>", lambda _: self._close(), add="+")
+
+    def _close(self) -> None:
+        self._recompute.close()
+        if self._highlighter is not None:
+            self._highlighter.close()
+        if self._regex_sandbox is not None:
+            self._regex_sandbox.close()
+
+    def get_commands(self) -> list[tuple[str, callable]]:
+        return [
+            (f"Text: {name}", lambda name=name: self.select_manipulator(name))
+            for name in self.manipulators
+        ]
+
+    def select_manipulator(self, name: str) -> None:
+        """Show the tab with a manipulator selected."""
+        self.app.tabview.show_tab(self.title)
+        self.option_dropdown.set(name)
+        self.on_option_changed(None)
 
     def create_manipulators(self):
-        self.manipulators = {}
-        title = TextManipulator("Title", lambda text: text.title())
-        self.manipulators[title.name] = title
-        whitespace = TextManipulator("Space", self.refine_text)
-        self.manipulators[whitespace.name] = whitespace
-        upper = TextManipulator("Uppercase", lambda text: text.upper())
-        self.manipulators[upper.name] = upper
-        lower = TextManipulator("Lowercase", lambda text: text.lower())
-        self.manipulators[lower.name] = lower
-        sort_alpha = TextManipulator("Sort Ascending", self.sort_text_asc)
-        self.manipulators[sort_alpha.name] = sort_alpha
-        sort_desc = TextManipulator("Sort Descending", self.sort_text_desc)
-        self.manipulators[sort_desc.name] = sort_desc
-        unique_lines = TextManipulator("Unique", self.unique_lines)
-        self.manipulators[unique_lines.name] = unique_lines
-        regex = TextManipulator("Regex", self._regex)
-        self.manipulators[regex.name] = regex
+        self.manipulators = create_manipulators()
+        # Pipelines are made of the manipulators that only depend on the text.
+        self._steps = dict(self.manipulators)
+        # Regex runs in _prepare_output, it needs the pattern and the sandbox.
+        self.manipulators["Regex"] = TextManipulator("Regex", None)
+        self._builtin_names = frozenset(self.manipulators)
+        saved = self.app.storage.read_object(PIPELINES_KEY)
+        pipelines = load_pipelines(saved, self._steps, self._builtin_names)
+        self.manipulators.update(pipelines)
         self.regex_inputbox = None
-
-    def refine_text(self, text: str) -> str:
-        text = text.strip()
-        text = " ".join(text.split())
-        return text
-
-    def sort_text_asc(self, text: str) -> str:
-        text_list = text.split("\n")
-        text_list = [line for line in text_list if len(line) > 0]
-        text_list = sorted(text_list)
-        return "\n".join(text_list)
-
-    def sort_text_desc(self, text: str) -> str:
-        text_list = text.split("\n")
-        text_list = [line for line in text_list if len(line) > 0]
-        text_list = sorted(text_list, reverse=True)
-        return "\n".join(text_list)
-
-    def unique_lines(self, text: str) -> str:
-        text_list = text.split("\n")
-        text_list = [line for line in text_list if len(line) > 0]
-        text_list = list(set(text_list))
-        return "\n".join(text_list)
+        # Created when the regex manipulator is first used.
+        self._regex_sandbox = None
+        self._highlighter = None
+        # Only the engine of the current manipulator is kept, each engine keeps
+        # a copy of the text.
+        self._engine = None
+        self._engine_manipulator = None
+
+    def _get_engine(self, manipulator: TextManipulator) -> Engine:
+        if self._engine_manipulator is not manipulator:
+            engine = manipulator.create_engine()
+            if isinstance(engine, PipelineEngine):
+                # Keep the results of the steps an edited pipeline still starts with.
+                engine.reuse(self._engine)
+            self._engine = engine
+            self._engine_manipulator = manipulator
+        return self._engine
 
     def create_widgets(self):
         self.configure_main_frame()
@@ -60,38 +91,119 @@ class TextManipulatorTab(Tab):
         self.input_box.bind("<KeyRelease>", self.input_changed)
         self.output_box = ctk.CTkTextbox(self.tab, state="disabled")
         self.output_box.grid(row=0, column=1, padx=2, sticky=ctk.NSEW)
+        self._output_renderer = TextRenderer(self.output_box)
         options = list(self.manipulators.keys())
         self.option_dropdown = ctk.CTkOptionMenu(
             self.tab, values=options, command=self.on_option_changed
         )
         self.option_dropdown.grid(row=1, column=0, padx=2, pady=(5, 0), sticky="SEW")
         self.option_dropdown.set(self.current_manipulator.name)
+        self.pipeline_button = ctk.CTkButton(
+            self.tab, text="Edit pipelines", command=self.edit_pipeline
+        )
+        self.pipeline_button.grid(row=2, column=0, padx=2, pady=(5, 0), sticky="SEW")
 
     def configure_main_frame(self):
         self.tab.columnconfigure(0, weight=1)
         self.tab.columnconfigure(1, weight=1)
         self.tab.rowconfigure(0, weight=1, minsize=250)
         self.tab.rowconfigure(1, weight=0)
+        self.tab.rowconfigure(2, weight=0)
 
     def on_option_changed(self, _):
         self.current_manipulator = self.manipulators[self.option_dropdown.get()]
         self._handle_regex_inputbox()
-        self.input_changed(_)
+        self._recompute.run_now()
 
     def _handle_regex_inputbox(self):
         if self.current_manipulator.name == "Regex":
-            self._create_regex_widget()
+            if self.regex_inputbox is None:
+                self._create_regex_widget()
         elif self.regex_inputbox is not None:
             self.regex_inputbox.destroy()
             self.regex_inputbox = None
+            self._highlighter.set_pattern("")
+
+    def edit_pipeline(self, error: str = "") -> None:
+        """Ask for a pipeline as "name: step > step", no steps deletes it."""
+        lines = [error] if error else []
+        if isinstance(self.current_manipulator, Pipeline):
+            pipeline = self.current_manipulator
+            lines.append(f"Selected: {pipeline.name}: {pipeline.describe()}")
+        lines.append("Steps: " + ", ".join(self._steps))
+        dialog = ctk.CTkInputDialog(
+            title="Pipeline", text="\n".join(lines + ["Name: step > step"])
+        )
+        text = dialog.get_input()
+        if not text:
+            return
+        name, _, steps_text = text.partition(":")
+        name = name.strip()
+        if not name or name in self._builtin_names:
+            self.edit_pipeline(f"Invalid name: {name}")
+            return
+        if not steps_text.strip():
+            self._remove_pipeline(name)
+            return
+        try:
+            steps = parse_steps(steps_text, self._steps)
+        except ValueError as error:
+            self.edit_pipeline(str(error))
+            return
+        self.manipulators[name] = Pipeline(name, steps)
+        self._save_pipelines()
+        self.select_manipulator(name)
+
+    def _remove_pipeline(self, name: str) -> None:
+        if self.manipulators.pop(name, None) is None:
+            return
+        self._save_pipelines()
+        if self.current_manipulator.name == name:
+            self.select_manipulator("Title")
+
+    def _save_pipelines(self) -> None:
+        pipelines = {
+            name: [step.name for step in manipulator.steps]
+            for name, manipulator in self.manipulators.items()
+            if isinstance(manipulator, Pipeline)
+        }
+        self.app.storage.save_object(PIPELINES_KEY, pipelines)
+        self.option_dropdown.configure(values=list(self.manipulators))
+        if self.app.command_palette is not None:
+            self.app.command_palette.invalidate()
 
     def input_changed(self, _):
+        """Update the output once typing pauses."""
+        self._recompute.schedule()
+
+    def _prepare_output(self) -> tuple[int, callable]:
+        """Read the widgets on the main thread and return the job for the output."""
         text = self.input_box.get("1.0", "end")
-        changed_text = self.current_manipulator.change_text(text)
-        self.output_box.configure(state="normal")
-        self.output_box.delete("1.0", ctk.END)
-        self.output_box.insert("1.0", changed_text)
-        self.output_box.configure(state="disabled")
+        manipulator = self.current_manipulator
+        if manipulator.name == "Regex":
+            pattern = self.regex_inputbox.get().strip()
+            # Always off the main thread, waiting for a slow pattern must not
+            # block the window.
+            return math.inf, lambda token: self._search_regex(pattern, text, token)
+        engine = self._get_engine(manipulator)
+
+        def change_text(token: CancelToken) -> str:
+            if engine is None:
+                return manipulator.change_text(text)
+            return "\n".join(engine.update(text, token))
+
+        return len(text), change_text
+
+    def _show_output(self, changed_text: str) -> None:
+        self._output_renderer.render(changed_text)
+
+    def set_input(self, text: str) -> None:
+        """Replace the input text and update the output."""
+        self.input_box.delete("1.0", ctk.END)
+        self.input_box.insert("1.0", text)
+        if self._highlighter is not None:
+            self._highlighter.invalidate()
+        self._recompute.run_now()
 
     def copy_output(self):
         self.output_box.clipboard_clear()
@@ -102,33 +214,39 @@ class TextManipulatorTab(Tab):
             self.tab, placeholder_text="Press enter to apply regex"
         )
         self.regex_inputbox.grid(row=1, column=1, padx=2, pady=(5, 0), sticky="SEW")
-        self.regex_inputbox.bind("<Return>", self.input_changed)
-
-    def _regex(self, text: str) -> str:
-        regex_text = self.regex_inputbox.get()
-        regex_text = regex_text.strip()
-        if len(text) == 0 or len(regex_text) == 0:
+        self.regex_inputbox.bind("<Return>", lambda _: self._recompute.run_now())
+        self.regex_inputbox.bind("<KeyRelease>", self._regex_changed)
+        # Starting the worker process takes a moment, do it before the first search.
+        self._get_regex_sandbox().start()
+        if self._highlighter is None:
+            self._highlighter = RegexHighlighter(
+                self.input_box, self._get_regex_sandbox(), self.app.dispatcher
+            )
+
+    def _regex_changed(self, _) -> None:
+        """Highlight the matches in the input while the pattern is typed."""
+        self._highlighter.set_pattern(self.regex_inputbox.get().strip())
+
+    def _get_regex_sandbox(self):
+        if self._regex_sandbox is None:
+            self._regex_sandbox = regex_sandbox.RegexSandbox()
+        return self._regex_sandbox
+
+    def _search_regex(self, pattern: str, text: str, token=None) -> str:
+        """Return the matches of pattern, showing them while they are found."""
+        if len(text) == 0 or len(pattern) == 0:
             return ""
-        regex = self._compile_regex(regex_text)
-        if regex is None:
-            return "(Invalid regex)"
-        matches = regex.findall(text)
-        if matches is None:
-            return ""
-        return matches
-
-    def _compile_regex(self, regex_text: str):
-        try:
-            regex = re.compile(regex_text)
-            return regex
-        except re.error:
-            return None
-
-
-class TextManipulator:
-    def __init__(self, name, function):
-        self.name = name
-        self.function = function
-
-    def change_text(self, text: str) -> str:
-        return self.function(text)
+        sandbox = self._get_regex_sandbox()
+        shown_at = time.monotonic()
+
+        def show_partial(matches: list[str]) -> None:
+            nonlocal shown_at
+            if token is None:
+                return
+            if time.monotonic() - shown_at < self.PARTIAL_OUTPUT_INTERVAL:
+                return
+            shown_at = time.monotonic()
+            self._recompute.deliver(token, "\n".join(matches))
+
+        result = sandbox.search(pattern, text, token, show_partial)
+        return result.to_text(sandbox.timeout, sandbox.max_matches)
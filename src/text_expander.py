@@ -0,0 +1,160 @@
+import logging
+from collections import deque
+
+from aho_corasick import Automaton
+from settings_schema import SettingSpec
+from settings_schema import SettingsSchema
+from storage import Storage
+
+logger = logging.getLogger(__name__)
+
+SNIPPETS_KEY = "snippets"
+TEXT_EXPANDER_SETTINGS = SettingsSchema(
+    [
+        SettingSpec(
+            "text_expander",
+            False,
+            description="Replace snippet abbreviations typed in any program "
+            "with their text.",
+        ),
+    ]
+)
+# Keys that do not move the cursor, so the typed abbreviation continues.
+MODIFIER_KEYS = frozenset(
+    [
+        "shift",
+        "right shift",
+        "left shift",
+        "ctrl",
+        "right ctrl",
+        "left ctrl",
+        "alt",
+        "alt gr",
+        "right alt",
+        "left alt",
+        "windows",
+        "left windows",
+        "right windows",
+        "caps lock",
+    ]
+)
+KEY_CHARS = {"space": " "}
+# Names of the keys keyboard.write() presses for characters without their own.
+SENT_KEY_NAMES = {" ": "space", "\n": "enter", "\t": "tab"}
+
+
+def find_hidden_abbreviations(snippets: dict[str, str]) -> list[str]:
+    """Return the abbreviations that contain another one before their last key.
+
+    The other abbreviation is expanded as soon as it is typed, like ";s" in
+    ";sig", so these are never expanded.
+    """
+    automaton = Automaton(snippets)
+    return [
+        abbreviation
+        for abbreviation in snippets
+        if automaton.find_all(abbreviation[:-1])
+    ]
+
+
+class TextExpander:
+    """Expand abbreviations typed in any program to their snippet text.
+
+    Snippets are a dict of abbreviation to text in storage. Typed characters
+    are fed to an Aho-Corasick matcher, so each key press costs the same
+    however many snippets there are. An abbreviation is expanded as soon as
+    it is typed, so one that contains another abbreviation is rejected.
+    """
+
+    def __init__(self, storage: Storage) -> None:
+        self._storage = storage
+        self._keyboard = None
+        self._hook = None
+        # Names of the keys the expander sent that were not seen yet, their
+        # presses are not fed.
+        self._sent_keys = deque()
+        # Snippets are loaded when the expander is first used, most startups
+        # have it disabled.
+        self.snippets = None
+        self.state_count = 0
+        self._matcher = None
+
+    def load_snippets(self) -> None:
+        snippets = self._storage.read_object(SNIPPETS_KEY)
+        self.snippets = dict(snippets) if isinstance(snippets, dict) else dict()
+        hidden = find_hidden_abbreviations(self.snippets)
+        if hidden:
+            logger.warning("Skipped snippets that are never expanded: %s", hidden)
+            for abbreviation in hidden:
+                del self.snippets[abbreviation]
+        automaton = Automaton(self.snippets)
+        self.state_count = len(automaton)
+        self._matcher = automaton.matcher()
+
+    def set_snippets(self, snippets: dict[str, str]) -> None:
+        """Save the snippets, raises ValueError if an abbreviation is hidden."""
+        hidden = find_hidden_abbreviations(snippets)
+        if hidden:
+            raise ValueError(
+                f"Abbreviations that contain another abbreviation: {hidden}"
+            )
+        self._storage.save_object(SNIPPETS_KEY, snippets)
+        self.load_snippets()
+
+    def feed_key(self, name: str) -> tuple[str, str]:
+        """Feed the name of a pressed key, return (abbreviation, text) to expand."""
+        if self._matcher is None:
+            self.load_snippets()
+        if len(name) == 1:
+            return self._matcher.feed(name)
+        char = KEY_CHARS.get(name)
+        if char is not None:
+            return self._matcher.feed(char)
+        if name not in MODIFIER_KEYS:
+            # Enter, arrows, backspace and other keys end the abbreviation.
+            self._matcher.reset()
+        return None
+
+    @property
+    def is_running(self) -> bool:
+        return self._hook is not None
+
+    def start(self) -> None:
+        if self._hook is not None:
+            return
+        import keyboard
+
+        self._keyboard = keyboard
+        if self._matcher is None:
+            self.load_snippets()
+        self._matcher.reset()
+        self._hook = keyboard.on_press(self._on_key_press)
+
+    def stop(self) -> None:
+        if self._hook is None:
+            return
+        self._keyboard.unhook(self._hook)
+        self._hook = None
+
+    def _on_key_press(self, event) -> None:
+        name = event.name
+        if name is None or name in MODIFIER_KEYS:
+            return
+        if self._sent_keys:
+            sent_key = self._sent_keys.popleft()
+            if name.lower() == sent_key.lower():
+                return
+            # Some sent keys, like unicode characters, have no press event of
+            # their own. This press was typed, it must not be swallowed.
+            self._sent_keys.clear()
+        match = self.feed_key(name)
+        if match is not None:
+            self._expand(*match)
+
+    def _expand(self, abbreviation: str, text: str) -> None:
+        self._matcher.reset()
+        self._sent_keys = deque(["backspace"] * len(abbreviation))
+        self._sent_keys.extend(SENT_KEY_NAMES.get(char, char) for char in text)
+        for _ in abbreviation:
+            self._keyboard.send("backspace")
+        self._keyboard.write(text)
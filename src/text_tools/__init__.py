@@ -0,0 +1,29 @@
+import importlib
+
+# Modules are imported the first time one of their names is used.
+_MODULES = {
+    "Engine": ".engine",
+    "LineEngine": ".engine",
+    "PipelineEngine": ".engine",
+    "diff_text": ".engine",
+    "TextManipulator": ".manipulators",
+    "LineManipulator": ".manipulators",
+    "SpaceManipulator": ".manipulators",
+    "SortManipulator": ".manipulators",
+    "create_manipulators": ".manipulators",
+    "PIPELINES_KEY": ".pipeline",
+    "Pipeline": ".pipeline",
+    "load_pipelines": ".pipeline",
+    "parse_steps": ".pipeline",
+    "RegexSandbox": ".regex_sandbox",
+}
+
+
+def __getattr__(name: str):
+    try:
+        module_name = _MODULES[name]
+    except KeyError:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,197 @@
+import argparse
+import collections
+import concurrent.futures
+import functools
+import itertools
+import multiprocessing
+import os
+import sqlite3
+import sys
+from collections.abc import Iterable
+from collections.abc import Iterator
+
+from .manipulators import create_manipulators
+from .pipeline import PIPELINES_KEY
+from .pipeline import STEP_SEPARATOR
+from .pipeline import Pipeline
+from .pipeline import load_pipelines
+from .pipeline import parse_steps
+
+# Lines sent to a worker process at a time.
+CHUNK_LINES = 10_000
+# Chunks per worker that are read ahead of the one being written.
+CHUNKS_AHEAD = 2
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m text_tools",
+        description="Apply text tools to files or stdin, line by line.",
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        metavar="FILE",
+        help="Files to read one after another, - or no files reads stdin.",
+    )
+    parser.add_argument(
+        "-p",
+        "--pipeline",
+        metavar="STEPS",
+        help=f"A text tool, steps like 'Lowercase {STEP_SEPARATOR} Unique' or the "
+        "name of a pipeline saved in --storage.",
+    )
+    parser.add_argument(
+        "-o", "--output", metavar="FILE", help="File to write to instead of stdout."
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Processes that change lines, sorting always runs in one process.",
+    )
+    parser.add_argument(
+        "--storage",
+        metavar="FILE",
+        help="UtilityGear storage database to read saved pipelines from.",
+    )
+    parser.add_argument("--encoding", default="utf-8", help="Encoding of the files.")
+    parser.add_argument(
+        "--list", action="store_true", help="List the text tools and pipelines."
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.pipeline is None and not args.list:
+        parser.error("--pipeline is required")
+    if args.storage is not None and not os.path.exists(args.storage):
+        parser.error(f"storage file not found: {args.storage}")
+    return args
+
+
+def load_saved_pipelines(filename: str, manipulators: dict) -> dict[str, Pipeline]:
+    """Return the pipelines saved in the storage of the app.
+
+    The storage is opened read-only, the app may have it open at the same time.
+    """
+    if filename is None:
+        return dict()
+    # Only imported when needed, the CLI may run without the app next to it.
+    from sqlite_storage import read_object_read_only
+
+    data = read_object_read_only(filename, PIPELINES_KEY)
+    return load_pipelines(data, manipulators)
+
+
+def get_pipeline(args: argparse.Namespace, manipulators: dict) -> Pipeline:
+    """Return the pipeline to run, raises ValueError for unknown steps."""
+    saved = load_saved_pipelines(args.storage, manipulators)
+    if args.pipeline in saved:
+        return saved[args.pipeline]
+    return Pipeline(args.pipeline, parse_steps(args.pipeline, manipulators))
+
+
+def read_lines(filenames: list[str], encoding: str) -> Iterator[str]:
+    """Yield the lines of the files without line endings."""
+    for filename in filenames or ["-"]:
+        if filename == "-":
+            yield from _strip_newlines(sys.stdin)
+            continue
+        with open(filename, encoding=encoding) as file:
+            yield from _strip_newlines(file)
+
+
+def _strip_newlines(file) -> Iterator[str]:
+    for line in file:
+        yield line[:-1] if line.endswith("\n") else line
+
+
+def map_in_processes(
+    executor: concurrent.futures.Executor,
+    max_pending: int,
+    function: callable,
+    lines: Iterable[str],
+) -> Iterator[str]:
+    """Like map(), but chunks of lines run in the executor and come back in order.
+
+    At most max_pending chunks are read before their results are written, so
+    memory does not grow with the input.
+    """
+    pending = collections.deque()
+    lines = iter(lines)
+    while True:
+        chunk = list(itertools.islice(lines, CHUNK_LINES))
+        if not chunk:
+            break
+        pending.append(executor.submit(_map_chunk, function, chunk))
+        if len(pending) >= max_pending:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+
+def _map_chunk(function: callable, lines: list[str]) -> list[str]:
+    return list(map(function, lines))
+
+
+def write_lines(lines: Iterable[str], filename: str, encoding: str) -> None:
+    if filename is None:
+        sys.stdout.writelines(line + "\n" for line in lines)
+        sys.stdout.flush()
+        return
+    with open(filename, "w", encoding=encoding) as file:
+        file.writelines(line + "\n" for line in lines)
+
+
+def list_pipelines(manipulators: dict, saved: dict[str, Pipeline]) -> None:
+    for name in manipulators:
+        print(name)
+    for name, pipeline in saved.items():
+        print(f"{name}: {pipeline.describe()}")
+
+
+def run(args: argparse.Namespace) -> int:
+    manipulators = create_manipulators()
+    if args.list:
+        list_pipelines(manipulators, load_saved_pipelines(args.storage, manipulators))
+        return 0
+    try:
+        pipeline = get_pipeline(args, manipulators)
+    except ValueError as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 2
+    if args.files == [] or "-" in args.files:
+        sys.stdin.reconfigure(encoding=args.encoding)
+    if args.output is None:
+        sys.stdout.reconfigure(encoding=args.encoding)
+    lines = read_lines(args.files, args.encoding)
+    if args.jobs == 1:
+        write_lines(pipeline.iter_lines(lines), args.output, args.encoding)
+        return 0
+    # Spawn like the regex sandbox, forking a process with threads is unsafe.
+    context = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(args.jobs, mp_context=context) as pool:
+        map_lines = functools.partial(
+            map_in_processes, pool, args.jobs * CHUNKS_AHEAD
+        )
+        write_lines(pipeline.iter_lines(lines, map_lines), args.output, args.encoding)
+    return 0
+
+
+def main(argv: list[str] = None) -> int:
+    args = parse_args(argv)
+    try:
+        return run(args)
+    except sqlite3.DatabaseError as error:
+        print(f"error: cannot read {args.storage}: {error}", file=sys.stderr)
+        return 2
+    except OSError as error:
+        if isinstance(error, BrokenPipeError):
+            # The reader stopped, like head, don't fail again when stdout closes.
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            return 1
+        print(f"error: {error}", file=sys.stderr)
+        return 1
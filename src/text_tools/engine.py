@@ -0,0 +1,289 @@
+import threading
+from abc import ABC
+from abc import abstractmethod
+from collections import Counter
+
+from .sorted_list import create_sorted_list
+
+# Lines changed between checks of the cancel token.
+CANCEL_CHECK_LINES = 4096
+
+
+def common_prefix_length(old: str, new: str) -> int:
+    """Return the number of characters old and new start with in common."""
+    limit = min(len(old), len(new))
+    start = 0
+    size = 256
+    # Compare growing chunks until one differs, the comparisons run in C.
+    while True:
+        size = min(size, limit - start)
+        if size == 0:
+            return start
+        if not new.startswith(old[start : start + size], start):
+            break
+        start += size
+        size *= 2
+    # Halve the chunk that differs until the first different character.
+    while size > 1:
+        half = size // 2
+        if new.startswith(old[start : start + half], start):
+            start += half
+            size -= half
+        else:
+            size = half
+    return start
+
+
+def common_suffix_length(old: str, new: str, limit: int) -> int:
+    """Return the number of characters, at most limit, old and new end with."""
+    length = 0
+    size = 256
+    while True:
+        size = min(size, limit - length)
+        if size == 0:
+            return length
+        if not _ends_with(old, new, length, size):
+            break
+        length += size
+        size *= 2
+    while size > 1:
+        half = size // 2
+        if _ends_with(old, new, length, half):
+            length += half
+            size -= half
+        else:
+            size = half
+    return length
+
+
+def _ends_with(old: str, new: str, length: int, size: int) -> bool:
+    """Return True if the size characters before the last length are the same."""
+    end = len(old) - length
+    return new.endswith(old[end - size : end], 0, len(new) - length)
+
+
+def diff_text(old: str, new: str) -> tuple[int, int, int]:
+    """Return (start, old_end, new_end), old[start:old_end] became new[start:new_end].
+
+    The ranges cover whole lines.
+    """
+    prefix = common_prefix_length(old, new)
+    suffix = common_suffix_length(old, new, min(len(old), len(new)) - prefix)
+    start = old.rfind("\n", 0, prefix) + 1
+    old_end = old.find("\n", len(old) - suffix)
+    if old_end < 0:
+        old_end = len(old)
+    return start, old_end, old_end + len(new) - len(old)
+
+
+class Engine(ABC):
+    """Keep the output of a manipulator up to date while its input text changes.
+
+    Updates can run on a worker thread, a cancelled update leaves the engine as
+    it was.
+    """
+
+    def __init__(self) -> None:
+        self._text = ""
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def update(self, text: str, token=None) -> list[str]:
+        """Return the output lines for text."""
+
+
+class LineEngine(Engine):
+    """Apply a manipulator to text and only redo the work for changed lines.
+
+    update() compares the lines with the previous text and passes the changed
+    range to _replace().
+    """
+
+    def update(self, text: str, token=None) -> list[str]:
+        """Return the output lines for text."""
+        with self._lock:
+            start, old_end, new_end = diff_text(self._text, text)
+            line = self._text.count("\n", 0, start)
+            removed = self._text[start:old_end].split("\n")
+            added = text[start:new_end].split("\n")
+            self._replace(line, removed, added, text, token)
+            self._text = text
+            return self._output_lines()
+
+    @abstractmethod
+    def _replace(
+        self, line: int, removed: list[str], added: list[str], text: str, token
+    ) -> None:
+        """Replace the removed lines, starting at index line, with the added lines."""
+
+    @abstractmethod
+    def _output_lines(self) -> list[str]:
+        """Return the output lines for the current text."""
+
+
+class MapEngine(LineEngine):
+    """Change each line on its own, results are cached by line."""
+
+    MAX_CACHE_SIZE = 100_000
+
+    def __init__(self, function: callable) -> None:
+        super().__init__()
+        self._function = function
+        # The empty text has one empty line.
+        self._output = [function("")]
+        self._cache = dict()
+
+    def _map(self, lines: list[str], token) -> list[str]:
+        if len(lines) > CANCEL_CHECK_LINES:
+            # Large changes like a paste are rarely repeated, skip the cache.
+            return self._map_uncached(lines, token)
+        cache = self._cache
+        function = self._function
+        results = []
+        if token is not None:
+            token.raise_if_cancelled()
+        for line in lines:
+            result = cache.get(line)
+            if result is None:
+                result = cache[line] = function(line)
+            results.append(result)
+        if len(cache) > self.MAX_CACHE_SIZE:
+            cache.clear()
+        return results
+
+    def _map_uncached(self, lines: list[str], token) -> list[str]:
+        results = []
+        for start in range(0, len(lines), CANCEL_CHECK_LINES):
+            if token is not None:
+                token.raise_if_cancelled()
+            chunk = lines[start : start + CANCEL_CHECK_LINES]
+            results.extend(map(self._function, chunk))
+        return results
+
+    def _replace(self, line, removed, added, text, token) -> None:
+        results = self._map(added, token)
+        self._output[line : line + len(removed)] = results
+
+    def _output_lines(self) -> list[str]:
+        return list(self._output)
+
+
+class JoinEngine(MapEngine):
+    """Change each line and join the non-empty results into one line."""
+
+    def _output_lines(self) -> list[str]:
+        return [" ".join(result for result in self._output if result)]
+
+
+class SortedEngine(LineEngine):
+    """Keep the non-empty lines sorted, changing a line is O(log n)."""
+
+    def __init__(self, reverse: bool = False, unique: bool = False) -> None:
+        super().__init__()
+        self._reverse = reverse
+        self._unique = unique
+        self._sorted = create_sorted_list()
+        # Number of times each line is in the input, used by unique.
+        self._counts = dict()
+
+    def _replace(self, line, removed, added, text, token) -> None:
+        if len(removed) + len(added) > len(self._sorted) // 2:
+            self._rebuild(text.split("\n"), token)
+            return
+        if token is not None:
+            token.raise_if_cancelled()
+        for value in removed:
+            if value:
+                self._remove(value)
+        for value in added:
+            if value:
+                self._add(value)
+
+    def _rebuild(self, lines: list[str], token) -> None:
+        """Sort all lines at once, faster than adding them one by one."""
+        lines = [line for line in lines if line]
+        counts = Counter(lines)
+        sorted_lines = create_sorted_list(counts if self._unique else lines)
+        if token is not None:
+            token.raise_if_cancelled()
+        self._counts = counts
+        self._sorted = sorted_lines
+
+    def _add(self, line: str) -> None:
+        count = self._counts.get(line, 0)
+        self._counts[line] = count + 1
+        if not self._unique or count == 0:
+            self._sorted.add(line)
+
+    def _remove(self, line: str) -> None:
+        count = self._counts[line] - 1
+        if count == 0:
+            del self._counts[line]
+        else:
+            self._counts[line] = count
+        if not self._unique or count == 0:
+            self._sorted.remove(line)
+
+    def _output_lines(self) -> list[str]:
+        if self._reverse:
+            return list(reversed(self._sorted))
+        return list(self._sorted)
+
+
+class TextEngine(Engine):
+    """Change the whole text with a function, again only when the text changed."""
+
+    def __init__(self, function: callable) -> None:
+        super().__init__()
+        self._function = function
+        self._output = function("").split("\n")
+
+    def update(self, text: str, token=None) -> list[str]:
+        with self._lock:
+            if text != self._text:
+                if token is not None:
+                    token.raise_if_cancelled()
+                self._output = self._function(text).split("\n")
+                self._text = text
+            return list(self._output)
+
+
+class PipelineEngine(Engine):
+    """Pass the text through the engines of the stages of a pipeline.
+
+    Every stage engine only redoes the work for the lines its input changed
+    in, and reuse() takes the engines of the stages another pipeline starts
+    with, so changing the last step does not run the earlier steps again.
+    """
+
+    def __init__(self, stages: list[tuple[tuple, callable]]) -> None:
+        super().__init__()
+        # (key of the stage and the stages before it, engine factory).
+        self._keys = []
+        self._factories = []
+        key = ()
+        for stage_key, create_engine in stages:
+            key += (stage_key,)
+            self._keys.append(key)
+            self._factories.append(create_engine)
+        self._engines = [None] * len(self._keys)
+
+    def reuse(self, other: Engine) -> None:
+        """Take the engines of the stages this pipeline has in common with other."""
+        if not isinstance(other, PipelineEngine):
+            return
+        for index, (key, other_key) in enumerate(zip(self._keys, other._keys)):
+            if key != other_key:
+                return
+            self._engines[index] = other._engines[index]
+
+    def update(self, text: str, token=None) -> list[str]:
+        with self._lock:
+            lines = [] if self._engines else text.split("\n")
+            for index, engine in enumerate(self._engines):
+                if engine is None:
+                    engine = self._engines[index] = self._factories[index]()
+                lines = engine.update(text, token)
+                text = "\n".join(lines)
+            self._text = text
+            return lines
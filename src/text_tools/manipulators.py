@@ -0,0 +1,79 @@
+from .engine import Engine
+from .engine import JoinEngine
+from .engine import MapEngine
+from .engine import SortedEngine
+
+
+class TextManipulator:
+    """Change the whole text with a function."""
+
+    def __init__(self, name: str, function: callable) -> None:
+        self.name = name
+        self.function = function
+
+    def change_text(self, text: str) -> str:
+        return self.function(text)
+
+    def create_engine(self) -> Engine:
+        """Return an engine that updates the result line by line, if there is one."""
+        return None
+
+
+class LineManipulator(TextManipulator):
+    """Change each line with a function."""
+
+    def change_text(self, text: str) -> str:
+        return "\n".join(map(self.function, text.split("\n")))
+
+    def create_engine(self) -> Engine:
+        return MapEngine(self.function)
+
+
+class SpaceManipulator(TextManipulator):
+    """Join all words with single spaces."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name, clean_whitespace)
+
+    def change_text(self, text: str) -> str:
+        return clean_whitespace(text)
+
+    def create_engine(self) -> Engine:
+        return JoinEngine(clean_whitespace)
+
+
+class SortManipulator(TextManipulator):
+    """Sort the non-empty lines, with unique each line is kept once."""
+
+    def __init__(self, name: str, reverse: bool = False, unique: bool = False):
+        super().__init__(name, None)
+        self.reverse = reverse
+        self.unique = unique
+
+    def change_text(self, text: str) -> str:
+        lines = [line for line in text.split("\n") if line]
+        if self.unique:
+            lines = set(lines)
+        return "\n".join(sorted(lines, reverse=self.reverse))
+
+    def create_engine(self) -> Engine:
+        return SortedEngine(reverse=self.reverse, unique=self.unique)
+
+
+def clean_whitespace(text: str) -> str:
+    """Return text without extra whitespace."""
+    return " ".join(text.split())
+
+
+def create_manipulators() -> dict[str, TextManipulator]:
+    """Return the manipulators that only depend on the text, by name."""
+    manipulators = [
+        LineManipulator("Title", str.title),
+        SpaceManipulator("Space"),
+        LineManipulator("Uppercase", str.upper),
+        LineManipulator("Lowercase", str.lower),
+        SortManipulator("Sort Ascending"),
+        SortManipulator("Sort Descending", reverse=True),
+        SortManipulator("Unique", unique=True),
+    ]
+    return {manipulator.name: manipulator for manipulator in manipulators}
@@ -0,0 +1,211 @@
+from abc import ABC
+from abc import abstractmethod
+from collections.abc import Iterable
+from collections.abc import Iterator
+
+from .engine import Engine
+from .engine import JoinEngine
+from .engine import MapEngine
+from .engine import PipelineEngine
+from .engine import SortedEngine
+from .engine import TextEngine
+from .manipulators import LineManipulator
+from .manipulators import SortManipulator
+from .manipulators import SpaceManipulator
+from .manipulators import TextManipulator
+from .manipulators import clean_whitespace
+
+STEP_SEPARATOR = ">"
+# Storage key of the saved pipelines, a dict of name to step names.
+PIPELINES_KEY = "pipelines"
+
+
+class Pipeline(TextManipulator):
+    """Apply manipulators one after another in one pass over the lines.
+
+    Adjacent line manipulators are fused into one function per line, only
+    sorting and manipulators of the whole text need all lines at once.
+    """
+
+    def __init__(self, name: str, steps: list[TextManipulator]) -> None:
+        super().__init__(name, None)
+        self.steps = list(steps)
+        self._stages = _fuse(self.steps)
+
+    def change_text(self, text: str) -> str:
+        return "\n".join(self.iter_lines(text.split("\n")))
+
+    def iter_lines(
+        self, lines: Iterable[str], map_lines: callable = map
+    ) -> Iterator[str]:
+        """Return the output lines, read from lines while they are needed.
+
+        Line manipulators run with map_lines(function, lines), which can run
+        them in other processes, the function can be pickled.
+        """
+        for stage in self._stages:
+            lines = stage.iter_lines(lines, map_lines)
+        return iter(lines)
+
+    def create_engine(self) -> PipelineEngine:
+        return PipelineEngine(
+            [(stage.key, stage.create_engine) for stage in self._stages]
+        )
+
+    def describe(self) -> str:
+        """Return the steps as text that parse_steps() reads back."""
+        return f" {STEP_SEPARATOR} ".join(step.name for step in self.steps)
+
+
+class _Stage(ABC):
+    """Steps that run as one loop, key identifies them for reusing results."""
+
+    def __init__(self, steps: list[TextManipulator]) -> None:
+        self.key = tuple(step.name for step in steps)
+
+    @abstractmethod
+    def iter_lines(self, lines: Iterable[str], map_lines: callable) -> Iterable[str]:
+        """Return the output lines of the stage for the input lines."""
+
+    @abstractmethod
+    def create_engine(self) -> Engine:
+        """Return an engine that updates the output of the stage."""
+
+
+class _MapStage(_Stage):
+    def __init__(self, steps: list[LineManipulator]) -> None:
+        super().__init__(steps)
+        self.function = _ComposedFunction([step.function for step in steps])
+
+    def iter_lines(self, lines, map_lines):
+        return map_lines(self.function, lines)
+
+    def create_engine(self):
+        return MapEngine(self.function)
+
+
+class _JoinStage(_Stage):
+    """Line manipulators followed by Space, the result is one line."""
+
+    def __init__(self, steps: list[TextManipulator]) -> None:
+        super().__init__(steps)
+        functions = [step.function for step in steps[:-1]]
+        self.function = _ComposedFunction(functions + [clean_whitespace])
+
+    def iter_lines(self, lines, map_lines):
+        results = map_lines(self.function, lines)
+        yield " ".join(result for result in results if result)
+
+    def create_engine(self):
+        return JoinEngine(self.function)
+
+
+class _SortStage(_Stage):
+    def __init__(self, step: SortManipulator) -> None:
+        super().__init__([step])
+        self.reverse = step.reverse
+        self.unique = step.unique
+
+    def iter_lines(self, lines, map_lines):
+        lines = filter(None, lines)
+        if self.unique:
+            lines = set(lines)
+        return sorted(lines, reverse=self.reverse)
+
+    def create_engine(self):
+        return SortedEngine(reverse=self.reverse, unique=self.unique)
+
+
+class _TextStage(_Stage):
+    """A manipulator of the whole text."""
+
+    def __init__(self, step: TextManipulator) -> None:
+        super().__init__([step])
+        self.step = step
+
+    def iter_lines(self, lines, map_lines):
+        return self.step.change_text("\n".join(lines)).split("\n")
+
+    def create_engine(self):
+        return self.step.create_engine() or TextEngine(self.step.change_text)
+
+
+def _fuse(steps: list[TextManipulator]) -> list[_Stage]:
+    stages = []
+    line_steps = []
+    for step in steps:
+        if isinstance(step, LineManipulator):
+            line_steps.append(step)
+            continue
+        if isinstance(step, SpaceManipulator):
+            stages.append(_JoinStage(line_steps + [step]))
+            line_steps = []
+            continue
+        if line_steps:
+            stages.append(_MapStage(line_steps))
+            line_steps = []
+        if isinstance(step, SortManipulator):
+            stages.append(_SortStage(step))
+        elif isinstance(step, Pipeline):
+            stages.extend(step._stages)
+        else:
+            stages.append(_TextStage(step))
+    if line_steps:
+        stages.append(_MapStage(line_steps))
+    return stages
+
+
+class _ComposedFunction:
+    """Apply functions one after another, a class so it can be pickled."""
+
+    def __init__(self, functions: list[callable]) -> None:
+        self.functions = tuple(functions)
+
+    def __call__(self, line: str) -> str:
+        for function in self.functions:
+            line = function(line)
+        return line
+
+
+def parse_steps(
+    text: str, manipulators: dict[str, TextManipulator]
+) -> list[TextManipulator]:
+    """Return the manipulators named in text, separated by STEP_SEPARATOR.
+
+    Raises ValueError for an unknown name or when there are no steps.
+    """
+    names = [name.strip() for name in text.split(STEP_SEPARATOR)]
+    names = [name for name in names if name]
+    if not names:
+        raise ValueError("A pipeline needs at least one step")
+    steps = []
+    for name in names:
+        if name not in manipulators:
+            raise ValueError(f"Unknown manipulator: {name}")
+        steps.append(manipulators[name])
+    return steps
+
+
+def load_pipelines(
+    data: dict[str, list[str]],
+    manipulators: dict[str, TextManipulator],
+    reserved_names: Iterable[str] = (),
+) -> dict[str, Pipeline]:
+    """Return the pipelines saved as a dict of name to step names, by name.
+
+    Pipelines with a step that no longer exists are skipped, and so are
+    pipelines named like a manipulator or a reserved name, they would hide it.
+    """
+    pipelines = dict()
+    if not isinstance(data, dict):
+        return pipelines
+    reserved_names = set(reserved_names)
+    for name, step_names in data.items():
+        if name in manipulators or name in reserved_names:
+            continue
+        if not all(step_name in manipulators for step_name in step_names):
+            continue
+        steps = [manipulators[step_name] for step_name in step_names]
+        if steps:
+            pipelines[name] = Pipeline(name, steps)
+    return pipelines
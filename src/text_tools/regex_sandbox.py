@@ -0,0 +1,229 @@
+import functools
+import multiprocessing
+import re
+import threading
+import time
+
+# Matches sent to the app together, a batch is also sent when this much
+# time passed since the last one.
+BATCH_SIZE = 500
+BATCH_INTERVAL = 0.1
+# How often a waiting search checks if it was cancelled.
+POLL_INTERVAL = 0.05
+
+
+class RegexResult:
+    """Matches of a search and why it stopped early, if it did."""
+
+    def __init__(self) -> None:
+        self.matches = []
+        self.error = None
+        self.truncated = False
+        self.timed_out = False
+        self.failed = False
+
+    def to_text(self, timeout: float, max_matches: int) -> str:
+        if self.error is not None:
+            return "(Invalid regex)"
+        if self.failed:
+            return "(Regex worker stopped)"
+        lines = list(self.matches)
+        if self.timed_out:
+            lines.append(f"(Regex stopped after {timeout:g} s)")
+        elif self.truncated:
+            lines.append(f"(Regex stopped after {max_matches} matches)")
+        return "\n".join(lines)
+
+
+class RegexSandbox:
+    """Run regular expressions in a worker process that is killed on timeout.
+
+    A pattern with catastrophic backtracking costs at most timeout seconds,
+    instead of freezing the app. The worker keeps an LRU cache of compiled
+    patterns and the last text, and streams matches back in batches.
+    """
+
+    def __init__(
+        self, timeout: float = 1.0, max_matches: int = 10_000, cache_size: int = 64
+    ) -> None:
+        self.timeout = timeout
+        self.max_matches = max_matches
+        self._cache_size = cache_size
+        self._process = None
+        self._connection = None
+        # The text the worker keeps for each slot.
+        self._sent_texts = dict()
+        self._request_id = 0
+        # Request id of a cancelled search the worker may still run.
+        self._abandoned = None
+        self._lock = threading.Lock()
+
+    def search(
+        self,
+        pattern: str,
+        text: str,
+        token=None,
+        on_matches: callable = None,
+        slot: str = "text",
+        spans: bool = False,
+    ) -> RegexResult:
+        """Return the matches of pattern in text.
+
+        on_matches is called with the matches found so far while they arrive.
+        The worker keeps the last text of each slot, so searches of different
+        texts should use different slots. With spans the matches are (start,
+        end) pairs instead of strings. Raises TaskCancelled if token is
+        cancelled while waiting, the next search kills the worker if it is
+        still running that search.
+        """
+        with self._lock:
+            self._finish_abandoned()
+            self._start_process()
+            self._request_id += 1
+            sent_text = None if text == self._sent_texts.get(slot) else text
+            request = (self._request_id, pattern, slot, sent_text, spans)
+            self._connection.send(request + (self.max_matches,))
+            self._sent_texts[slot] = text
+            deadline = time.monotonic() + self.timeout
+            try:
+                return self._receive(self._request_id, deadline, token, on_matches)
+            except BaseException:
+                if token is not None and token.cancelled:
+                    self._abandoned = self._request_id
+                else:
+                    self._stop()
+                raise
+
+    def _receive(
+        self, request_id: int, deadline: float, token, on_matches: callable
+    ) -> RegexResult:
+        result = RegexResult()
+        while True:
+            if token is not None:
+                token.raise_if_cancelled()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # The worker may still be running the pattern.
+                self._stop()
+                result.timed_out = True
+                return result
+            if not self._connection.poll(min(remaining, POLL_INTERVAL)):
+                continue
+            try:
+                kind, message_id, value = self._connection.recv()
+            except (EOFError, OSError):
+                # The worker process died.
+                self._stop()
+                result.failed = True
+                return result
+            if message_id != request_id:
+                continue
+            if kind == "matches":
+                result.matches.extend(value)
+                if on_matches is not None:
+                    on_matches(result.matches)
+            elif kind == "error":
+                result.error = value
+                return result
+            else:
+                result.truncated = value
+                return result
+
+    def _finish_abandoned(self) -> None:
+        """Take the results of a cancelled search, kill the worker if it still runs.
+
+        Waiting for it would make the next search wait, and the searches of the
+        output and the highlighter share the worker.
+        """
+        if self._abandoned is None:
+            return
+        request_id = self._abandoned
+        self._abandoned = None
+        if self._process is None:
+            return
+        try:
+            while self._connection.poll():
+                kind, message_id, _ = self._connection.recv()
+                if message_id == request_id and kind != "matches":
+                    return
+        except (EOFError, OSError):
+            pass
+        self._stop()
+
+    def start(self) -> None:
+        """Start the worker process before the first search."""
+        with self._lock:
+            self._start_process()
+
+    def _start_process(self) -> None:
+        if self._process is not None and self._process.is_alive():
+            return
+        context = multiprocessing.get_context("spawn")
+        self._connection, child_connection = context.Pipe()
+        self._process = context.Process(
+            target=_serve,
+            args=(child_connection, self._cache_size),
+            name="RegexSandbox",
+            daemon=True,
+        )
+        self._process.start()
+        child_connection.close()
+        self._sent_texts.clear()
+
+    def _stop(self) -> None:
+        if self._process is None:
+            return
+        self._process.kill()
+        self._process.join()
+        self._connection.close()
+        self._process = None
+        self._connection = None
+        self._sent_texts.clear()
+        self._abandoned = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+
+def _serve(connection, cache_size: int) -> None:
+    """Run searches in the worker process until the connection closes."""
+    compile_pattern = functools.lru_cache(maxsize=cache_size)(re.compile)
+    texts = dict()
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            return
+        request_id, pattern, slot, sent_text, spans, max_matches = request
+        if sent_text is not None:
+            texts[slot] = sent_text
+        try:
+            regex = compile_pattern(pattern)
+        except re.error as error:
+            connection.send(("error", request_id, str(error)))
+            continue
+        matches = regex.finditer(texts.get(slot, ""))
+        truncated = _send_matches(connection, request_id, matches, spans, max_matches)
+        connection.send(("done", request_id, truncated))
+
+
+def _send_matches(
+    connection, request_id: int, matches, spans: bool, max_matches: int
+) -> bool:
+    """Send the matches in batches, return True if there were more than allowed."""
+    batch = []
+    count = 0
+    sent_at = time.monotonic()
+    for match in matches:
+        if count == max_matches:
+            connection.send(("matches", request_id, batch))
+            return True
+        batch.append(match.span() if spans else match.group())
+        count += 1
+        if len(batch) >= BATCH_SIZE or time.monotonic() - sent_at > BATCH_INTERVAL:
+            connection.send(("matches", request_id, batch))
+            batch = []
+            sent_at = time.monotonic()
+    connection.send(("matches", request_id, batch))
+    return False
@@ -0,0 +1,46 @@
+import bisect
+
+
+class BisectList:
+    """Sorted list on a plain list, used when sortedcontainers is missing.
+
+    Lookups are O(log n), inserting and removing move the items after the
+    position, which is fast for the input sizes of the Text tab.
+    """
+
+    def __init__(self, iterable=()) -> None:
+        self._items = sorted(iterable)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def add(self, value: any) -> None:
+        bisect.insort_right(self._items, value)
+
+    def remove(self, value: any) -> None:
+        index = bisect.bisect_left(self._items, value)
+        if index == len(self._items) or self._items[index] != value:
+            raise ValueError(f"{value!r} not in list")
+        del self._items[index]
+
+    def bisect_left(self, value: any) -> int:
+        return bisect.bisect_left(self._items, value)
+
+    def bisect_right(self, value: any) -> int:
+        return bisect.bisect_right(self._items, value)
+
+
+def create_sorted_list(iterable=()):
+    """Return a SortedList from sortedcontainers or a BisectList."""
+    try:
+        from sortedcontainers import SortedList
+    except ImportError:
+        # sortedcontainers is optional, see requirements.txt.
+        return BisectList(iterable)
+    return SortedList(iterable)
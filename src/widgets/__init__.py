@@ -1,5 +1,24 @@
-from .entry import Entry
-from .slider import Slider
-from .tabview import TabView
-from .textbox import Textbox
-from .tooltip import ToolTip
+import importlib
+
+# Modules are imported the first time one of their names is used.
+_MODULES = {
+    "CommandPalette": ".command_palette",
+    "Entry": ".entry",
+    "RegexHighlighter": ".regex_highlighter",
+    "Slider": ".slider",
+    "TabView": ".tabview",
+    "TextRenderer": ".text_renderer",
+    "Textbox": ".textbox",
+    "ToolTip": ".tooltip",
+    "VirtualList": ".virtual_list",
+}
+
+
+def __getattr__(name: str):
+    try:
+        module_name = _MODULES[name]
+    except KeyError:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,101 @@
+import customtkinter as ctk
+
+from fuzzy_index import FuzzyIndex
+
+
+class CommandPalette(ctk.CTkFrame):
+    """Search commands by name and run them with the keyboard.
+
+    get_commands returns (name, callback) pairs, they are indexed the first
+    time the palette is opened after invalidate().
+    """
+
+    MAX_RESULTS = 8
+
+    def __init__(self, master: any, get_commands: callable, **kwargs) -> None:
+        super().__init__(master, border_width=2, **kwargs)
+        self._get_commands = get_commands
+        self._index = None
+        self._results = []
+        self._selected = 0
+        self._create_widgets()
+
+    def _create_widgets(self) -> None:
+        self._entry = ctk.CTkEntry(self, placeholder_text="Type a command")
+        self._entry.pack(fill="x", padx=6, pady=6)
+        self._entry.bind("<KeyRelease>", self._on_key_released)
+        self._entry.bind("<Up>", lambda _: self._move_selection(-1))
+        self._entry.bind("<Down>", lambda _: self._move_selection(1))
+        self._entry.bind("<Return>", lambda _: self.run_selected())
+        self._entry.bind("<Escape>", lambda _: self.close())
+        self._labels = []
+        for index in range(self.MAX_RESULTS):
+            label = ctk.CTkLabel(self, text="", anchor="w", corner_radius=4)
+            label.bind("<Button-1>", lambda _, index=index: self._run_result(index))
+            self._labels.append(label)
+
+    @property
+    def is_open(self) -> bool:
+        return self.winfo_ismapped()
+
+    def invalidate(self) -> None:
+        """Index the commands again the next time the palette is opened."""
+        self._index = None
+
+    def open(self) -> None:
+        if self._index is None:
+            # Results are the (name, callback) pairs themselves.
+            commands = self._get_commands()
+            self._index = FuzzyIndex((command[0], command) for command in commands)
+        self.place(relx=0.5, y=8, anchor="n", relwidth=0.9)
+        self.lift()
+        self._entry.delete(0, ctk.END)
+        self._entry.focus_set()
+        self._search()
+
+    def close(self) -> None:
+        self.place_forget()
+        self.master.focus_set()
+
+    def toggle(self) -> None:
+        if self.is_open:
+            self.close()
+        else:
+            self.open()
+
+    def _on_key_released(self, event) -> None:
+        if event.keysym in ("Up", "Down", "Return", "Escape"):
+            return
+        self._search()
+
+    def _search(self) -> None:
+        self._results = self._index.search(self._entry.get(), self.MAX_RESULTS)
+        self._selected = 0
+        for index, label in enumerate(self._labels):
+            if index < len(self._results):
+                label.configure(text=self._results[index][0])
+                label.pack(fill="x", padx=6, pady=(0, 2))
+            else:
+                label.pack_forget()
+        self._show_selection()
+
+    def _move_selection(self, step: int) -> None:
+        if self._results:
+            self._selected = (self._selected + step) % len(self._results)
+            self._show_selection()
+
+    def _show_selection(self) -> None:
+        selected_color = ctk.ThemeManager.theme["CTkButton"]["fg_color"]
+        for index, label in enumerate(self._labels):
+            color = selected_color if index == self._selected else "transparent"
+            label.configure(fg_color=color)
+
+    def run_selected(self) -> None:
+        self._run_result(self._selected)
+
+    def _run_result(self, index: int) -> None:
+        if index >= len(self._results):
+            return
+        _, callback = self._results[index]
+        self.close()
+        callback()
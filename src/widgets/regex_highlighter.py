@@ -0,0 +1,159 @@
+import math
+
+from debounced_task import DebouncedTask
+from dispatcher import MainThreadDispatcher
+from text_tools import diff_text
+
+from .textbox import Textbox
+
+
+class RegexHighlighter:
+    """Highlight the matches of a regex in the lines of a textbox that are in view.
+
+    Only the visible lines and a margin around them are searched, in the regex
+    sandbox. Searched lines keep their highlights until they are edited or the
+    pattern changes, so scrolling only searches the lines not searched yet.
+    Edits are found by comparing the text with the text before the edit.
+    """
+
+    TAG = "regex_match"
+    # Lines above and below the view that are searched with it.
+    MARGIN_LINES = 50
+
+    def __init__(
+        self, textbox: Textbox, sandbox, dispatcher: MainThreadDispatcher
+    ) -> None:
+        self._textbox = textbox
+        self._sandbox = sandbox
+        self._pattern = ""
+        # Searched line ranges as sorted [first, last] pairs that don't overlap.
+        self._searched = []
+        # The text when the searched lines were last updated.
+        self._text = textbox.get("1.0", "end-1c")
+        self._line_count = textbox.get_line_count()
+        self._task = DebouncedTask(
+            textbox, dispatcher, self._prepare_search, self._show_matches, delay_ms=50
+        )
+        textbox.tag_config(self.TAG, background="#806000")
+        textbox.on_view_changed(self._on_view_changed)
+        textbox.on_modified(self._on_edit)
+
+    def set_pattern(self, pattern: str) -> None:
+        """Highlight the matches of pattern instead, nothing for an empty pattern."""
+        if pattern == self._pattern:
+            return
+        self._pattern = pattern
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Search the lines in view again, used when all the text changed."""
+        self._textbox.tag_remove(self.TAG, "1.0", "end")
+        self._searched = []
+        self._text = self._textbox.get("1.0", "end-1c")
+        self._line_count = self._textbox.get_line_count()
+        if self._pattern:
+            self._task.schedule()
+        else:
+            self._task.cancel()
+
+    def close(self) -> None:
+        self._task.close()
+
+    def _on_view_changed(self) -> None:
+        if self._pattern:
+            self._task.schedule()
+
+    def _on_edit(self) -> None:
+        text = self._textbox.get("1.0", "end-1c")
+        if text == self._text:
+            return
+        start, old_end, new_end = diff_text(self._text, text)
+        first = self._text.count("\n", 0, start) + 1
+        old_last = first + self._text.count("\n", start, old_end)
+        new_last = first + text.count("\n", start, new_end)
+        self._text = text
+        self._line_count = self._textbox.get_line_count()
+        # Tags move with the lines, the edited lines are searched again before
+        # their old highlights are replaced.
+        self._remove_searched(first, old_last, new_last - old_last)
+        self._on_view_changed()
+
+    def _prepare_search(self) -> tuple[float, callable]:
+        """Return the job that searches the lines around the view not searched yet."""
+        lines = self._unsearched_lines()
+        if not self._pattern or lines is None:
+            return 0, lambda token: None
+        first, last = lines
+        text = self._textbox.get(f"{first}.0", f"{last}.end")
+        pattern = self._pattern
+
+        def search(token) -> tuple:
+            result = self._sandbox.search(
+                pattern, text, token, slot="highlight", spans=True
+            )
+            return pattern, first, last, result
+
+        # Always off the main thread, a slow pattern must not block the window.
+        return math.inf, search
+
+    def _unsearched_lines(self) -> tuple[int, int] | None:
+        """Return the first and last line around the view that are not searched."""
+        top = int(self._textbox.index("@0,0").split(".")[0])
+        height = self._textbox.winfo_height()
+        bottom = int(self._textbox.index(f"@0,{height}").split(".")[0])
+        first = max(1, top - self.MARGIN_LINES)
+        last = min(self._line_count, bottom + self.MARGIN_LINES)
+        for searched_first, searched_last in self._searched:
+            if searched_first <= first <= searched_last:
+                first = searched_last + 1
+            if searched_first <= last <= searched_last:
+                last = searched_first - 1
+        if first > last:
+            return None
+        return first, last
+
+    def _show_matches(self, matches: tuple | None) -> None:
+        if matches is None:
+            return
+        pattern, first, last, result = matches
+        if pattern != self._pattern:
+            return
+        self._textbox.tag_remove(self.TAG, f"{first}.0", f"{last}.end")
+        indices = []
+        for start, end in result.matches:
+            indices.append(f"{first}.0+{start}c")
+            indices.append(f"{first}.0+{end}c")
+        self._textbox.tag_add_ranges(self.TAG, indices)
+        # Lines are marked as searched even when the search timed out, so a slow
+        # pattern is not run again on every scroll.
+        self._add_searched(first, last)
+        # Scrolling while searching leaves lines in view that were not searched.
+        if self._unsearched_lines() is not None:
+            self._task.schedule()
+
+    def _add_searched(self, first: int, last: int) -> None:
+        ranges = []
+        for searched_first, searched_last in self._searched:
+            if searched_last < first - 1 or searched_first > last + 1:
+                ranges.append([searched_first, searched_last])
+            else:
+                first = min(first, searched_first)
+                last = max(last, searched_last)
+        ranges.append([first, last])
+        ranges.sort()
+        self._searched = ranges
+
+    def _remove_searched(self, first: int, last: int, line_delta: int = 0) -> None:
+        """Mark lines first to last as not searched, move the lines after them."""
+        ranges = []
+        for searched_first, searched_last in self._searched:
+            if searched_first < first:
+                ranges.append([searched_first, min(searched_last, first - 1)])
+            if searched_last > last:
+                ranges.append(
+                    [
+                        max(searched_first, last + 1) + line_delta,
+                        searched_last + line_delta,
+                    ]
+                )
+        self._searched = ranges
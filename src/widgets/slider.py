@@ -1,10 +1,7 @@
 import customtkinter as ctk
 
-try:
-    import CTkToolTip
-    from .tooltip import ToolTip
-except ModuleNotFoundError:
-    ToolTip = None
+from .tooltip import ToolTip
+from .tooltip import get_tooltip_class
 
 
 class Slider(ctk.CTkSlider):
@@ -12,7 +9,7 @@ class Slider(ctk.CTkSlider):
 
     def __init__(self, master: any, **kwargs) -> None:
         super().__init__(master=master, **kwargs)
-        if ToolTip is None:
+        if get_tooltip_class() is None:
             return
         self._create_tooltip()
         self._setup_command()
@@ -2,36 +2,95 @@ import customtkinter as ctk
 
 
 class TabView(ctk.CTkTabview):
-    """Tab view with key bindings."""
+    """Tab view with key bindings.
 
-    def __init__(self, *args, **kwargs):
+    The content of a tab can be built the first time the tab is shown, and the
+    next tab is prefetched when the app is idle.
+    """
+
+    # Delay before prefetching so the first window is drawn first.
+    PREFETCH_DELAY_MS = 300
+
+    def __init__(self, *args, prefetch: bool = True, **kwargs):
         super().__init__(*args, **kwargs)
         self._tabs = []
         self._current_tab_index = 0
         self._current_tab = None
         self._command = self._on_tab_changed
+        self._prefetch = prefetch
+        # Callbacks that build the content of tabs that are not built yet.
+        self._builders = dict()
 
-    def add(self, name: str) -> ctk.CTkFrame:
-        """Add a tab."""
+    def add(self, name: str, on_first_show: callable = None) -> ctk.CTkFrame:
+        """Add a tab, on_first_show is called before the tab is first shown."""
         self._tabs.append(name)
+        if on_first_show is not None:
+            self._builders[name] = on_first_show
         return super().add(name)
 
+    def build_tab(self, name: str) -> None:
+        """Build the content of a tab if it is not built yet."""
+        builder = self._builders.pop(name, None)
+        if builder is not None:
+            builder()
+
+    def build_current_tab(self) -> None:
+        """Build the shown tab and schedule prefetching the next one."""
+        self._current_tab = self.get()
+        self._current_tab_index = self.index(self._current_tab)
+        self.build_tab(self._current_tab)
+        self._schedule_prefetch()
+
+    def _schedule_prefetch(self) -> None:
+        if not self._prefetch or not self._builders:
+            return
+        self.after(
+            self.PREFETCH_DELAY_MS, lambda: self.after_idle(self._prefetch_next_tab)
+        )
+
+    def _prefetch_next_tab(self) -> None:
+        """Build the tab after the current tab, it is the most likely next tab."""
+        if not self._tabs:
+            return
+        next_index = (self._current_tab_index + 1) % len(self._tabs)
+        self.build_tab(self._tabs[next_index])
+
     def bind_keys(self, modifier_key="Control"):
         """Bind keys to change tab."""
         self._current_tab = self.get()
+        self._key_sequences = []
         for i, _ in enumerate(self._tabs):
-            self.master.bind(
-                f"<{modifier_key}-Key-{i + 1}>",
-                lambda event, index=i: self._change_tab(index),
-            )
+            sequence = f"<{modifier_key}-Key-{i + 1}>"
+            self.master.bind(sequence, lambda event, index=i: self._change_tab(index))
+            self._key_sequences.append(sequence)
+
+    def destroy(self):
+        """Destroy the tab view and remove its key bindings from the master."""
+        for sequence in getattr(self, "_key_sequences", []):
+            self.master.unbind(sequence)
+        # Tabs that are not built yet must not be built after this.
+        self._builders.clear()
+        super().destroy()
+
+    def show_tab(self, name: str) -> bool:
+        """Change to the tab with name, return False if there is no such tab."""
+        for index, tab_name in enumerate(self._tabs):
+            if tab_name.lower() == name.lower():
+                self._change_tab(index)
+                return True
+        return False
 
     def _on_tab_changed(self):
         """Called when the tab is changed by the segmented button."""
         self._current_tab = self.get()
         self._current_tab_index = self.index(self._current_tab)
+        self.build_tab(self._current_tab)
+        self._schedule_prefetch()
 
     def _change_tab(self, index: int):
         """Change to tab at index."""
+        self.build_tab(self._tabs[index])
         self.set(self._tabs[index])
         self._current_tab = self.get()
         self._current_tab_index = self.index(self._current_tab)
+        self._schedule_prefetch()
@@ -0,0 +1,79 @@
+from contextlib import contextmanager
+
+import customtkinter as ctk
+
+from text_tools import diff_text
+
+
+class TextRenderer:
+    """Show text in a textbox by only replacing the lines that changed.
+
+    Large changes are inserted in chunks on idle so the window keeps
+    responding, and the view stays at the line it was scrolled to.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    INSERT_MARK = "renderer_insert"
+
+    def __init__(self, textbox: ctk.CTkTextbox) -> None:
+        self._textbox = textbox
+        # The text in the textbox when nothing is left to insert.
+        self._shown = ""
+        # While inserting, the textbox has the text before the insert position,
+        # the inserted part of the new lines and the text after them.
+        self._before = self._lines = self._after = ""
+        self._inserted = 0
+        self._inserting = False
+        self._after_id = None
+
+    def render(self, text: str) -> None:
+        self._stop_inserting()
+        if text == self._shown:
+            return
+        start, old_end, new_end = diff_text(self._shown, text)
+        first_line = self._shown.count("\n", 0, start) + 1
+        last_line = first_line + self._shown.count("\n", start, old_end)
+        top = self._textbox.index("@0,0")
+        with self._editable():
+            self._textbox.delete(f"{first_line}.0", f"{last_line}.end")
+            self._textbox.mark_set(self.INSERT_MARK, f"{first_line}.0")
+            self._textbox.mark_gravity(self.INSERT_MARK, "right")
+        self._before = self._shown[:start]
+        self._lines = text[start:new_end]
+        self._after = self._shown[old_end:]
+        self._inserted = 0
+        self._inserting = True
+        self._insert_chunk()
+        self._textbox.yview(top)
+
+    def _insert_chunk(self) -> None:
+        self._after_id = None
+        end = self._inserted + self.CHUNK_SIZE
+        with self._editable():
+            self._textbox.insert(self.INSERT_MARK, self._lines[self._inserted : end])
+        self._inserted = min(end, len(self._lines))
+        if self._inserted < len(self._lines):
+            self._after_id = self._textbox.after_idle(self._insert_chunk)
+            return
+        self._stop_inserting()
+
+    def _stop_inserting(self) -> None:
+        """Stop inserting chunks and remember what the textbox shows."""
+        if self._after_id is not None:
+            self._textbox.after_cancel(self._after_id)
+            self._after_id = None
+        if self._inserting:
+            inserted = self._lines[: self._inserted]
+            self._shown = self._before + inserted + self._after
+            self._before = self._lines = self._after = ""
+            self._inserting = False
+
+    @contextmanager
+    def _editable(self):
+        """Make the textbox editable inside the with block."""
+        state = self._textbox.cget("state")
+        self._textbox.configure(state="normal")
+        try:
+            yield
+        finally:
+            self._textbox.configure(state=state)
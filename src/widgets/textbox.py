@@ -13,6 +13,39 @@ class Textbox(ctk.CTkTextbox):
     def on_visible(self, function: callable):
         self.bind("<Visibility>", function)
 
+    def on_view_changed(self, function: callable) -> None:
+        """Call function when the text is scrolled, resized or edited."""
+
+        def set_scrollbar(first: str, last: str) -> None:
+            self._y_scrollbar.set(first, last)
+            function()
+
+        self._textbox.configure(yscrollcommand=set_scrollbar)
+
+    def on_modified(self, function: callable) -> None:
+        """Call function after the text changed, also by pasting with the mouse.
+
+        Tk reports a change once until the modified flag is reset, so the flag
+        is reset after each call.
+        """
+
+        def modified(_) -> None:
+            if not self.edit_modified():
+                # The event of resetting the flag.
+                return
+            self.edit_modified(False)
+            function()
+
+        self.bind("<<Modified>>", modified, add="+")
+
+    def tag_add_ranges(self, tag: str, indices: list[str]) -> None:
+        """Add tag to (start, end) index pairs, flattened, in one call."""
+        if indices:
+            self._textbox.tag_add(tag, *indices)
+
+    def get_line_count(self) -> int:
+        return int(self.index("end-1c").split(".")[0])
+
     def _copy(self):
         # If text is not selected, copy all text.
         if not self.tag_ranges(ctk.SEL):
@@ -1,17 +1,47 @@
-try:
-    from CTkToolTip import CTkToolTip
-except ModuleNotFoundError:
+from lazy_import import is_module_available
 
-    class CTkToolTip:
-        def __init__(self, *args) -> None:
-            pass
+# None until the first tooltip is created, then the tooltip class or False if
+# CTkToolTip is not installed.
+_tooltip_class = None
 
 
-class ToolTip(CTkToolTip):
-    """Tooltip that works with an always on top root window."""
+def get_tooltip_class():
+    """Return CTkToolTip or None if it is not installed, imported on first use."""
+    global _tooltip_class
+    if _tooltip_class is None:
+        _tooltip_class = False
+        if is_module_available("CTkToolTip"):
+            from CTkToolTip import CTkToolTip
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+            _tooltip_class = CTkToolTip
+    return _tooltip_class or None
+
+
+class ToolTip:
+    """Tooltip that works with an always on top root window.
+
+    Does nothing if CTkToolTip is not installed.
+    """
+
+    def __init__(self, widget, **kwargs):
+        self._tooltip = None
+        tooltip_class = get_tooltip_class()
+        if tooltip_class is None:
+            return
+        self._tooltip = tooltip_class(widget, **kwargs)
         # Show over all other windows to display even when the root window is topmost.
-        if hasattr(self, "attributes"):
-            self.attributes("-topmost", True)
+        self._tooltip.attributes("-topmost", True)
+
+    def configure(self, **kwargs) -> None:
+        if self._tooltip is not None:
+            self._tooltip.configure(**kwargs)
+
+    def set_message(self, message: str) -> None:
+        """Change the message, the tooltip is hidden while the message is empty."""
+        if self._tooltip is None:
+            return
+        self._tooltip.configure(message=message)
+        if message:
+            self._tooltip.show()
+        else:
+            self._tooltip.hide()
@@ -0,0 +1,161 @@
+import sys
+import customtkinter as ctk
+
+
+class VirtualList(ctk.CTkFrame):
+    """Scrollable list that only creates widgets for rows in or near the view.
+
+    Items are (kind, item) pairs. create_row(master, kind) creates a row widget
+    for a kind and bind_row(row, item) fills it with an item. Rows that scroll
+    out of view are reused for other items of the same kind, and rows beyond
+    what the view needs are destroyed.
+    """
+
+    def __init__(
+        self,
+        master: any,
+        create_row: callable,
+        bind_row: callable,
+        row_height: int = 34,
+        overscan: int = 2,
+        **kwargs,
+    ) -> None:
+        super().__init__(master, **kwargs)
+        self._create_row = create_row
+        self._bind_row = bind_row
+        self._row_height = row_height
+        self._overscan = overscan
+        self._items = []
+        self._offset = 0
+        # Rows that are placed in the view by item index.
+        self._visible_rows = dict()
+        # Rows that are not placed, by kind, ready to be bound to a new item.
+        self._free_rows = dict()
+        self._create_widgets()
+
+    def _create_widgets(self) -> None:
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.pack(side="right", fill="y")
+        self._viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self._viewport.pack(side="left", fill="both", expand=True)
+        self._viewport.bind(
+            "<Configure>", lambda _: self._set_offset(self._offset), add="+"
+        )
+        self._bind_mouse_wheel()
+
+    @property
+    def row_height(self) -> int:
+        return round(self._apply_widget_scaling(self._row_height))
+
+    def set_items(self, items: list[tuple[str, any]]) -> None:
+        """Replace the items shown in the list."""
+        for index in list(self._visible_rows):
+            self._release_row(index)
+        self._items = list(items)
+        self._render()
+
+    def _bind_mouse_wheel(self) -> None:
+        # Bound for all widgets like CTkScrollableFrame, events outside the
+        # list are ignored in the handler.
+        if sys.platform.startswith("linux"):
+            self.bind_all("<Button-4>", self._on_mouse_wheel, add="+")
+            self.bind_all("<Button-5>", self._on_mouse_wheel, add="+")
+            return
+        self.bind_all("<MouseWheel>", self._on_mouse_wheel, add="+")
+
+    def _on_mouse_wheel(self, event) -> None:
+        # The binding outlives the list when the list is destroyed.
+        if not self.winfo_exists():
+            return
+        widget_name, viewport_name = str(event.widget), str(self._viewport)
+        if widget_name != viewport_name and not widget_name.startswith(
+            viewport_name + "."
+        ):
+            return
+        if event.num == 4:
+            self.scroll(-1)
+        elif event.num == 5:
+            self.scroll(1)
+        else:
+            # Windows reports multiples of 120, macOS reports small steps.
+            delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+            self.scroll(-delta)
+
+    def scroll(self, rows: int) -> None:
+        """Scroll the view by a number of rows."""
+        self._set_offset(self._offset + rows * self.row_height)
+
+    def scroll_to(self, index: int) -> None:
+        """Scroll the view so the item at index is at the top."""
+        self._set_offset(index * self.row_height)
+
+    def _on_scrollbar(self, action: str, value: str, unit: str = None) -> None:
+        if action == "moveto":
+            self._set_offset(float(value) * self._content_height())
+        elif unit == "pages":
+            self._set_offset(self._offset + int(value) * self._view_height())
+        else:
+            self.scroll(int(value))
+
+    def _content_height(self) -> int:
+        return len(self._items) * self.row_height
+
+    def _view_height(self) -> int:
+        return max(self._viewport.winfo_height(), 1)
+
+    def _set_offset(self, offset: float) -> None:
+        max_offset = max(self._content_height() - self._view_height(), 0)
+        self._offset = int(min(max(offset, 0), max_offset))
+        self._render()
+
+    def _render(self) -> None:
+        """Place rows for items in or near the view and release the others."""
+        row_height = self.row_height
+        view_height = self._view_height()
+        first = max(self._offset // row_height - self._overscan, 0)
+        last = min(
+            (self._offset + view_height) // row_height + 1 + self._overscan,
+            len(self._items),
+        )
+        for index in list(self._visible_rows):
+            if index < first or index >= last:
+                self._release_row(index)
+        for index in range(first, last):
+            row = self._visible_rows.get(index)
+            if row is None:
+                row = self._acquire_row(index)
+            row.place(x=0, y=index * row_height - self._offset, relwidth=1.0)
+        self._update_scrollbar()
+        self._trim_free_rows(last - first)
+
+    def _acquire_row(self, index: int):
+        kind, item = self._items[index]
+        free_rows = self._free_rows.get(kind)
+        if free_rows:
+            row = free_rows.pop()
+        else:
+            row = self._create_row(self._viewport, kind)
+        self._bind_row(row, item)
+        self._visible_rows[index] = row
+        return row
+
+    def _release_row(self, index: int) -> None:
+        row = self._visible_rows.pop(index)
+        row.place_forget()
+        kind = self._items[index][0]
+        self._free_rows.setdefault(kind, []).append(row)
+
+    def _trim_free_rows(self, limit: int) -> None:
+        """Destroy unused rows so no more rows exist than the view needs."""
+        for free_rows in self._free_rows.values():
+            while len(free_rows) > limit:
+                free_rows.pop().destroy()
+
+    def _update_scrollbar(self) -> None:
+        content_height = self._content_height()
+        if content_height == 0:
+            self._scrollbar.set(0.0, 1.0)
+            return
+        start = self._offset / content_height
+        end = (self._offset + self._view_height()) / content_height
+        self._scrollbar.set(start, min(end, 1.0))
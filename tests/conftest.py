@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The app runs from src, with its modules imported as top-level modules.
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+sys.path.insert(0, SRC_DIR)
@@ -0,0 +1,71 @@
+import concurrent.futures
+import multiprocessing
+import os
+
+import pytest
+
+from sqlite_storage import SQLiteStorage
+from text_tools import cli
+from text_tools.pipeline import PIPELINES_KEY
+
+
+def save_pipelines(filename, pipelines, **kwargs):
+    storage = SQLiteStorage(filename, **kwargs)
+    storage.save_object(PIPELINES_KEY, pipelines)
+    storage.close()
+
+
+def test_saved_pipeline(tmp_path, capsys):
+    storage = str(tmp_path / "storage.db")
+    # Compressed like a large value in the app.
+    save_pipelines(storage, {"shout": ["Uppercase"]}, compress_threshold=0)
+    input_file = tmp_path / "input.txt"
+    input_file.write_text("a\nb\n")
+    code = cli.main(["--storage", storage, "-p", "shout", str(input_file)])
+    assert code == 0
+    assert capsys.readouterr().out == "A\nB\n"
+
+
+def test_storage_is_not_changed(tmp_path):
+    storage = str(tmp_path / "storage.db")
+    save_pipelines(storage, {"shout": ["Uppercase"]})
+    modified = os.stat(storage).st_mtime_ns
+    cli.load_saved_pipelines(storage, cli.create_manipulators())
+    assert os.stat(storage).st_mtime_ns == modified
+
+
+def test_storage_that_is_not_a_database(tmp_path, capsys):
+    storage = tmp_path / "storage.json"
+    storage.write_text("{}")
+    assert cli.main(["--storage", str(storage), "--list"]) == 2
+    assert capsys.readouterr().err.startswith("error: cannot read")
+    assert storage.read_text() == "{}"
+
+
+def test_map_in_processes_keeps_order(monkeypatch):
+    monkeypatch.setattr(cli, "CHUNK_LINES", 7)
+    lines = [f"line {number}" for number in range(1000)]
+    context = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(2, mp_context=context) as pool:
+        assert list(cli.map_in_processes(pool, 4, str.upper, [])) == []
+        results = cli.map_in_processes(pool, 4, str.upper, iter(lines))
+        assert list(results) == [line.upper() for line in lines]
+
+
+@pytest.mark.parametrize(
+    "pipeline", ["Title > Space", "Lowercase > Unique > Uppercase", "Space > Title"]
+)
+def test_jobs_do_not_change_the_output(tmp_path, monkeypatch, pipeline):
+    # Small chunks so both processes get several of them.
+    monkeypatch.setattr(cli, "CHUNK_LINES", 50)
+    input_file = tmp_path / "input.txt"
+    words = ["apple", "Banana  split", "", "cherry pie", "date"]
+    input_file.write_text("\n".join(words[i % 5] + str(i % 97) for i in range(2000)))
+    outputs = []
+    for jobs in ["1", "2"]:
+        output = tmp_path / f"output{jobs}.txt"
+        argv = ["-p", pipeline, "-j", jobs, "-o", str(output), str(input_file)]
+        assert cli.main(argv) == 0
+        outputs.append(output.read_text())
+    assert outputs[0] == outputs[1]
+    assert outputs[0]
@@ -0,0 +1,109 @@
+import queue
+import threading
+import time
+
+from debounced_task import DebouncedTask
+
+
+class FakeRoot:
+    def __init__(self) -> None:
+        self.scheduled = dict()
+        self._next_id = 0
+
+    def after(self, delay_ms: int, callback: callable) -> str:
+        self._next_id += 1
+        self.scheduled[self._next_id] = callback
+        return self._next_id
+
+    def after_cancel(self, after_id) -> None:
+        self.scheduled.pop(after_id, None)
+
+    def run_scheduled(self) -> None:
+        scheduled, self.scheduled = self.scheduled, dict()
+        for callback in scheduled.values():
+            callback()
+
+
+class FakeDispatcher:
+    """Keeps posted callbacks until the test runs them as the main loop."""
+
+    def __init__(self) -> None:
+        self.posted = queue.SimpleQueue()
+
+    def post(self, callback: callable, *args) -> None:
+        self.posted.put((callback, args))
+
+    def run_next(self) -> None:
+        callback, args = self.posted.get(timeout=5)
+        callback(*args)
+
+
+def test_schedule_runs_once_after_changes_stop():
+    root = FakeRoot()
+    jobs = []
+    results = []
+
+    def prepare():
+        jobs.append(len(jobs))
+        return 0, lambda token: jobs[-1]
+
+    task = DebouncedTask(root, FakeDispatcher(), prepare, results.append)
+    for _ in range(5):
+        task.schedule()
+    assert len(root.scheduled) == 1
+    root.run_scheduled()
+    assert results == [0]
+
+
+def test_new_run_cancels_the_running_job():
+    dispatcher = FakeDispatcher()
+    started = threading.Event()
+    tokens = []
+    results = []
+
+    def slow_job(token):
+        tokens.append(token)
+        started.set()
+        deadline = time.monotonic() + 5
+        while not token.cancelled and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # Returns instead of raising TaskCancelled, the result must be dropped.
+        return "stale"
+
+    jobs = iter([slow_job, lambda token: "current"])
+    task = DebouncedTask(
+        FakeRoot(),
+        dispatcher,
+        lambda: (1, next(jobs)),
+        results.append,
+        thread_threshold=0,
+    )
+    task.run_now()
+    assert started.wait(5)
+    task.run_now()
+    assert tokens[0].cancelled
+    # The stale result is posted first and dropped.
+    dispatcher.run_next()
+    assert results == []
+    dispatcher.run_next()
+    assert results == ["current"]
+    task.close()
+
+
+def test_partial_results_of_superseded_runs_are_dropped():
+    dispatcher = FakeDispatcher()
+    results = []
+    tokens = []
+
+    def job(token):
+        tokens.append(token)
+        return "done"
+
+    task = DebouncedTask(FakeRoot(), dispatcher, lambda: (0, job), results.append)
+    task.run_now()
+    task.run_now()
+    task.deliver(tokens[0], "old partial")
+    task.deliver(tokens[1], "new partial")
+    dispatcher.run_next()
+    dispatcher.run_next()
+    assert results == ["done", "done", "new partial"]
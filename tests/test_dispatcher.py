@@ -0,0 +1,105 @@
+import logging
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import dispatcher
+from dispatcher import LatencyTracker
+from dispatcher import MainThreadDispatcher
+
+
+class FakeRoot:
+    """Records the Tk calls of the dispatcher, the test runs the main loop."""
+
+    def __init__(self) -> None:
+        self.bindings = dict()
+        self.idle_callbacks = []
+        self.generated = []
+        self.running = True
+
+    def bind(self, event: str, callback: callable, add: str = None) -> None:
+        self.bindings[event] = callback
+
+    def after_idle(self, callback: callable) -> None:
+        self.idle_callbacks.append(callback)
+
+    def event_generate(self, event: str, when: str = None) -> None:
+        if not self.running:
+            raise RuntimeError("main thread is not in main loop")
+        self.generated.append(event)
+
+    def process_events(self) -> None:
+        events, self.generated = self.generated, []
+        for event in events:
+            self.bindings[event](None)
+
+
+def test_posts_from_threads_run_in_order_with_one_wakeup():
+    root = FakeRoot()
+    main_thread = MainThreadDispatcher(root)
+    calls = []
+
+    def post_all() -> None:
+        for number in range(100):
+            main_thread.post(calls.append, number)
+
+    thread = threading.Thread(target=post_all)
+    thread.start()
+    thread.join()
+    assert calls == []
+    assert root.generated == [MainThreadDispatcher.WAKEUP_EVENT]
+    root.process_events()
+    assert calls == list(range(100))
+    # The next post wakes the main loop again.
+    main_thread.post(calls.append, 100)
+    root.process_events()
+    assert calls[-1] == 100
+
+
+def test_failing_callback_does_not_stop_the_queue(caplog):
+    root = FakeRoot()
+    main_thread = MainThreadDispatcher(root)
+    calls = []
+    main_thread.post(calls.append, 1)
+    main_thread.post(lambda: 1 / 0)
+    main_thread.post(calls.append, 2)
+    with caplog.at_level(logging.ERROR, logger="dispatcher"):
+        root.process_events()
+    assert calls == [1, 2]
+    assert "ZeroDivisionError" in caplog.text
+
+
+def test_posts_before_the_main_loop_runs():
+    root = FakeRoot()
+    root.running = False
+    main_thread = MainThreadDispatcher(root)
+    calls = []
+    main_thread.post(calls.append, 1)
+    main_thread.post(calls.append, 2)
+    assert root.generated == []
+    for callback in root.idle_callbacks:
+        callback()
+    assert calls == [1, 2]
+
+
+def test_latency_percentiles(monkeypatch):
+    tracker = LatencyTracker(max_samples=101)
+    monkeypatch.setattr(dispatcher, "time", SimpleNamespace(perf_counter=lambda: 10.0))
+    # Samples of 0 to 100 ms, the oldest sample is dropped.
+    for latency_ms in [500] + list(range(101)):
+        assert tracker.record("show", 10.0 - latency_ms / 1000) == pytest.approx(
+            latency_ms
+        )
+    stats = tracker.percentiles("show")
+    assert stats["count"] == 101
+    assert stats["p50"] == pytest.approx(50)
+    assert stats["p90"] == pytest.approx(90)
+    assert stats["p99"] == pytest.approx(99)
+    assert tracker.percentiles("hide") == {
+        "count": 0,
+        "p50": None,
+        "p90": None,
+        "p99": None,
+    }
+    assert tracker.summary().startswith("show: n=101 p50=50.0 ms p90=90.0 ms")
@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from text_tools.engine import TextEngine
+from text_tools.engine import diff_text
+from text_tools.manipulators import TextManipulator
+from text_tools.manipulators import create_manipulators
+
+WORDS = ["apple", "Banana", "  cherry", "date  ", "", "Elder berry", "fig\tgrape"]
+
+
+def random_line(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 3)))
+
+
+def random_edit(rng: random.Random, text: str) -> str:
+    """Return text with a random range replaced, like typing or pasting."""
+    start = rng.randint(0, len(text))
+    end = rng.randint(start, min(len(text), start + rng.choice([1, 10, 100])))
+    if rng.random() < 0.5:
+        added = rng.choice(["", "a", " ", "\n", "B\n", "\n\n"])
+    else:
+        added = "\n".join(random_line(rng) for _ in range(rng.randint(1, 20)))
+    return text[:start] + added + text[end:]
+
+
+def reverse_text(text: str) -> str:
+    return text[::-1]
+
+
+def check_engine(manipulator: TextManipulator, engine, seed) -> None:
+    rng = random.Random(seed)
+    text = ""
+    for _ in range(200):
+        text = random_edit(rng, text)
+        expected = manipulator.change_text(text)
+        assert "\n".join(engine.update(text)) == expected, text
+
+
+@pytest.mark.parametrize("name", list(create_manipulators()))
+def test_engine_matches_manipulator(name):
+    manipulator = create_manipulators()[name]
+    check_engine(manipulator, manipulator.create_engine(), seed=name)
+
+
+def test_text_engine_matches_manipulator():
+    manipulator = TextManipulator("Reverse", reverse_text)
+    check_engine(manipulator, TextEngine(reverse_text), seed=1)
+
+
+def test_diff_text_covers_the_change():
+    rng = random.Random(2)
+    old = ""
+    for _ in range(200):
+        new = random_edit(rng, old)
+        start, old_end, new_end = diff_text(old, new)
+        assert old[:start] == new[:start]
+        assert old[old_end:] == new[new_end:]
+        assert start == 0 or old[start - 1] == "\n"
+        old = new
@@ -0,0 +1,53 @@
+from fuzzy_index import FuzzyIndex
+
+
+def make_index(texts):
+    return FuzzyIndex((text, text) for text in texts)
+
+
+def test_postings_are_trigrams():
+    index = make_index(["Open File", "Save"])
+    grams = {"ope", "pen", "enf", "nfi", "fil", "ile", "sav", "ave"}
+    assert set(index._postings) == grams
+    assert index._postings["fil"] == {0}
+
+
+def test_substring_matches_rank_first():
+    index = make_index(["Save File As", "Toggle Theme", "Open File"])
+    assert index.search("file") == ["Open File", "Save File As"]
+
+
+def test_short_query_scans():
+    index = make_index(["Open File", "Save", "Toggle Theme"])
+    assert index.search("s") == ["Save"]
+    assert index.search("tt") == ["Toggle Theme"]
+
+
+def test_fuzzy_matches_fill_the_limit():
+    index = make_index(["Open Text Tools", "Open Settings", "Other"])
+    # "ots" is in no text as a whole, only as characters in order.
+    assert index.search("ots") == ["Open Text Tools", "Open Settings"]
+
+
+def test_substring_matches_rank_before_higher_scores():
+    index = make_index(["Sync Error Tab", "Reset"])
+    # The word starts score "Sync Error Tab" higher than "Reset".
+    assert index._score("set", "sync error tab") > index._score("set", "reset")
+    assert index.search("set") == ["Reset", "Sync Error Tab"]
+    assert index.search("set", limit=1) == ["Reset"]
+
+
+def test_incremental_search_matches_fresh_index():
+    texts = ["Open File", "Open Folder", "Save File", "Settings", "Note Tab"]
+    index = make_index(texts)
+    for end in range(1, len("openfo") + 1):
+        query = "openfo"[:end]
+        assert index.search(query) == make_index(texts).search(query)
+    assert index.search("st") == make_index(texts).search("st")
+
+
+def test_whitespace_is_ignored():
+    index = make_index(["Open File"])
+    assert index.search("open file") == ["Open File"]
+    assert index.search("nfi") == ["Open File"]
+    assert index.search("") == ["Open File"]
@@ -0,0 +1,69 @@
+import sys
+import threading
+import types
+
+import pytest
+
+from hotkeys import Chord
+from hotkeys import HotkeyCounters
+from hotkeys import HotkeyManager
+from hotkeys import _Win32Backend
+
+
+def test_chord_is_normalised():
+    chord = Chord("Control+Shift+Q")
+    assert chord.key == "q"
+    assert chord.modifiers == {"ctrl", "shift"}
+    with pytest.raises(ValueError):
+        Chord("hyper+q")
+
+
+@pytest.fixture
+def keyboard(monkeypatch):
+    keyboard = types.SimpleNamespace(hotkeys=dict())
+
+    def add_hotkey(hotkey, callback, args=()):
+        if "unknown" in hotkey:
+            raise ValueError(hotkey)
+        keyboard.hotkeys[hotkey] = lambda: callback(*args)
+        return hotkey
+
+    keyboard.add_hotkey = add_hotkey
+    keyboard.remove_hotkey = keyboard.hotkeys.pop
+    monkeypatch.setitem(sys.modules, "keyboard", keyboard)
+    monkeypatch.setattr(sys, "platform", "linux")
+    return keyboard
+
+
+def test_keyboard_backend_adds_each_chord(keyboard):
+    pressed = []
+    manager = HotkeyManager()
+    manager.add("alt+q", lambda: pressed.append("alt+q"))
+    manager.add("win+shift+a", lambda: pressed.append("win+shift+a"))
+    manager.add("alt+unknown", lambda: None)
+    assert manager.start() == ["alt+unknown"]
+    assert set(keyboard.hotkeys) == {"alt+q", "shift+windows+a"}
+    keyboard.hotkeys["shift+windows+a"]()
+    assert pressed == ["win+shift+a"]
+    assert manager.stats()["matched"] == 1
+    manager.stop()
+    assert keyboard.hotkeys == {}
+
+
+def test_win32_backend_reports_unsupported_keys():
+    backend = _Win32Backend.__new__(_Win32Backend)
+    backend._counters = HotkeyCounters()
+    backend._ready = threading.Event()
+    backend._failed = []
+    registered = []
+
+    def run(registrations: list) -> None:
+        registered.extend(registration[0] for registration in registrations)
+        backend._ready.set()
+
+    backend._run = run
+    chords = [(Chord("alt+q"), None), (Chord("alt+unknown"), None)]
+    failed = backend.start(chords)
+    backend._thread.join()
+    assert [repr(chord) for chord in failed] == ["alt+unknown"]
+    assert [repr(chord) for chord in registered] == ["alt+q"]
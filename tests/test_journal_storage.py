@@ -0,0 +1,120 @@
+import builtins
+import json
+import logging
+
+import pytest
+
+import journal_storage
+from journal_storage import JournalStorage
+
+
+def write_records(filename: str, lines: list[bytes]) -> None:
+    with open(filename + ".journal", "wb") as file:
+        file.write(b"".join(lines))
+
+
+def record(key: str, data) -> bytes:
+    return json.dumps({"key": key, "data": data}).encode("utf-8") + b"\n"
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    filename = str(tmp_path / "storage.json")
+    write_records(filename, [record("a", 1), record("b", 2), b'{"key": "c", "da'])
+    storage = JournalStorage(filename)
+    assert storage.read_object("a") == 1
+    assert storage.read_object("b") == 2
+    assert storage.read_object("c") is None
+    with open(filename + ".journal", "rb") as file:
+        assert file.read() == record("a", 1) + record("b", 2)
+    # Records appended after the truncate start on their own line.
+    storage.save_object("c", 3)
+    assert JournalStorage(filename).read_object("c") == 3
+
+
+def test_corrupt_middle_record_keeps_later_records(tmp_path, caplog):
+    filename = str(tmp_path / "storage.json")
+    lines = [
+        record("a", 1),
+        b"not json\n",
+        record("b", 2),
+        record("a", 3),
+        b'{"key": "c"',
+    ]
+    write_records(filename, lines)
+    with caplog.at_level(logging.WARNING, logger="journal_storage"):
+        storage = JournalStorage(filename)
+        assert storage.read_object("a") == 3
+    assert storage.read_object("b") == 2
+    assert storage.read_object("c") is None
+    assert "corrupt record" in caplog.text
+    with open(filename + ".journal", "rb") as file:
+        assert file.read() == b"".join(lines[:-1])
+
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    filename = str(tmp_path / "storage.json")
+    storage = JournalStorage(filename, compact_threshold=100)
+    for index in range(20):
+        storage.save_object(f"key{index}", {"value": index})
+    storage.save_object("key0", {"value": "changed"})
+    storage.close()
+    with open(filename) as file:
+        snapshot = json.load(file)
+    assert len(snapshot) > 0
+    reloaded = JournalStorage(filename)
+    for index in range(1, 20):
+        assert reloaded.read_object(f"key{index}") == {"value": index}
+    assert reloaded.read_object("key0") == {"value": "changed"}
+
+
+def test_compact_empties_journal(tmp_path):
+    filename = str(tmp_path / "storage.json")
+    storage = JournalStorage(filename, flush_interval=0)
+    storage.save_object("a", [1, 2])
+    storage.save_object("b", "text")
+    storage.compact()
+    with open(filename + ".journal", "rb") as file:
+        assert file.read() == b""
+    with open(filename) as file:
+        assert json.load(file) == {"a": [1, 2], "b": "text"}
+    assert JournalStorage(filename).read_object("a") == [1, 2]
+
+
+class TornFile:
+    """A file that writes half of the content and then fails."""
+
+    def __init__(self, file) -> None:
+        self._file = file
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._file.close()
+
+    def write(self, content: bytes) -> None:
+        self._file.write(content[: len(content) // 2])
+        self._file.flush()
+        raise OSError("disk full")
+
+
+def test_retry_after_torn_append(tmp_path, monkeypatch, caplog):
+    filename = str(tmp_path / "storage.json")
+    storage = JournalStorage(filename)
+    storage.save_object("a", 1)
+
+    def torn_open(name, mode="r", *args, **kwargs):
+        file = builtins.open(name, mode, *args, **kwargs)
+        return TornFile(file) if mode == "ab" else file
+
+    monkeypatch.setattr(journal_storage, "open", torn_open, raising=False)
+    with pytest.raises(OSError):
+        storage.save_object("b", 2)
+    monkeypatch.undo()
+    storage.save_object("c", 3)
+    with caplog.at_level(logging.WARNING, logger="journal_storage"):
+        reloaded = JournalStorage(filename)
+        assert reloaded.read_object("b") == 2
+    assert reloaded.read_object("a") == 1
+    assert reloaded.read_object("c") == 3
+    assert "corrupt record" not in caplog.text
@@ -0,0 +1,66 @@
+import subprocess
+import sys
+import types
+
+import pytest
+
+from lazy_import import is_module_available
+from lazy_import import lazy_module
+from tests.conftest import SRC_DIR
+
+
+def run_in_src(code: str) -> None:
+    """Run code in a new interpreter, sys.modules of the tests already has modules."""
+    subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, check=True)
+
+
+def test_lazy_module_runs_on_first_attribute(tmp_path, monkeypatch):
+    marker = tmp_path / "imported"
+    (tmp_path / "lazy_example.py").write_text(
+        f"open({str(marker)!r}, 'w').close()\nVALUE = 42\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazy_example", raising=False)
+    module = lazy_module("lazy_example")
+    assert sys.modules["lazy_example"] is module
+    assert not marker.exists()
+    assert module.VALUE == 42
+    assert marker.exists()
+    assert type(module) is types.ModuleType
+    assert lazy_module("lazy_example") is module
+
+
+def test_lazy_module_that_does_not_exist():
+    with pytest.raises(ModuleNotFoundError):
+        lazy_module("no_such_module_here")
+    assert not is_module_available("no_such_module_here")
+    assert is_module_available("json")
+
+
+def test_package_imports_modules_on_first_use():
+    pytest.importorskip("customtkinter")
+    run_in_src(
+        "import sys, tabs\n"
+        "assert 'tabs.settings_tab' not in sys.modules\n"
+        "tabs.SettingsTab\n"
+        "assert 'tabs.settings_tab' in sys.modules\n"
+        "assert 'tabs.note_tab' not in sys.modules\n"
+        "assert 'SettingsTab' in vars(tabs)\n"
+    )
+
+
+def test_unknown_package_name():
+    import tabs
+
+    with pytest.raises(AttributeError):
+        tabs.NoSuchTab
+
+
+def test_app_import_defers_optional_modules():
+    pytest.importorskip("customtkinter")
+    run_in_src(
+        "import sys, app\n"
+        "for name in ['tabs.note_tab', 'tabs.settings_tab',\n"
+        "             'tabs.text_manipulator_tab', 'text_tools.regex_sandbox']:\n"
+        "    assert name not in sys.modules, name\n"
+    )
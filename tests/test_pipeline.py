@@ -0,0 +1,72 @@
+import functools
+import random
+
+import pytest
+
+from text_tools.manipulators import TextManipulator
+from text_tools.manipulators import create_manipulators
+from text_tools.pipeline import Pipeline
+from text_tools.pipeline import load_pipelines
+from text_tools.pipeline import parse_steps
+
+TEXT = "b  Apple\n\nbanana split\nCherry  pie\nb  apple\n  date\t fig \n"
+
+
+def reverse_lines(text: str) -> str:
+    return "\n".join(reversed(text.split("\n")))
+
+
+def get_steps() -> list[TextManipulator]:
+    manipulators = create_manipulators()
+    steps = list(manipulators.values())
+    steps.append(TextManipulator("Reverse Lines", reverse_lines))
+    steps.append(Pipeline("Nested", parse_steps("Lowercase > Unique", manipulators)))
+    return steps
+
+
+def apply_steps(steps: list[TextManipulator], text: str) -> str:
+    return functools.reduce(lambda text, step: step.change_text(text), steps, text)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_iter_lines_matches_steps(seed):
+    rng = random.Random(seed)
+    steps = rng.choices(get_steps(), k=rng.randint(1, 5))
+    pipeline = Pipeline("test", steps)
+    lines = pipeline.iter_lines(iter(TEXT.split("\n")))
+    assert "\n".join(lines) == apply_steps(steps, TEXT)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_engine_matches_steps(seed):
+    rng = random.Random(seed)
+    steps = rng.choices(get_steps(), k=rng.randint(1, 5))
+    engine = Pipeline("test", steps).create_engine()
+    text = ""
+    for line in TEXT.split("\n") * 3:
+        text += line + "\n"
+        assert "\n".join(engine.update(text)) == apply_steps(steps, text)
+
+
+def test_reused_engine_matches_steps():
+    manipulators = create_manipulators()
+    first = Pipeline("first", parse_steps("Title > Sort Ascending", manipulators))
+    second = Pipeline("second", parse_steps("Title > Unique", manipulators))
+    engine = first.create_engine()
+    engine.update(TEXT)
+    reused = second.create_engine()
+    reused.reuse(engine)
+    assert "\n".join(reused.update(TEXT)) == apply_steps(second.steps, TEXT)
+
+
+def test_load_pipelines_skips_shadowing_names():
+    data = {
+        "Uppercase": ["Lowercase"],
+        "Regex": ["Lowercase"],
+        "missing": ["Lowercase", "No Such Step"],
+        "shout": ["Space", "Uppercase"],
+    }
+    pipelines = load_pipelines(data, create_manipulators(), reserved_names=["Regex"])
+    assert list(pipelines) == ["shout"]
+    expected = "B APPLE BANANA SPLIT CHERRY PIE B APPLE DATE FIG"
+    assert pipelines["shout"].change_text(TEXT) == expected
@@ -0,0 +1,121 @@
+import tkinter
+
+import pytest
+
+ctk = pytest.importorskip("customtkinter")
+
+from widgets.regex_highlighter import RegexHighlighter  # noqa: E402
+from widgets.textbox import Textbox  # noqa: E402
+
+
+class FakeTextbox:
+    """The parts of Textbox the highlighter uses, with 20 lines in view."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.top = 1
+        self.removed_tags = []
+        self.on_edit = None
+        self.on_view = None
+
+    def get(self, first: str, last: str) -> str:
+        assert (first, last) == ("1.0", "end-1c")
+        return self.text
+
+    def get_line_count(self) -> int:
+        return self.text.count("\n") + 1
+
+    def index(self, index: str) -> str:
+        if index == "@0,0":
+            return f"{self.top}.0"
+        return f"{self.top + 19}.0"
+
+    def winfo_height(self) -> int:
+        return 400
+
+    def tag_config(self, tag: str, **options) -> None:
+        pass
+
+    def tag_remove(self, tag: str, first: str, last: str) -> None:
+        self.removed_tags.append((first, last))
+
+    def on_view_changed(self, function: callable) -> None:
+        self.on_view = function
+
+    def on_modified(self, function: callable) -> None:
+        self.on_edit = function
+
+    def after(self, delay_ms: int, callback: callable) -> str:
+        return "after"
+
+    def after_cancel(self, after_id: str) -> None:
+        pass
+
+    def edit(self, line: int, new_lines: list[str], removed: int = 1) -> None:
+        """Replace removed lines from line on with new_lines and report it."""
+        lines = self.text.split("\n")
+        lines[line - 1 : line - 1 + removed] = new_lines
+        self.text = "\n".join(lines)
+        self.on_edit()
+
+
+def create_highlighter(line_count: int = 300) -> tuple[RegexHighlighter, FakeTextbox]:
+    textbox = FakeTextbox("\n".join(f"line {number}" for number in range(line_count)))
+    highlighter = RegexHighlighter(textbox, sandbox=None, dispatcher=None)
+    highlighter._pattern = "line"
+    highlighter._searched = [[1, 100], [150, 250]]
+    return highlighter, textbox
+
+
+def test_replacement_that_keeps_the_line_count():
+    highlighter, textbox = create_highlighter()
+    # Paste two lines over lines 10 and 11.
+    textbox.edit(10, ["pasted", "text"], removed=2)
+    assert highlighter._searched == [[1, 9], [12, 100], [150, 250]]
+
+
+def test_inserted_lines_move_the_searched_lines_after_them():
+    highlighter, textbox = create_highlighter()
+    textbox.edit(120, ["a", "b", "c", "d"])
+    assert highlighter._searched == [[1, 100], [153, 253]]
+    # Removing lines changes the line that takes their place too.
+    textbox.edit(200, [], removed=3)
+    assert highlighter._searched == [[1, 100], [153, 199], [201, 250]]
+    assert highlighter._line_count == textbox.get_line_count()
+
+
+def test_unchanged_text_keeps_the_searched_lines():
+    highlighter, textbox = create_highlighter()
+    textbox.on_edit()
+    assert highlighter._searched == [[1, 100], [150, 250]]
+
+
+def test_unsearched_lines_around_the_view():
+    highlighter, textbox = create_highlighter()
+    textbox.top = 90
+    # Lines 40 to 159 are around the view, 1 to 100 and 150 on are searched.
+    assert highlighter._unsearched_lines() == (101, 149)
+    textbox.edit(95, ["edited"])
+    assert highlighter._unsearched_lines() == (95, 149)
+
+
+@pytest.fixture
+def root():
+    try:
+        root = ctk.CTk()
+    except tkinter.TclError:
+        pytest.skip("no display")
+    yield root
+    root.destroy()
+
+
+def test_textbox_reports_each_change(root):
+    textbox = Textbox(root)
+    calls = []
+    textbox.on_modified(lambda: calls.append(textbox.get("1.0", "end-1c")))
+    textbox.insert("1.0", "first")
+    root.update()
+    # Like a paste with the mouse, which runs no key binding.
+    textbox.insert("end", " second")
+    root.update()
+    assert calls == ["first", "first second"]
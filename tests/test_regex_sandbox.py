@@ -0,0 +1,101 @@
+import re
+import threading
+import time
+import types
+
+import pytest
+
+from debounced_task import CancelToken
+from debounced_task import TaskCancelled
+from text_tools import regex_sandbox
+from text_tools.regex_sandbox import RegexSandbox
+
+# Backtracks for minutes, the worker has to be killed.
+SLOW_PATTERN = "(a+)+$"
+SLOW_TEXT = "a" * 30 + "b"
+
+
+@pytest.fixture
+def sandbox():
+    sandbox = RegexSandbox(timeout=0.5, max_matches=3)
+    yield sandbox
+    sandbox.close()
+
+
+def test_slow_pattern_is_stopped_and_worker_restarts(sandbox):
+    result = sandbox.search(SLOW_PATTERN, SLOW_TEXT)
+    assert result.timed_out
+    assert result.to_text(0.5, 3) == "(Regex stopped after 0.5 s)"
+    result = sandbox.search("a+", "a b aa")
+    assert not result.timed_out
+    assert result.matches == ["a", "aa"]
+
+
+def test_matches_stop_at_max_matches(sandbox):
+    result = sandbox.search("a", "aaaaa")
+    assert result.matches == ["a", "a", "a"]
+    assert result.truncated
+    assert result.to_text(0.5, 3) == "a\na\na\n(Regex stopped after 3 matches)"
+    result = sandbox.search("a", "aaa", spans=True)
+    assert result.matches == [(0, 1), (1, 2), (2, 3)]
+    assert not result.truncated
+
+
+def test_invalid_regex(sandbox):
+    result = sandbox.search("(", "text")
+    assert result.error is not None
+    assert result.to_text(0.5, 3) == "(Invalid regex)"
+    # The worker keeps serving.
+    assert sandbox.search("t", "text").matches == ["t", "t"]
+
+
+def test_cancelled_search_does_not_delay_the_next_one():
+    sandbox = RegexSandbox(timeout=10)
+    sandbox.start()
+    token = CancelToken()
+    threading.Timer(0.5, token.cancel).start()
+    with pytest.raises(TaskCancelled):
+        sandbox.search(SLOW_PATTERN, SLOW_TEXT, token)
+    started = time.monotonic()
+    result = sandbox.search("b", SLOW_TEXT)
+    assert time.monotonic() - started < 5
+    assert result.matches == ["b"]
+    sandbox.close()
+
+
+class FakeConnection:
+    def __init__(self, requests: list) -> None:
+        self.requests = list(requests)
+        self.sent = []
+
+    def recv(self):
+        if not self.requests:
+            raise EOFError
+        return self.requests.pop(0)
+
+    def send(self, message) -> None:
+        self.sent.append(message)
+
+
+def test_worker_compiles_each_pattern_once(monkeypatch):
+    compiled = []
+
+    def compile_pattern(pattern):
+        compiled.append(pattern)
+        return re.compile(pattern)
+
+    fake_re = types.SimpleNamespace(compile=compile_pattern, error=re.error)
+    monkeypatch.setattr(regex_sandbox, "re", fake_re)
+    connection = FakeConnection(
+        [
+            (1, "a", "text", "abc", False, 10),
+            (2, "b", "text", None, False, 10),
+            (3, "a", "text", None, False, 10),
+        ]
+    )
+    regex_sandbox._serve(connection, cache_size=8)
+    assert compiled == ["a", "b"]
+    done = [message for message in connection.sent if message[0] == "done"]
+    assert done == [("done", 1, False), ("done", 2, False), ("done", 3, False)]
+    matches = [message[2] for message in connection.sent if message[0] == "matches"]
+    assert matches == [["a"], ["b"], ["a"]]
@@ -0,0 +1,198 @@
+from settings_manager import SettingsManager
+from settings_schema import SettingSpec
+from settings_schema import SettingsSchema
+
+
+class FakeStorage:
+    def __init__(self, data: dict = None) -> None:
+        self.data = dict(data or {})
+        self.writes = []
+
+    def read_object(self, key):
+        return self.data.get(key)
+
+    def save_object(self, key, value) -> None:
+        self.data[key] = value
+        self.writes.append(key)
+
+
+class FakeScheduler:
+    """Runs after() and after_idle() callbacks when the test asks for it."""
+
+    def __init__(self) -> None:
+        self._callbacks = dict()
+        self._next_id = 0
+
+    def after(self, delay_ms: int, callback: callable) -> str:
+        self._next_id += 1
+        after_id = f"after#{self._next_id}"
+        self._callbacks[after_id] = (delay_ms, callback)
+        return after_id
+
+    def after_idle(self, callback: callable) -> str:
+        return self.after(0, callback)
+
+    def after_cancel(self, after_id: str) -> None:
+        self._callbacks.pop(after_id, None)
+
+    def run_idle(self) -> None:
+        """Run the after_idle() callbacks, like one idle cycle."""
+        self._run(lambda delay_ms: delay_ms == 0)
+
+    def run_all(self) -> None:
+        self._run(lambda delay_ms: True)
+
+    def _run(self, should_run: callable) -> None:
+        for after_id, (delay_ms, callback) in list(self._callbacks.items()):
+            if should_run(delay_ms):
+                del self._callbacks[after_id]
+                callback()
+
+
+def create_manager() -> tuple[SettingsManager, FakeStorage, FakeScheduler]:
+    storage = FakeStorage()
+    scheduler = FakeScheduler()
+    manager = SettingsManager(storage, scheduler)
+    manager.create("width", 400)
+    manager.create_range("opacity", 1.0, 0.1, 1.0)
+    storage.writes.clear()
+    return manager, storage, scheduler
+
+
+def names(settings: list) -> list[str]:
+    return [setting.name for setting in settings]
+
+
+def test_batch_writes_once():
+    manager, storage, scheduler = create_manager()
+    with manager.batch():
+        manager.set_value("width", 500)
+        with manager.batch():
+            manager.set_value("opacity", 0.5)
+            manager.create("height", 300)
+        assert storage.writes == []
+    assert storage.writes == ["settings"]
+    scheduler.run_all()
+    assert storage.writes == ["settings"]
+    saved = storage.data["settings"]
+    assert saved["width"]["value"] == 500
+    assert saved["opacity"]["value"] == 0.5
+    assert saved["height"]["value"] == 300
+
+
+def test_unchanged_settings_are_not_written():
+    manager, storage, scheduler = create_manager()
+    manager.set_value("width", 400)
+    scheduler.run_all()
+    manager.set_value("width", 500)
+    manager.set_value("width", 400)
+    manager.save()
+    with manager.batch():
+        manager.create("width", 400)
+    assert storage.writes == []
+
+
+def test_delayed_save_is_written_on_close():
+    manager, storage, scheduler = create_manager()
+    manager.set_value("width", 500)
+    manager.set_value("width", 600)
+    assert storage.writes == []
+    manager.close()
+    assert storage.writes == ["settings"]
+    assert storage.data["settings"]["width"]["value"] == 600
+    # The delayed save was cancelled, it does not write again.
+    scheduler.run_all()
+    assert storage.writes == ["settings"]
+
+
+def test_one_notification_per_idle_cycle():
+    manager, storage, scheduler = create_manager()
+    width = manager.get("width")
+    opacity = manager.get("opacity")
+    calls = []
+    width.subscribe(lambda: calls.append(("first", width.value)))
+    width.subscribe(lambda: calls.append(("second", width.value)))
+    opacity.subscribe(lambda: calls.append(("opacity", opacity.value)))
+    for value in range(500, 510):
+        manager.set_value("width", value)
+    opacity.value = 0.5
+    assert calls == []
+    scheduler.run_idle()
+    assert calls == [("first", 509), ("second", 509), ("opacity", 0.5)]
+    scheduler.run_idle()
+    assert len(calls) == 3
+    manager.set_value("width", 400)
+    scheduler.run_idle()
+    assert calls[3:] == [("first", 400), ("second", 400)]
+
+
+def test_schema_validates_stored_values():
+    schema = SettingsSchema(
+        [
+            SettingSpec("width", 400, min_value=100, max_value=1000),
+            SettingSpec("theme", "dark", options=["dark", "light"]),
+            SettingSpec("autosave", True),
+            SettingSpec("font_size", 12),
+            SettingSpec("missing", "default"),
+        ]
+    )
+    stored = {
+        "width": {"value": 5000},
+        "theme": {"value": "purple"},
+        "autosave": {"value": "False"},
+        "font_size": {"value": "not a number"},
+        "unknown": {"value": 1},
+    }
+    assert schema.validate(stored) == {
+        "width": 1000,
+        "theme": "dark",
+        "autosave": False,
+        "font_size": 12,
+        "missing": "default",
+    }
+
+
+def test_register_validates_value_against_new_spec():
+    manager, storage, scheduler = create_manager()
+    manager.create_range("font_size", 30, 8, 40)
+    manager.create_option("theme", "light", ["dark", "light", "blue"])
+    manager.set_value("theme", "blue")
+    manager.register(
+        SettingsSchema(
+            [
+                SettingSpec("font_size", 12, min_value=8, max_value=20),
+                SettingSpec("theme", "dark", options=["dark", "light"]),
+            ]
+        )
+    )
+    assert manager.get("font_size").value == 20
+    assert manager.get("theme").value == "dark"
+    manager.save()
+    saved = storage.data["settings"]
+    assert saved["font_size"]["value"] == 20
+    assert saved["theme"] == manager.get("theme").to_dict()
+
+
+def test_indexes_follow_register_and_remove():
+    manager, storage, scheduler = create_manager()
+    manager.create("autosave", True, parent="Notepad")
+    manager.create("last_file", "", hidden=True, parent="Notepad")
+    assert names(manager.by_parent("Notepad")) == ["autosave", "last_file"]
+    assert names(manager.by_type(bool)) == ["autosave"]
+    assert "last_file" in names(manager.hidden())
+    assert "last_file" not in names(manager.visible())
+    # Declaring a setting again moves it to its new groups.
+    manager.register(
+        SettingsSchema([SettingSpec("last_file", "", hidden=False, parent="Files")])
+    )
+    assert names(manager.by_parent("Notepad")) == ["autosave"]
+    assert names(manager.by_parent("Files")) == ["last_file"]
+    assert "last_file" in names(manager.visible())
+    assert "last_file" not in names(manager.hidden())
+    manager.remove("autosave")
+    assert manager.by_parent("Notepad") == []
+    assert "Notepad" not in manager.parents()
+    assert manager.by_type(bool) == []
+    assert "autosave" not in names(manager.visible())
+    manager.clear_settings()
+    assert manager.visible() == manager.hidden() == manager.parents() == []
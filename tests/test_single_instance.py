@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+from single_instance import InstanceServer
+from single_instance import send_command
+
+
+@pytest.fixture
+def name():
+    name = f"UtilityGearTest{os.getpid()}"
+    yield name
+
+
+def test_second_server_does_not_start(name):
+    first = InstanceServer(name)
+    second = InstanceServer(name)
+    assert first.start()
+    try:
+        assert not second.start()
+    finally:
+        first.close()
+    assert second.start()
+    second.close()
+
+
+def test_commands_before_handler_are_kept(name):
+    server = InstanceServer(name)
+    assert server.start()
+    received = []
+    try:
+        assert send_command(name, "tab", "Text")
+        assert send_command(name, "toggle")
+        server.set_handler(lambda *command: received.append(command))
+        assert send_command(name, "show")
+    finally:
+        server.close()
+    assert received == [("tab", "Text"), ("toggle",), ("show",)]
+
+
+def test_send_command_without_instance(name):
+    assert not send_command(name, "show")
+    assert not send_command(name, "show", retry_for=0.2)
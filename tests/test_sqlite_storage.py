@@ -0,0 +1,63 @@
+import json
+import os
+
+from sqlite_storage import SQLiteStorage
+
+DATA = {
+    "settings": {"window_width": 400, "show_titlebar": True},
+    "notepad": {"text": "hello"},
+    "snippets": {";sig": "Best regards"},
+}
+
+
+def test_migrate_from_json(tmp_path):
+    json_filename = str(tmp_path / "storage.json")
+    with open(json_filename, "w") as file:
+        json.dump(DATA, file)
+    # A record in the journal of the old storage is migrated too.
+    with open(json_filename + ".journal", "w") as file:
+        file.write(json.dumps({"key": "pipelines", "data": {"a": ["Title"]}}) + "\n")
+    db_filename = str(tmp_path / "storage.db")
+    storage = SQLiteStorage(db_filename)
+    assert storage.migrate_from_json(json_filename)
+    storage.close()
+    assert not os.path.exists(json_filename)
+    assert os.path.exists(json_filename + ".migrated")
+    assert os.path.exists(json_filename + ".journal.migrated")
+
+    storage = SQLiteStorage(db_filename)
+    # Keys are only loaded when they are read.
+    assert not storage._read()
+    assert storage.read_object("notepad") == DATA["notepad"]
+    assert set(storage._read()) == {"notepad"}
+    for key, value in DATA.items():
+        assert storage.read_object(key) == value
+    assert storage.read_object("pipelines") == {"a": ["Title"]}
+    assert storage.read_object("missing") is None
+    storage.close()
+
+
+def test_migrate_only_into_empty_database(tmp_path):
+    json_filename = str(tmp_path / "storage.json")
+    with open(json_filename, "w") as file:
+        json.dump(DATA, file)
+    storage = SQLiteStorage(str(tmp_path / "storage.db"))
+    storage.save_object("notepad", {"text": "newer"})
+    assert not storage.migrate_from_json(json_filename)
+    assert not storage.migrate_from_json(str(tmp_path / "missing.json"))
+    assert storage.read_object("notepad") == {"text": "newer"}
+    assert os.path.exists(json_filename)
+    storage.close()
+
+
+def test_keys_without_loading_rows(tmp_path):
+    filename = str(tmp_path / "storage.db")
+    storage = SQLiteStorage(filename)
+    for key, value in DATA.items():
+        storage.save_object(key, value)
+    storage.close()
+    storage = SQLiteStorage(filename, write_behind=True, flush_interval=60)
+    storage.save_object("pipelines", {})
+    assert sorted(storage.keys()) == sorted(list(DATA) + ["pipelines"])
+    assert set(storage._read()) == {"pipelines"}
+    storage.close()
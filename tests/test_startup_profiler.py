@@ -0,0 +1,46 @@
+import json
+import tracemalloc
+
+from startup_profiler import StartupProfiler
+
+
+def test_timing_runs_without_tracing(tmp_path):
+    profiler = StartupProfiler(enabled=True)
+    profiler.start()
+    assert not tracemalloc.is_tracing()
+    with profiler.phase("outer"):
+        with profiler.phase("inner"):
+            values = [object() for _ in range(1000)]
+    assert values
+    summary = profiler.finish(str(tmp_path / "profile.json"))
+    assert summary.startswith("Startup")
+    with open(tmp_path / "profile.json") as file:
+        report = json.load(file)
+    assert not report["traced_memory"]
+    assert [phase["depth"] for phase in report["phases"]] == [0, 1]
+    assert report["phases"][1]["net_blocks"] >= 1000
+    assert "net_traced_kb" not in report["phases"][1]
+
+
+def test_memory_pass_traces_allocations(tmp_path):
+    profiler = StartupProfiler(enabled=True, trace_memory=True)
+    profiler.start()
+    assert tracemalloc.is_tracing()
+    with profiler.phase("allocate"):
+        values = [object() for _ in range(1000)]
+    assert values
+    profiler.finish(str(tmp_path / "profile.json"))
+    assert not tracemalloc.is_tracing()
+    with open(tmp_path / "profile.json") as file:
+        report = json.load(file)
+    assert report["phases"][0]["net_traced_kb"] > 0
+    assert report["peak_traced_kb"] > 0
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = StartupProfiler(trace_memory=True)
+    profiler.start()
+    with profiler.phase("phase"):
+        pass
+    assert profiler.phases == []
+    assert not tracemalloc.is_tracing()
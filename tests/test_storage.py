@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+
+import pytest
+
+from sqlite_storage import SQLiteStorage
+from storage import COMPRESSED_KEY
+from storage import Storage
+
+LARGE_VALUE = {"text": "line of text\n" * 1000}
+SMALL_VALUE = {"text": "short"}
+
+
+@pytest.mark.parametrize("compression", ["zlib", "lzma"])
+def test_compressed_round_trip(tmp_path, compression):
+    filename = str(tmp_path / "storage.json")
+    storage = Storage(filename, compress_threshold=1024, compression=compression)
+    storage.save_object("large", LARGE_VALUE)
+    storage.save_object("small", SMALL_VALUE)
+    storage.close()
+    with open(filename) as file:
+        stored = json.load(file)
+    assert stored["large"][COMPRESSED_KEY] == compression
+    assert stored["small"] == SMALL_VALUE
+    storage = Storage(filename, compress_threshold=1024, compression=compression)
+    assert storage.read_object("large") == LARGE_VALUE
+    assert storage.read_object("small") == SMALL_VALUE
+
+
+def test_unchanged_compressed_value_is_kept(tmp_path):
+    filename = str(tmp_path / "storage.json")
+    storage = Storage(filename, compress_threshold=1024)
+    storage.save_object("large", LARGE_VALUE)
+    storage.close()
+    storage = Storage(filename, compress_threshold=1024)
+    assert storage.read_object("large") == LARGE_VALUE
+    storage.save_object("small", SMALL_VALUE)
+    storage.close()
+    with open(filename) as file:
+        assert file.read().count(COMPRESSED_KEY) == 1
+    assert Storage(filename).read_object("large") == LARGE_VALUE
+
+
+def test_legacy_uncompressed_values(tmp_path):
+    filename = str(tmp_path / "storage.json")
+    with open(filename, "w") as file:
+        json.dump({"large": LARGE_VALUE, "small": SMALL_VALUE}, file)
+    storage = Storage(filename, compress_threshold=1024)
+    assert storage.read_object("large") == LARGE_VALUE
+    assert storage.read_object("small") == SMALL_VALUE
+
+
+def test_compressed_sqlite_round_trip(tmp_path):
+    filename = str(tmp_path / "storage.db")
+    storage = SQLiteStorage(filename, compress_threshold=1024)
+    storage.save_object("large", LARGE_VALUE)
+    storage.close()
+    storage = SQLiteStorage(filename)
+    assert storage.read_object("large") == LARGE_VALUE
+    storage.close()
+
+
+def test_unknown_compression():
+    with pytest.raises(ValueError):
+        Storage("unused.json", compression="gzip")
+
+
+def count_writes(storage, written: threading.Event = None) -> list:
+    """Record the dirty keys of each write of storage, set written after one."""
+    writes = []
+    write = storage._write
+
+    def counting_write(data, dirty_keys):
+        writes.append(set(dirty_keys))
+        write(data, dirty_keys)
+        if written is not None:
+            written.set()
+
+    storage._write = counting_write
+    return writes
+
+
+def test_write_behind_coalesces_saves(tmp_path):
+    filename = str(tmp_path / "storage.json")
+    storage = Storage(filename, write_behind=True, flush_interval=0.2)
+    written = threading.Event()
+    writes = count_writes(storage, written)
+    for number in range(50):
+        storage.save_object("counter", {"value": number})
+    storage.save_object("other", SMALL_VALUE)
+    assert written.wait(5)
+    assert writes == [{"counter", "other"}]
+    with open(filename) as file:
+        assert json.load(file)["counter"] == {"value": 49}
+    storage.close()
+    assert len(writes) == 1
+
+
+def test_close_flushes_pending_saves(tmp_path):
+    filename = str(tmp_path / "storage.json")
+    storage = Storage(filename, write_behind=True, flush_interval=60)
+    writes = count_writes(storage)
+    storage.save_object("key", SMALL_VALUE)
+    assert not os.path.exists(filename)
+    storage.close()
+    assert writes == [{"key"}]
+    assert Storage(filename).read_object("key") == SMALL_VALUE
+
+
+def test_failed_write_keeps_the_old_file(tmp_path, monkeypatch):
+    filename = str(tmp_path / "storage.json")
+    storage = Storage(filename)
+    storage.save_object("key", {"value": 1})
+
+    def fail_replace(source, destination):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail_replace)
+    with pytest.raises(OSError):
+        storage.save_object("key", {"value": 2})
+    # The new content only went to the temporary file.
+    assert Storage(filename).read_object("key") == {"value": 1}
+    monkeypatch.undo()
+    storage.flush()
+    assert Storage(filename).read_object("key") == {"value": 2}
+    assert os.listdir(tmp_path) == ["storage.json"]
@@ -0,0 +1,59 @@
+import tkinter
+from types import SimpleNamespace
+
+import pytest
+
+ctk = pytest.importorskip("customtkinter")
+
+from settings_manager import SettingsManager  # noqa: E402
+from storage import Storage  # noqa: E402
+from tabs.note_tab import NoteTab  # noqa: E402
+from widgets import TabView  # noqa: E402
+
+
+@pytest.fixture
+def root():
+    try:
+        root = ctk.CTk()
+    except tkinter.TclError:
+        pytest.skip("no display")
+    yield root
+    root.destroy()
+
+
+def test_setting_change_after_restart(root, tmp_path):
+    storage = Storage(str(tmp_path / "storage.json"))
+    settings = SettingsManager(storage)
+    app = SimpleNamespace(settings=settings, storage=storage, after=root.after)
+    tabview = TabView(root, prefetch=False)
+    tab = NoteTab(app, tabview, "Notepad")
+    tabview.build_current_tab()
+    # Restart like App._soft_restart, with the notepad hidden afterwards.
+    settings.set_value("Notepad_Tab_visible", False)
+    tab.destroy()
+    tabview.destroy()
+    tabview = TabView(root, prefetch=False)
+    NoteTab(app, tabview, "Notepad")
+    settings.set_value("notepad_font_size", 16)
+    settings.set_value("notepad_autosave", False)
+
+
+def test_destroy_unsubscribes_settings(tmp_path, monkeypatch):
+    calls = []
+    for name in ["_set_font_size", "_set_saving_behaviour"]:
+        monkeypatch.setattr(NoteTab, name, lambda self, name=name: calls.append(name))
+    storage = Storage(str(tmp_path / "storage.json"))
+    settings = SettingsManager(storage)
+    app = SimpleNamespace(settings=settings, storage=storage)
+    tabview = SimpleNamespace(add=lambda title, on_first_show: None)
+    tab = NoteTab(app, tabview, "Notepad")
+    font_size = settings.get("notepad_font_size")
+    autosave = settings.get("notepad_autosave")
+    settings.set_value("notepad_font_size", 14)
+    assert calls == ["_set_font_size"]
+    tab.destroy()
+    assert font_size._subscribers == []
+    assert autosave._subscribers == []
+    settings.set_value("notepad_font_size", 16)
+    settings.set_value("notepad_autosave", False)
+    assert calls == ["_set_font_size"]
@@ -0,0 +1,97 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from text_expander import SNIPPETS_KEY
+from text_expander import TextExpander
+from text_expander import find_hidden_abbreviations
+
+
+class FakeStorage:
+    def __init__(self, data: dict) -> None:
+        self.data = data
+        self.reads = 0
+
+    def read_object(self, key):
+        self.reads += 1
+        return self.data.get(key)
+
+    def save_object(self, key, value) -> None:
+        self.data[key] = value
+
+
+def test_snippets_are_loaded_on_first_use():
+    storage = FakeStorage({SNIPPETS_KEY: {";sig": "Best regards"}})
+    expander = TextExpander(storage)
+    assert storage.reads == 0
+    matches = [expander.feed_key(name) for name in ["a", ";", "s", "i", "g"]]
+    assert matches[-1] == (";sig", "Best regards")
+    assert matches[:-1] == [None] * 4
+    assert storage.reads == 1
+
+
+def test_keys_that_move_the_cursor_reset_the_abbreviation():
+    expander = TextExpander(FakeStorage({SNIPPETS_KEY: {"brb": "be right back"}}))
+    for name in ["b", "r", "left", "b"]:
+        assert expander.feed_key(name) is None
+    for name in ["b", "shift", "r"]:
+        assert expander.feed_key(name) is None
+    assert expander.feed_key("b") == ("brb", "be right back")
+
+
+class FakeKeyboard:
+    def __init__(self) -> None:
+        self.sent = []
+
+    def send(self, name: str) -> None:
+        self.sent.append(name)
+
+    def write(self, text: str) -> None:
+        self.sent.append(text)
+
+
+def press(expander: TextExpander, names: list[str]) -> None:
+    for name in names:
+        expander._on_key_press(SimpleNamespace(name=name))
+
+
+def test_sent_keys_are_not_fed():
+    expander = TextExpander(FakeStorage({SNIPPETS_KEY: {"brb": "Be back"}}))
+    keyboard = expander._keyboard = FakeKeyboard()
+    press(expander, ["b", "r", "b"])
+    assert keyboard.sent == ["backspace"] * 3 + ["Be back"]
+    # The presses of the sent keys, shifted characters come with shift.
+    press(expander, ["backspace"] * 3 + ["shift", "B", "e", "space", "b", "a"])
+    press(expander, ["c", "k", "b", "r", "b"])
+    assert keyboard.sent[4:] == ["backspace"] * 3 + ["Be back"]
+
+
+def test_typed_keys_are_fed_when_sent_keys_have_no_presses():
+    expander = TextExpander(FakeStorage({SNIPPETS_KEY: {"brb": "café"}}))
+    keyboard = expander._keyboard = FakeKeyboard()
+    press(expander, ["b", "r", "b"])
+    # "é" is written without a key press of its own.
+    press(expander, ["backspace"] * 3 + ["c", "a", "f"])
+    press(expander, ["b", "r", "b"])
+    assert keyboard.sent.count("café") == 2
+
+
+def test_abbreviations_that_contain_another_one():
+    snippets = {";s": "Sincerely", ";sig": "Best regards", "ig": "x", ";si": "y"}
+    assert find_hidden_abbreviations(snippets) == [";sig", ";si"]
+    storage = FakeStorage(dict())
+    expander = TextExpander(storage)
+    with pytest.raises(ValueError):
+        expander.set_snippets(snippets)
+    assert SNIPPETS_KEY not in storage.data
+    expander.set_snippets({";sig": "Best regards", "sig": "Signature"})
+
+
+def test_hidden_stored_abbreviations_are_skipped(caplog):
+    snippets = {";s": "Sincerely", ";sig": "Best regards"}
+    expander = TextExpander(FakeStorage({SNIPPETS_KEY: snippets}))
+    with caplog.at_level(logging.WARNING, logger="text_expander"):
+        expander.load_snippets()
+    assert expander.snippets == {";s": "Sincerely"}
+    assert ";sig" in caplog.text
@@ -0,0 +1,139 @@
+import pytest
+
+pytest.importorskip("customtkinter")
+
+from widgets.text_renderer import TextRenderer  # noqa: E402
+
+
+class FakeTextbox:
+    """The parts of a Tk text widget TextRenderer uses, on a Python string."""
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.marks = dict()
+        self.gravity = dict()
+        self.state = "disabled"
+        self.top = "1.0"
+        self.idle_callbacks = dict()
+        self._next_id = 0
+        # (action, text) of each change, to check how much was redone.
+        self.changes = []
+        self.views = []
+
+    def _offset(self, index: str) -> int:
+        if index in self.marks:
+            return self.marks[index]
+        line, column = index.split(".")
+        lines = self.text.split("\n")
+        start = sum(len(text) + 1 for text in lines[: int(line) - 1])
+        line_length = len(lines[int(line) - 1])
+        column = line_length if column == "end" else min(int(column), line_length)
+        return start + column
+
+    def delete(self, first: str, last: str) -> None:
+        assert self.state == "normal"
+        start, end = self._offset(first), self._offset(last)
+        self.changes.append(("delete", self.text[start:end]))
+        self.text = self.text[:start] + self.text[end:]
+        for name, offset in self.marks.items():
+            if offset > start:
+                self.marks[name] = max(start, offset - (end - start))
+
+    def insert(self, index: str, text: str) -> None:
+        assert self.state == "normal"
+        position = self._offset(index)
+        self.changes.append(("insert", text))
+        self.text = self.text[:position] + text + self.text[position:]
+        for name, offset in self.marks.items():
+            if offset > position or (
+                offset == position and self.gravity.get(name) == "right"
+            ):
+                self.marks[name] = offset + len(text)
+
+    def mark_set(self, name: str, index: str) -> None:
+        self.marks[name] = self._offset(index)
+
+    def mark_gravity(self, name: str, gravity: str) -> None:
+        self.gravity[name] = gravity
+
+    def index(self, index: str) -> str:
+        assert index == "@0,0"
+        return self.top
+
+    def yview(self, index: str) -> None:
+        self.views.append(index)
+
+    def cget(self, name: str) -> str:
+        assert name == "state"
+        return self.state
+
+    def configure(self, state: str) -> None:
+        self.state = state
+
+    def after_idle(self, callback: callable) -> int:
+        self._next_id += 1
+        self.idle_callbacks[self._next_id] = callback
+        return self._next_id
+
+    def after_cancel(self, after_id: int) -> None:
+        self.idle_callbacks.pop(after_id, None)
+
+    def run_idle(self) -> None:
+        while self.idle_callbacks:
+            after_id = next(iter(self.idle_callbacks))
+            self.idle_callbacks.pop(after_id)()
+
+
+def numbered_lines(count: int) -> str:
+    return "\n".join(f"line {number}" for number in range(count))
+
+
+def test_only_changed_lines_are_replaced():
+    textbox = FakeTextbox()
+    renderer = TextRenderer(textbox)
+    text = numbered_lines(100)
+    renderer.render(text)
+    assert textbox.text == text
+    textbox.changes.clear()
+    lines = text.split("\n")
+    lines[50] = "changed"
+    renderer.render("\n".join(lines))
+    assert textbox.text == "\n".join(lines)
+    assert textbox.changes == [("delete", "line 50"), ("insert", "changed")]
+    assert textbox.state == "disabled"
+    textbox.changes.clear()
+    renderer.render("\n".join(lines))
+    assert textbox.changes == []
+
+
+def test_large_changes_are_inserted_in_chunks(monkeypatch):
+    monkeypatch.setattr(TextRenderer, "CHUNK_SIZE", 100)
+    textbox = FakeTextbox()
+    renderer = TextRenderer(textbox)
+    text = numbered_lines(200)
+    renderer.render(text)
+    inserts = [change for action, change in textbox.changes if action == "insert"]
+    assert inserts == [text[:100]]
+    textbox.run_idle()
+    assert textbox.text == text
+    assert all(len(change) <= 100 for action, change in textbox.changes)
+
+
+def test_render_while_inserting_continues_from_what_is_shown(monkeypatch):
+    monkeypatch.setattr(TextRenderer, "CHUNK_SIZE", 100)
+    textbox = FakeTextbox()
+    renderer = TextRenderer(textbox)
+    renderer.render(numbered_lines(200))
+    # The next result arrives before the first one is fully inserted.
+    renderer.render("header\n" + numbered_lines(300))
+    textbox.run_idle()
+    assert textbox.text == "header\n" + numbered_lines(300)
+
+
+def test_scroll_position_is_kept():
+    textbox = FakeTextbox()
+    renderer = TextRenderer(textbox)
+    renderer.render(numbered_lines(100))
+    textbox.top = "40.0"
+    renderer.render("first\n" + numbered_lines(100))
+    assert textbox.views[-1] == "40.0"
@@ -0,0 +1,106 @@
+"""Check the import time of the app against the budget in import_budget.json.
+
+Imports the app module with `python -X importtime` and compares the total and
+the cumulative time of the tracked modules with their budgets.
+
+    python tools/import_budget.py           # check, exit code 1 if over budget
+    python tools/import_budget.py --update  # record the current times as budget
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SOURCE_DIR = os.path.join(ROOT, "src")
+BUDGET_FILE = os.path.join(ROOT, "import_budget.json")
+# Budgets written by --update leave room for run to run noise, at least
+# MIN_HEADROOM_MS for modules that import in well under a millisecond.
+HEADROOM = 1.25
+MIN_HEADROOM_MS = 1.0
+
+
+def measure_imports(module: str, runs: int) -> dict:
+    """Return the fastest cumulative import time in ms of every module."""
+    best = dict()
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=SOURCE_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            sys.exit(f"Importing {module} failed:\n{result.stderr}")
+        for name, cumulative_ms in parse_importtime(result.stderr):
+            best[name] = min(best.get(name, cumulative_ms), cumulative_ms)
+    return best
+
+
+def parse_importtime(output: str):
+    """Yield (module, cumulative ms) for each line of -X importtime output."""
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        yield name.strip(), int(cumulative) / 1000
+
+
+def check(budget: dict, times: dict) -> bool:
+    within_budget = True
+    rows = [(budget["module"], budget["total_ms"])]
+    rows.extend(budget.get("modules", dict()).items())
+    for name, budget_ms in rows:
+        measured_ms = times.get(name)
+        if measured_ms is None:
+            # A tracked module that is no longer imported makes the budget stale.
+            status = "NOT IMPORTED"
+            within_budget = False
+        elif measured_ms > budget_ms:
+            status = "OVER BUDGET"
+            within_budget = False
+        else:
+            status = "ok"
+        measured = "-" if measured_ms is None else f"{measured_ms:.1f}"
+        print(f"{name:<30} {measured:>10} / {budget_ms:>8.1f} ms  {status}")
+    return within_budget
+
+
+def get_budget_ms(measured_ms: float) -> float:
+    return round(max(measured_ms * HEADROOM, measured_ms + MIN_HEADROOM_MS), 1)
+
+
+def update(budget: dict, times: dict) -> None:
+    budget["total_ms"] = get_budget_ms(times[budget["module"]])
+    modules = dict()
+    for name in budget.get("modules", dict()):
+        if name in times:
+            modules[name] = get_budget_ms(times[name])
+        else:
+            print(f"Dropped {name}, it is not imported")
+    budget["modules"] = modules
+    with open(BUDGET_FILE, "w") as file:
+        json.dump(budget, file, indent=2)
+        file.write("\n")
+    print(f"Updated {os.path.relpath(BUDGET_FILE)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--update", action="store_true")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(BUDGET_FILE) as file:
+        budget = json.load(file)
+    times = measure_imports(budget["module"], args.runs)
+    if args.update:
+        update(budget, times)
+        return
+    if not check(budget, times):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()